@@ -7,7 +7,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 import re
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -19,6 +19,7 @@ from app.models.job import Job
 from app.models.user import User
 from app.models.bot_settings import BotSettings
 from app.services.cleanup_service import CleanupService
+from app.services.file_catalog import FileCatalogService
 from app.worker import (
     WORKER_SCALE_LOCK_KEY,
     get_queue,
@@ -564,13 +565,17 @@ def trigger_cleanup(
     service = CleanupService(db)
     deleted_jobs = service.cleanup_finished_jobs(older_than_hours=older_than_hours)
     stale_cleaned = service.cleanup_stale_pending_files(older_than_hours=max(1, older_than_hours // 4))
-    return {"deleted_jobs": deleted_jobs, "stale_jobs_cleaned": stale_cleaned}
+    evicted_jobs = service.enforce_quota()
+    return {"deleted_jobs": deleted_jobs, "stale_jobs_cleaned": stale_cleaned, "evicted_jobs": evicted_jobs}
 
 
 @router.get("/files")
 def list_files(
+    response: Response,
     source: str = Query(default="outputs"),
     limit: int = Query(default=500, ge=1, le=5000),
+    cursor: str | None = Query(default=None),
+    sort: str = Query(default="modified_at"),
     db: Session = Depends(get_db),
     current_admin=Depends(get_current_active_admin),
 ) -> list[dict]:
@@ -578,58 +583,31 @@ def list_files(
     if not root.exists():
         return []
 
-    users = db.query(User.id, User.username).all()
-    user_map = {user_id: username for user_id, username in users}
-
-    jobs = db.query(Job.id, Job.user_id, Job.input_path, Job.output_path, Job.bundle_path).all()
-    owner_by_path: dict[str, str] = {}
-    owner_by_job_id: dict[str, str] = {}
-
-    for job_id, user_id, input_path, output_path, bundle_path in jobs:
-        owner = user_map.get(user_id, "Unknown") if user_id else "Unknown"
-        owner_by_job_id[job_id] = owner
-
-        if output_path:
-            owner_by_path[Path(output_path).resolve().as_posix()] = owner
-        if bundle_path:
-            owner_by_path[Path(bundle_path).resolve().as_posix()] = owner
-        if input_path:
-            for entry in input_path.splitlines():
-                if entry.strip():
-                    owner_by_path[Path(entry.strip()).resolve().as_posix()] = owner
-
-    results: list[dict] = []
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        stat = path.stat()
-        path_key = path.resolve().as_posix()
-        relative_path = str(path.relative_to(root)).replace("\\", "/")
-        owner_username = owner_by_path.get(path_key)
-
-        if owner_username is None and source == "outputs":
-            first_segment = relative_path.split("/", 1)[0]
-            owner_username = owner_by_job_id.get(first_segment)
-            if owner_username is None and "_" in path.name:
-                maybe_job_id = path.name.split("_", 1)[0]
-                owner_username = owner_by_job_id.get(maybe_job_id)
-
-        if owner_username is None:
-            owner_username = "Unknown"
-
-        results.append(
-            {
-                "source": source,
-                "name": path.name,
-                "relative_path": relative_path,
-                "size": stat.st_size,
-                "modified_at": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat(),
-                "owner_username": owner_username,
-            }
-        )
+    catalog = FileCatalogService(db)
+    if catalog.is_empty(source):
+        catalog.reconcile(source)
 
-    results.sort(key=lambda x: x["modified_at"], reverse=True)
-    return results[:limit]
+    try:
+        rows, next_cursor = catalog.list_page(source, limit=limit, cursor=cursor, sort=sort)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    user_ids = {row.user_id for row in rows if row.user_id}
+    user_map = dict(db.query(User.id, User.username).filter(User.id.in_(user_ids)).all()) if user_ids else {}
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [
+        {
+            "source": source,
+            "name": row.name,
+            "relative_path": row.relative_path,
+            "size": row.size,
+            "modified_at": (row.mtime if row.mtime.tzinfo else row.mtime.replace(tzinfo=timezone.utc)).isoformat(),
+            "owner_username": user_map.get(row.user_id, "Unknown") if row.user_id else "Unknown",
+        }
+        for row in rows
+    ]
 
 
 @router.get("/files/view")
@@ -651,6 +629,7 @@ def view_file(
 def delete_file(
     source: str = Query(default="outputs"),
     path: str = Query(...),
+    db: Session = Depends(get_db),
     current_admin=Depends(get_current_active_admin),
 ) -> dict[str, str]:
     root = _get_root(source)
@@ -664,14 +643,21 @@ def delete_file(
     else:
         target.unlink(missing_ok=True)
 
+    FileCatalogService(db).unregister(target)
+    db.commit()
     return {"message": "Deleted"}
 
 
 @router.delete("/files/all")
-def delete_all_files(current_admin=Depends(get_current_active_admin)) -> dict[str, int]:
+def delete_all_files(
+    db: Session = Depends(get_db),
+    current_admin=Depends(get_current_active_admin),
+) -> dict[str, int]:
     settings = get_settings()
     deleted_outputs = _delete_root_contents(settings.output_dir.resolve())
     deleted_uploads = _delete_root_contents(settings.upload_dir.resolve())
+    FileCatalogService(db).clear()
+    db.commit()
     return {
         "deleted_outputs": deleted_outputs,
         "deleted_uploads": deleted_uploads,
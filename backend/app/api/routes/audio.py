@@ -13,7 +13,7 @@ from app.services.audio_service import AUDIO_BITRATES, AUDIO_FORMATS
 from app.services.jobs import JobService
 from app.services.storage import StorageService
 from app.services.upload_validation import UploadValidationService
-from app.tasks.audio_tasks import run_audio_conversion
+from app.tasks.audio_tasks import run_audio_conversion, run_audio_multi_conversion
 from app.worker import enqueue_job
 
 
@@ -24,16 +24,19 @@ router = APIRouter(prefix="/audio", tags=["audio"])
 async def create_audio_job(
     file: UploadFile = File(...),
     target_format: str = Query(default="MP3"),
+    target_formats: list[str] | None = Query(default=None),
     bitrate: str = Query(default="192k"),
     trim_enabled: bool = Query(default=False),
     trim_start: float | None = Query(default=None, ge=0),
     trim_end: float | None = Query(default=None, ge=0),
+    normalize: bool = Query(default=False),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ) -> AudioJobCreateResponse:
-    normalized_format = target_format.upper()
-    if normalized_format not in AUDIO_FORMATS:
+    normalized_formats = list(dict.fromkeys(fmt.upper() for fmt in (target_formats or [target_format])))
+    if any(fmt not in AUDIO_FORMATS for fmt in normalized_formats):
         raise HTTPException(status_code=400, detail="Unsupported audio target format")
+    normalized_format = normalized_formats[0]
     if bitrate not in AUDIO_BITRATES:
         raise HTTPException(status_code=400, detail="Unsupported bitrate")
 
@@ -50,6 +53,7 @@ async def create_audio_job(
     await validator.validate_file(file, allowed_extensions=storage_service.settings.allowed_audio_extensions)
 
     input_path = await storage_service.persist_upload(file)
+    await validator.validate_content(input_path, kind="audio", display_name=file.filename)
 
     job = job_service.create_job(
         job_type="audio",
@@ -57,24 +61,41 @@ async def create_audio_job(
         stored_filename=input_path.name,
         input_path=str(input_path),
         user_id=current_user.id,
+        input_files=[input_path],
     )
 
-    enqueue_job(
-        run_audio_conversion,
-        job.id,
-        normalized_format,
-        bitrate,
-        trim_enabled,
-        trim_start,
-        trim_end,
-        retry_max=1,
-        job_type=job.job_type,
-    )
+    if len(normalized_formats) > 1:
+        enqueue_job(
+            run_audio_multi_conversion,
+            job.id,
+            normalized_formats,
+            bitrate,
+            trim_enabled,
+            trim_start,
+            trim_end,
+            normalize,
+            retry_max=1,
+            job_type=job.job_type,
+        )
+    else:
+        enqueue_job(
+            run_audio_conversion,
+            job.id,
+            normalized_format,
+            bitrate,
+            trim_enabled,
+            trim_start,
+            trim_end,
+            normalize,
+            retry_max=1,
+            job_type=job.job_type,
+        )
 
     return AudioJobCreateResponse(
         job_id=job.id,
         status=JOB_STATUS_QUEUED,
         target_format=normalized_format,
+        target_formats=normalized_formats,
         bitrate=bitrate,
         original_filename=job.original_filename,
         output_filename=None,
@@ -101,9 +122,15 @@ def download_audio_result(job_id: str, db: Session = Depends(get_db)) -> FileRes
     if job is None or job.job_type != "audio":
         raise HTTPException(status_code=404, detail="Audio job not found")
 
-    if job.status != JOB_STATUS_COMPLETED or not job.output_path:
+    if job.status != JOB_STATUS_COMPLETED or not (job.output_path or job.bundle_path):
         raise HTTPException(status_code=409, detail="Audio job is not ready for download")
 
+    if job.bundle_path:
+        bundle_path = Path(job.bundle_path)
+        if not bundle_path.exists():
+            raise HTTPException(status_code=404, detail="Converted bundle is missing")
+        return FileResponse(path=bundle_path, filename=job.output_filename or bundle_path.name)
+
     output_path = Path(job.output_path)
     if not output_path.exists():
         raise HTTPException(status_code=404, detail="Converted file is missing")
@@ -10,11 +10,12 @@ from app.schemas.batch import BatchJobCreateResponse
 from app.schemas.job import JobResponse
 from app.services.audio_service import AUDIO_BITRATES, AUDIO_FORMATS
 from app.services.document_service import DOCUMENT_TARGET_FORMATS
-from app.services.image_service import IMAGE_FORMAT_MAP
+from app.services.image_encoders import DEFAULT_ENCODER_PROFILE, ENCODER_PROFILES, QUALITY_FORMATS
+from app.services.image_service import DEFAULT_RESIZE_MODE, IMAGE_FORMAT_MAP, RESIZE_MODES
 from app.services.jobs import JobService
 from app.services.storage import StorageService
 from app.services.upload_validation import UploadValidationService
-from app.services.video_service import VIDEO_FORMATS, normalize_resize_dimensions
+from app.services.video_service import DEFAULT_VIDEO_PRESET, VIDEO_FORMATS, VIDEO_PRESETS, normalize_resize_dimensions
 from app.tasks.batch_tasks import (
     run_batch_rename,
     run_batch_audio_conversion,
@@ -33,12 +34,26 @@ async def create_batch_image_job(
     files: list[UploadFile] = File(...),
     target_format: str = Query(default="PNG"),
     quality: int = Query(default=90, ge=1, le=100),
+    resize_enabled: bool = Query(default=False),
+    width: int | None = Query(default=None, ge=1),
+    height: int | None = Query(default=None, ge=1),
+    resize_mode: str = Query(default=DEFAULT_RESIZE_MODE),
+    encoder_profile: str = Query(default=DEFAULT_ENCODER_PROFILE),
+    target_kb: int | None = Query(default=None, ge=1),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ) -> BatchJobCreateResponse:
     normalized_format = target_format.upper()
     if normalized_format not in IMAGE_FORMAT_MAP:
         raise HTTPException(status_code=400, detail="Unsupported image target format")
+    if resize_enabled and (width is None or height is None):
+        raise HTTPException(status_code=400, detail="Width and height are required when resize is enabled")
+    if resize_mode not in RESIZE_MODES:
+        raise HTTPException(status_code=400, detail="Unsupported resize mode")
+    if encoder_profile not in ENCODER_PROFILES:
+        raise HTTPException(status_code=400, detail="Unsupported encoder profile")
+    if target_kb is not None and IMAGE_FORMAT_MAP[normalized_format][0] not in QUALITY_FORMATS:
+        raise HTTPException(status_code=400, detail="Target file size is only supported for JPG and WEBP output")
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
 
@@ -47,13 +62,15 @@ async def create_batch_image_job(
     validator = UploadValidationService()
     await validator.validate_files(files, allowed_extensions=storage.settings.allowed_image_extensions)
     paths = await storage.persist_uploads(files)
+    await validator.validate_contents(paths, kind="image", display_names=[upload.filename for upload in files])
 
     job = job_service.create_job(
         job_type="batch_image",
         original_filename=f"{len(files)} files",
         stored_filename=paths[0].name,
-        input_path="\n".join(str(path) for path in paths),
+        input_path=str(paths[0]),
         user_id=current_user.id,
+        input_files=paths,
     )
 
     enqueue_job(
@@ -62,6 +79,12 @@ async def create_batch_image_job(
         [str(path) for path in paths],
         normalized_format,
         quality,
+        resize_enabled,
+        width,
+        height,
+        resize_mode,
+        encoder_profile,
+        target_kb,
         retry_max=1,
         job_type=job.job_type,
     )
@@ -77,12 +100,16 @@ async def create_batch_video_job(
     resize_enabled: bool = Query(default=False),
     width: int | None = Query(default=None, ge=1),
     height: int | None = Query(default=None, ge=1),
+    preset: str = Query(default=DEFAULT_VIDEO_PRESET),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> BatchJobCreateResponse:
     normalized_format = target_format.upper()
     if normalized_format not in VIDEO_FORMATS:
         raise HTTPException(status_code=400, detail="Unsupported video target format")
+    normalized_preset = preset.lower()
+    if normalized_preset not in VIDEO_PRESETS:
+        raise HTTPException(status_code=400, detail="Unsupported video preset")
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
     if resize_enabled and (width is None or height is None):
@@ -98,13 +125,15 @@ async def create_batch_video_job(
     validator = UploadValidationService()
     await validator.validate_files(files, allowed_extensions=storage.settings.allowed_video_extensions)
     paths = await storage.persist_uploads(files)
+    await validator.validate_contents(paths, kind="video", display_names=[upload.filename for upload in files])
 
     job = job_service.create_job(
         job_type="batch_video",
         original_filename=f"{len(files)} files",
         stored_filename=paths[0].name,
-        input_path="\n".join(str(path) for path in paths),
+        input_path=str(paths[0]),
         user_id=current_user.id,
+        input_files=paths,
     )
 
     enqueue_job(
@@ -116,6 +145,7 @@ async def create_batch_video_job(
         resize_enabled,
         normalized_width,
         normalized_height,
+        normalized_preset,
         job_timeout=storage.settings.queue_video_timeout,
         retry_max=1,
         job_type=job.job_type,
@@ -142,13 +172,15 @@ async def create_batch_document_job(
     validator = UploadValidationService()
     await validator.validate_files(files, allowed_extensions=storage.settings.allowed_document_extensions)
     paths = await storage.persist_uploads(files)
+    await validator.validate_contents(paths, kind="document", display_names=[upload.filename for upload in files])
 
     job = job_service.create_job(
         job_type="batch_document",
         original_filename=f"{len(files)} files",
         stored_filename=paths[0].name,
-        input_path="\n".join(str(path) for path in paths),
+        input_path=str(paths[0]),
         user_id=current_user.id,
+        input_files=paths,
     )
 
     enqueue_job(
@@ -169,6 +201,7 @@ async def create_batch_audio_job(
     files: list[UploadFile] = File(...),
     target_format: str = Query(default="MP3"),
     bitrate: str = Query(default="192k"),
+    normalize: bool = Query(default=False),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ) -> BatchJobCreateResponse:
@@ -185,13 +218,15 @@ async def create_batch_audio_job(
     validator = UploadValidationService()
     await validator.validate_files(files, allowed_extensions=storage.settings.allowed_audio_extensions)
     paths = await storage.persist_uploads(files)
+    await validator.validate_contents(paths, kind="audio", display_names=[upload.filename for upload in files])
 
     job = job_service.create_job(
         job_type="batch_audio",
         original_filename=f"{len(files)} files",
         stored_filename=paths[0].name,
-        input_path="\n".join(str(path) for path in paths),
+        input_path=str(paths[0]),
         user_id=current_user.id,
+        input_files=paths,
     )
 
     enqueue_job(
@@ -200,6 +235,7 @@ async def create_batch_audio_job(
         [str(path) for path in paths],
         normalized_format,
         bitrate,
+        normalize,
         retry_max=1,
         job_type=job.job_type,
     )
@@ -235,8 +271,9 @@ async def create_batch_rename_job(
         job_type="batch_rename",
         original_filename=f"{len(files)} files",
         stored_filename=paths[0].name,
-        input_path="\n".join(str(path) for path in paths),
+        input_path=str(paths[0]),
         user_id=current_user.id,
+        input_files=paths,
     )
 
     enqueue_job(
@@ -37,6 +37,7 @@ async def create_document_job(
 
     await validator.validate_file(file, allowed_extensions=storage_service.settings.allowed_document_extensions)
     input_path = await storage_service.persist_upload(file)
+    await validator.validate_content(input_path, kind="document", display_name=file.filename)
 
     job = job_service.create_job(
         job_type="document",
@@ -44,6 +45,7 @@ async def create_document_job(
         stored_filename=input_path.name,
         input_path=str(input_path),
         user_id=current_user.id,
+        input_files=[input_path],
     )
 
     enqueue_job(
@@ -7,30 +7,47 @@ from sqlalchemy.orm import Session
 from app.api.deps import get_current_user
 from app.core.constants import DEFAULT_FALLBACK_UPLOAD_FILENAME, DEFAULT_OUTPUT_FILE_SUFFIX, JOB_STATUS_COMPLETED, JOB_STATUS_QUEUED
 from app.db.session import get_db
-from app.schemas.image import ImageJobCreateResponse
+from app.schemas.image import ImageJobCreateResponse, ImageSetJobCreateResponse
 from app.schemas.job import JobResponse
-from app.services.image_service import IMAGE_FORMAT_MAP
+from app.services.image_encoders import DEFAULT_ENCODER_PROFILE, ENCODER_PROFILES, QUALITY_FORMATS
+from app.services.image_service import DEFAULT_RESIZE_MODE, ICO_SIZES, IMAGE_FORMAT_MAP, RESIZE_MODES
 from app.services.jobs import JobService
 from app.services.storage import StorageService
 from app.services.upload_validation import UploadValidationService
-from app.tasks.image_tasks import run_image_conversion
+from app.tasks.image_tasks import run_image_conversion, run_image_derivatives
 from app.worker import enqueue_job
 
 
 router = APIRouter(prefix="/image", tags=["image"])
 
+IMAGE_JOB_TYPES = {"image", "image_set"}
+
 
 @router.post("/jobs", response_model=ImageJobCreateResponse)
 async def create_image_job(
     file: UploadFile = File(...),
     target_format: str = Query(default="PNG"),
     quality: int = Query(default=90, ge=1, le=100),
+    resize_enabled: bool = Query(default=False),
+    width: int | None = Query(default=None, ge=1),
+    height: int | None = Query(default=None, ge=1),
+    resize_mode: str = Query(default=DEFAULT_RESIZE_MODE),
+    encoder_profile: str = Query(default=DEFAULT_ENCODER_PROFILE),
+    target_kb: int | None = Query(default=None, ge=1),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ) -> ImageJobCreateResponse:
     normalized_format = target_format.upper()
     if normalized_format not in IMAGE_FORMAT_MAP:
         raise HTTPException(status_code=400, detail="Unsupported image target format")
+    if resize_enabled and (width is None or height is None):
+        raise HTTPException(status_code=400, detail="Width and height are required when resize is enabled")
+    if resize_mode not in RESIZE_MODES:
+        raise HTTPException(status_code=400, detail="Unsupported resize mode")
+    if encoder_profile not in ENCODER_PROFILES:
+        raise HTTPException(status_code=400, detail="Unsupported encoder profile")
+    if target_kb is not None and IMAGE_FORMAT_MAP[normalized_format][0] not in QUALITY_FORMATS:
+        raise HTTPException(status_code=400, detail="Target file size is only supported for JPG and WEBP output")
 
     storage_service = StorageService()
     job_service = JobService(db)
@@ -39,6 +56,7 @@ async def create_image_job(
     await validator.validate_file(file, allowed_extensions=storage_service.settings.allowed_image_extensions)
 
     input_path = await storage_service.persist_upload(file)
+    await validator.validate_content(input_path, kind="image", display_name=file.filename)
 
     job = job_service.create_job(
         job_type="image",
@@ -46,27 +64,114 @@ async def create_image_job(
         stored_filename=input_path.name,
         input_path=str(input_path),
         user_id=current_user.id,
+        input_files=[input_path],
     )
 
-    enqueue_job(run_image_conversion, job.id, normalized_format, quality, retry_max=1, job_type=job.job_type)
+    enqueue_job(
+        run_image_conversion,
+        job.id,
+        normalized_format,
+        quality,
+        resize_enabled,
+        width,
+        height,
+        resize_mode,
+        encoder_profile,
+        target_kb,
+        retry_max=1,
+        job_type=job.job_type,
+    )
 
     return ImageJobCreateResponse(
         job_id=job.id,
         status=JOB_STATUS_QUEUED,
         target_format=normalized_format,
         quality=quality,
+        resize_enabled=resize_enabled,
+        width=width,
+        height=height,
+        resize_mode=resize_mode,
+        encoder_profile=encoder_profile,
+        target_kb=target_kb,
         original_filename=job.original_filename,
         output_filename=None,
         download_url=None,
     )
 
 
+@router.post("/derivatives/jobs", response_model=ImageSetJobCreateResponse)
+async def create_image_derivatives_job(
+    file: UploadFile = File(...),
+    widths: list[int] | None = Query(default=None),
+    target_formats: list[str] | None = Query(default=None),
+    ico_sizes: list[int] | None = Query(default=None),
+    quality: int = Query(default=90, ge=1, le=100),
+    encoder_profile: str = Query(default=DEFAULT_ENCODER_PROFILE),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+) -> ImageSetJobCreateResponse:
+    normalized_widths = sorted(set(widths or []), reverse=True)
+    normalized_formats = list(dict.fromkeys(fmt.upper() for fmt in (target_formats or ["WEBP"])))
+    normalized_ico_sizes = sorted(set(ico_sizes or []), reverse=True)
+    if any(width < 1 for width in normalized_widths):
+        raise HTTPException(status_code=400, detail="Widths must be positive")
+    if any(fmt not in IMAGE_FORMAT_MAP for fmt in normalized_formats):
+        raise HTTPException(status_code=400, detail="Unsupported image target format")
+    if any(size not in ICO_SIZES for size in normalized_ico_sizes):
+        raise HTTPException(status_code=400, detail=f"ICO sizes must be among {', '.join(map(str, ICO_SIZES))}")
+    if not normalized_widths and not normalized_ico_sizes:
+        raise HTTPException(status_code=400, detail="Pass at least one width or ICO size")
+    if encoder_profile not in ENCODER_PROFILES:
+        raise HTTPException(status_code=400, detail="Unsupported encoder profile")
+
+    storage_service = StorageService()
+    job_service = JobService(db)
+    validator = UploadValidationService()
+
+    await validator.validate_file(file, allowed_extensions=storage_service.settings.allowed_image_extensions)
+
+    input_path = await storage_service.persist_upload(file)
+    await validator.validate_content(input_path, kind="image", display_name=file.filename)
+
+    job = job_service.create_job(
+        job_type="image_set",
+        original_filename=file.filename or DEFAULT_FALLBACK_UPLOAD_FILENAME,
+        stored_filename=input_path.name,
+        input_path=str(input_path),
+        user_id=current_user.id,
+        input_files=[input_path],
+    )
+
+    enqueue_job(
+        run_image_derivatives,
+        job.id,
+        normalized_widths,
+        normalized_formats,
+        quality,
+        encoder_profile,
+        normalized_ico_sizes,
+        retry_max=1,
+        job_type=job.job_type,
+    )
+
+    return ImageSetJobCreateResponse(
+        job_id=job.id,
+        status=JOB_STATUS_QUEUED,
+        widths=normalized_widths,
+        target_formats=normalized_formats,
+        ico_sizes=normalized_ico_sizes,
+        quality=quality,
+        encoder_profile=encoder_profile,
+        original_filename=job.original_filename,
+    )
+
+
 @router.get("/jobs/{job_id}", response_model=JobResponse)
 def get_image_job(job_id: str, db: Session = Depends(get_db)) -> JobResponse:
     service = JobService(db)
     job = service.get_job(job_id)
 
-    if job is None or job.job_type != "image":
+    if job is None or job.job_type not in IMAGE_JOB_TYPES:
         raise HTTPException(status_code=404, detail="Image job not found")
 
     return job
@@ -77,12 +182,18 @@ def download_image_result(job_id: str, db: Session = Depends(get_db)) -> FileRes
     service = JobService(db)
     job = service.get_job(job_id)
 
-    if job is None or job.job_type != "image":
+    if job is None or job.job_type not in IMAGE_JOB_TYPES:
         raise HTTPException(status_code=404, detail="Image job not found")
 
-    if job.status != JOB_STATUS_COMPLETED or not job.output_path:
+    if job.status != JOB_STATUS_COMPLETED or not (job.output_path or job.bundle_path):
         raise HTTPException(status_code=409, detail="Image job is not ready for download")
 
+    if job.bundle_path:
+        bundle_path = Path(job.bundle_path)
+        if not bundle_path.exists():
+            raise HTTPException(status_code=404, detail="Converted bundle is missing")
+        return FileResponse(path=bundle_path, filename=job.output_filename or bundle_path.name)
+
     output_path = Path(job.output_path)
     if not output_path.exists():
         raise HTTPException(status_code=404, detail="Converted file is missing")
@@ -1,19 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
 from app.db.session import get_db
-from app.schemas.job import JobResponse
+from app.schemas.job import JobListItem, JobResponse
 from app.services.jobs import JobService
 
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
-@router.get("", response_model=list[JobResponse])
-def list_jobs(db: Session = Depends(get_db), current_user=Depends(get_current_user)) -> list[JobResponse]:
+@router.get("", response_model=list[JobListItem])
+def list_jobs(
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+    job_type: str | None = Query(default=None),
+    created_after: datetime | None = Query(default=None),
+    created_before: datetime | None = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+) -> list[JobListItem]:
     service = JobService(db)
-    return service.list_jobs(user_id=current_user.id, is_admin=current_user.is_admin)
+    try:
+        rows, next_cursor = service.list_job_page(
+            user_id=current_user.id,
+            is_admin=current_user.is_admin,
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            job_type=job_type,
+            created_after=created_after,
+            created_before=created_before,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 @router.post("/stop")
 def stop_user_jobs(db: Session = Depends(get_db), current_user=Depends(get_current_user)) -> dict[str, str]:
@@ -12,8 +12,15 @@ from app.schemas.video import VideoJobCreateResponse
 from app.services.jobs import JobService
 from app.services.storage import StorageService
 from app.services.upload_validation import UploadValidationService
-from app.services.video_service import VIDEO_FORMATS, normalize_resize_dimensions
-from app.tasks.video_tasks import run_video_conversion
+from app.services.video_service import (
+    DEFAULT_GIF_DITHER,
+    DEFAULT_VIDEO_PRESET,
+    GIF_DITHER_MODES,
+    VIDEO_FORMATS,
+    VIDEO_PRESETS,
+    normalize_resize_dimensions,
+)
+from app.tasks.video_tasks import run_video_conversion, run_video_multi_conversion
 from app.worker import enqueue_job
 
 
@@ -24,6 +31,7 @@ router = APIRouter(prefix="/video", tags=["video"])
 async def create_video_job(
     file: UploadFile = File(...),
     target_format: str = Query(default="MP4"),
+    target_formats: list[str] | None = Query(default=None),
     fps: int = Query(default=0, ge=0),
     resize_enabled: bool = Query(default=False),
     width: int | None = Query(default=None, ge=1),
@@ -33,12 +41,24 @@ async def create_video_job(
     trim_enabled: bool = Query(default=False),
     trim_start: float | None = Query(default=None, ge=0),
     trim_end: float | None = Query(default=None, ge=0),
+    preset: str = Query(default=DEFAULT_VIDEO_PRESET),
+    gif_max_width: int | None = Query(default=None, ge=16, le=1920),
+    gif_dither: str = Query(default=DEFAULT_GIF_DITHER),
+    gif_target_kb: int | None = Query(default=None, ge=16),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ) -> VideoJobCreateResponse:
-    normalized_format = target_format.upper()
-    if normalized_format not in VIDEO_FORMATS:
+    normalized_formats = list(dict.fromkeys(fmt.upper() for fmt in (target_formats or [target_format])))
+    if any(fmt not in VIDEO_FORMATS for fmt in normalized_formats):
         raise HTTPException(status_code=400, detail="Unsupported video target format")
+    normalized_format = normalized_formats[0]
+
+    normalized_preset = preset.lower()
+    if normalized_preset not in VIDEO_PRESETS:
+        raise HTTPException(status_code=400, detail="Unsupported video preset")
+
+    if gif_dither not in GIF_DITHER_MODES:
+        raise HTTPException(status_code=400, detail="Unsupported GIF dither mode")
 
     if resize_enabled and (width is None or height is None):
         raise HTTPException(status_code=400, detail="Width and height are required when resize is enabled")
@@ -61,6 +81,7 @@ async def create_video_job(
     await validator.validate_file(file, allowed_extensions=storage_service.settings.allowed_video_extensions)
 
     input_path = await storage_service.persist_upload(file)
+    await validator.validate_content(input_path, kind="video", display_name=file.filename)
 
     job = job_service.create_job(
         job_type="video",
@@ -68,30 +89,59 @@ async def create_video_job(
         stored_filename=input_path.name,
         input_path=str(input_path),
         user_id=current_user.id,
+        input_files=[input_path],
     )
 
-    enqueue_job(
-        run_video_conversion,
-        job.id,
-        normalized_format,
-        fps,
-        resize_enabled,
-        normalized_width,
-        normalized_height,
-        crop_x,
-        crop_y,
-        trim_enabled,
-        trim_start,
-        trim_end,
-        job_timeout=storage_service.settings.queue_video_timeout,
-        retry_max=1,
-        job_type=job.job_type,
-    )
+    if len(normalized_formats) > 1:
+        enqueue_job(
+            run_video_multi_conversion,
+            job.id,
+            normalized_formats,
+            fps,
+            resize_enabled,
+            normalized_width,
+            normalized_height,
+            crop_x,
+            crop_y,
+            trim_enabled,
+            trim_start,
+            trim_end,
+            normalized_preset,
+            gif_max_width,
+            gif_dither,
+            gif_target_kb,
+            job_timeout=storage_service.settings.queue_video_timeout,
+            retry_max=1,
+            job_type=job.job_type,
+        )
+    else:
+        enqueue_job(
+            run_video_conversion,
+            job.id,
+            normalized_format,
+            fps,
+            resize_enabled,
+            normalized_width,
+            normalized_height,
+            crop_x,
+            crop_y,
+            trim_enabled,
+            trim_start,
+            trim_end,
+            normalized_preset,
+            gif_max_width,
+            gif_dither,
+            gif_target_kb,
+            job_timeout=storage_service.settings.queue_video_timeout,
+            retry_max=1,
+            job_type=job.job_type,
+        )
 
     return VideoJobCreateResponse(
         job_id=job.id,
         status=JOB_STATUS_QUEUED,
         target_format=normalized_format,
+        target_formats=normalized_formats,
         fps=fps,
         resize_enabled=resize_enabled,
         width=normalized_width,
@@ -99,6 +149,7 @@ async def create_video_job(
         trim_enabled=trim_enabled,
         trim_start=trim_start,
         trim_end=trim_end,
+        preset=normalized_preset,
         original_filename=job.original_filename,
         output_filename=None,
         download_url=None,
@@ -124,9 +175,15 @@ def download_video_result(job_id: str, db: Session = Depends(get_db)) -> FileRes
     if job is None or job.job_type != "video":
         raise HTTPException(status_code=404, detail="Video job not found")
 
-    if job.status != JOB_STATUS_COMPLETED or not job.output_path:
+    if job.status != JOB_STATUS_COMPLETED or not (job.output_path or job.bundle_path):
         raise HTTPException(status_code=409, detail="Video job is not ready for download")
 
+    if job.bundle_path:
+        bundle_path = Path(job.bundle_path)
+        if not bundle_path.exists():
+            raise HTTPException(status_code=404, detail="Converted bundle is missing")
+        return FileResponse(path=bundle_path, filename=job.output_filename or bundle_path.name)
+
     output_path = Path(job.output_path)
     if not output_path.exists():
         raise HTTPException(status_code=404, detail="Converted file is missing")
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
@@ -12,24 +13,99 @@ from app.core.constants import DEFAULT_OUTPUT_FILE_SUFFIX, JOB_STATUS_COMPLETED,
 from app.core.security import create_download_token, decode_token
 from app.db.session import get_db
 from app.schemas.job import JobResponse
-from app.schemas.youtube import YouTubeAnalyzeRequest, YouTubeAnalyzeResponse, YouTubeDownloadTokenResponse, YouTubeJobCreateRequest, YouTubeJobCreateResponse
+from app.schemas.youtube import (
+    YouTubeAnalyzeJobCreateResponse,
+    YouTubeAnalyzeJobResponse,
+    YouTubeAnalyzeRequest,
+    YouTubeAnalyzeResponse,
+    YouTubeDownloadTokenResponse,
+    YouTubeJobCreateRequest,
+    YouTubeJobCreateResponse,
+    YouTubePlaylistPage,
+    YouTubePlaylistRequest,
+)
 from app.services.jobs import JobService
 from app.services.storage import StorageService
 from app.services.youtube_service import YouTubeService
-from app.tasks.youtube_tasks import run_youtube_download
+from app.tasks.youtube_tasks import analyze_executor, read_analysis_results, run_youtube_analysis, run_youtube_download
 from app.worker import enqueue_job
 
 
 router = APIRouter(prefix="/youtube", tags=["youtube"])
 
 
+def _job_label(urls: list[str]) -> str:
+    parsed = urlparse(urls[0])
+    first_video_id = parse_qs(parsed.query).get("v", [None])[0]
+    return first_video_id or Path(parsed.path).name or "youtube-download"
+
+
 @router.post("/analyze", response_model=YouTubeAnalyzeResponse)
-def analyze_youtube_urls(payload: YouTubeAnalyzeRequest, current_user=Depends(get_current_user)) -> YouTubeAnalyzeResponse:
+async def analyze_youtube_urls(payload: YouTubeAnalyzeRequest, current_user=Depends(get_current_user)) -> YouTubeAnalyzeResponse:
+    # Runs on the analysis pool, so slow extractions never tie up the threads other endpoints use.
     service = YouTubeService()
-    items = service.analyze_urls(payload.urls, payload.download_mode)
+    items = await asyncio.get_running_loop().run_in_executor(
+        analyze_executor(), service.analyze_urls, payload.urls, payload.download_mode
+    )
     return YouTubeAnalyzeResponse(items=items)
 
 
+@router.post("/playlist", response_model=YouTubePlaylistPage)
+async def list_youtube_playlist(payload: YouTubePlaylistRequest, current_user=Depends(get_current_user)) -> YouTubePlaylistPage:
+    service = YouTubeService()
+    if not service.is_playlist_url(payload.url):
+        raise HTTPException(status_code=400, detail="A YouTube playlist or channel URL is required")
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            analyze_executor(), service.list_playlist_page, payload.url.strip(), payload.start, payload.page_size
+        )
+    except Exception as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+@router.post("/analyze/jobs", response_model=YouTubeAnalyzeJobCreateResponse)
+def create_youtube_analyze_job(
+    payload: YouTubeAnalyzeRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+) -> YouTubeAnalyzeJobCreateResponse:
+    service = YouTubeService()
+    urls = service.normalize_urls(payload.urls)
+    if not urls:
+        raise HTTPException(status_code=400, detail="At least one valid YouTube URL is required")
+    try:
+        normalized_mode = service.validate_mode(payload.download_mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    job = JobService(db).create_job(
+        job_type="youtube_analyze",
+        original_filename=_job_label(urls),
+        stored_filename=StorageService().build_virtual_input_name("youtube_analyze", "txt"),
+        input_path="\n".join(urls),
+        user_id=current_user.id,
+    )
+    analyze_executor().submit(run_youtube_analysis, job.id, urls, normalized_mode)
+    return YouTubeAnalyzeJobCreateResponse(job_id=job.id, status=JOB_STATUS_QUEUED, item_count=len(urls))
+
+
+@router.get("/analyze/jobs/{job_id}", response_model=YouTubeAnalyzeJobResponse)
+def get_youtube_analyze_job(job_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)) -> YouTubeAnalyzeJobResponse:
+    job = JobService(db).get_job(job_id)
+    if job is None or job.job_type != "youtube_analyze":
+        raise HTTPException(status_code=404, detail="YouTube analysis not found")
+    if job.user_id != current_user.id and not getattr(current_user, "is_admin", False):
+        raise HTTPException(status_code=403, detail="Not allowed to access this job")
+    return YouTubeAnalyzeJobResponse(
+        job_id=job.id,
+        status=job.status,
+        progress=job.progress,
+        progress_detail=job.progress_detail,
+        error_message=job.error_message,
+        items=read_analysis_results(job.id, job.input_path.split("\n")),
+    )
+
+
 @router.post("/jobs", response_model=YouTubeJobCreateResponse)
 def create_youtube_job(
     payload: YouTubeJobCreateRequest,
@@ -45,9 +121,7 @@ def create_youtube_job(
     normalized_audio_format = service.validate_audio_format(payload.audio_format)
     job_service = JobService(db)
     storage_service = StorageService()
-    parsed = urlparse(urls[0])
-    first_video_id = parse_qs(parsed.query).get("v", [None])[0]
-    label = first_video_id or Path(parsed.path).name or "youtube-download"
+    label = _job_label(urls)
     job_type = "youtube_batch" if len(urls) > 1 else "youtube"
     job = job_service.create_job(
         job_type=job_type,
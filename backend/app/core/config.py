@@ -28,6 +28,8 @@ class Settings(BaseSettings):
     output_dir: Path = DATA_DIR / "outputs"
     temp_dir: Path = DATA_DIR / "temp"
     max_upload_size_mb: int = 250
+    upload_content_validation: bool = True
+    upload_probe_timeout_seconds: int = 10
     allowed_image_extensions: list[str] = Field(default_factory=lambda: [".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif", ".tiff", ".ico"])
     allowed_audio_extensions: list[str] = Field(default_factory=lambda: [".mp3", ".wav", ".flac", ".ogg", ".m4a", ".aac", ".wma", ".opus", ".aiff", ".aif"])
     allowed_video_extensions: list[str] = Field(default_factory=lambda: [".mp4", ".mov", ".mkv", ".avi", ".webm", ".gif", ".wmv", ".flv"])
@@ -37,6 +39,25 @@ class Settings(BaseSettings):
     queue_document_timeout: str = "60m"
     queue_result_ttl_seconds: int = 86400
     queue_failure_ttl_seconds: int = 604800
+    encoder_threads: int = 0
+    image_batch_workers: int = 0
+    image_batch_memory_mb: int = 1024
+    audio_batch_workers: int = 0
+    audio_batch_headroom_cpus: int = 1
+    image_max_pixels: int = 100_000_000
+    image_tiled_max_pixels: int = 1_000_000_000
+    image_strip_pixels: int = 16_000_000
+    video_segment_enabled: bool = True
+    video_segment_min_seconds: int = 120
+    video_segment_max_count: int = 8
+    youtube_download_concurrency: int = 3
+    youtube_fragment_concurrency: int = 4
+    youtube_info_cache_ttl_seconds: int = 3600
+    youtube_analyze_concurrency: int = 8
+    youtube_analyze_timeout_seconds: int = 20
+    youtube_analyze_workers: int = 4
+    # Analyses live in one API process's executor; one silent this long was lost with it.
+    youtube_analyze_stale_after_seconds: int = 600
     worker_heartbeat_interval_seconds: int = 5
     worker_offline_threshold_seconds: int = 15
     worker_scale_enabled: bool = True
@@ -47,6 +68,12 @@ class Settings(BaseSettings):
     worker_min_count: int = 1
     worker_max_count: int = 8
     worker_target_default: int = 2
+    file_catalog_reconcile_interval_seconds: int = 300
+    cleanup_interval_seconds: int = 3600
+    cleanup_finished_after_hours: int = 24
+    cleanup_stale_after_hours: int = 6
+    cleanup_batch_size: int = 200
+    storage_quota_mb: int = 0
 
     secret_key: str = "bambam-super-secret-key-change-this-in-production"
     algorithm: str = "HS256"
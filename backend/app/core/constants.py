@@ -18,6 +18,8 @@ DEFAULT_FALLBACK_UPLOAD_FILENAME = "upload.bin"
 DEFAULT_WORKER_STATUS_KEY = "worker_status"
 DEFAULT_WORKER_TARGET_COUNT_KEY = "worker_target_count"
 DEFAULT_WORKER_SCALE_LOCK_KEY = "worker_scale_lock"
+YOUTUBE_INFO_CACHE_PREFIX = "youtube_info:"
+PERIODIC_TASK_LOCK_PREFIX = "periodic_task_lock:"
 
 DEFAULT_WORKER_SCALE_COMMAND = "docker-compose"
 DEFAULT_WORKER_COMPOSE_FILENAMES = ("docker-compose.yml", "docker-compose.yaml")
@@ -42,8 +44,15 @@ JOB_STATUS_PROCESSING = "processing"
 JOB_STATUS_COMPLETED = "completed"
 JOB_STATUS_FAILED = "failed"
 
+JOB_FILE_ROLE_INPUT = "input"
+JOB_FILE_ROLE_OUTPUT = "output"
+JOB_FILE_ROLE_BUNDLE = "bundle"
+
+FILE_SOURCE_UPLOADS = "uploads"
+FILE_SOURCE_OUTPUTS = "outputs"
+FILE_CATALOG_SORT_FIELDS = ("modified_at", "size", "name")
+
 YOUTUBE_DOWNLOAD_MODES = ("video", "audio")
 YOUTUBE_VIDEO_QUALITY_ORDER = ("144p", "240p", "360p", "480p", "720p", "1080p", "1440p", "2160p")
 YOUTUBE_AUDIO_FORMATS = ("mp3", "m4a", "wav")
 YOUTUBE_AUDIO_QUALITY_ORDER = ("64k", "128k", "192k", "256k", "320k", "best")
-
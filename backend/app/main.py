@@ -9,8 +9,13 @@ from app.core.security import get_password_hash
 from app.db.base import Base
 from app.db.session import engine, SessionLocal
 from app.models.job import Job
+from app.models.job_file import JobFile
+from app.models.stored_file import StoredFile, StoredFileDir
 from app.models.user import User
 from app.models.bot_settings import BotSettings
+from app.services.cleanup_service import CleanupService, start_cleanup_scheduler
+from app.services.file_catalog import start_file_catalog_reconciler
+from app.services.jobs import JobService
 
 settings = get_settings()
 
@@ -26,6 +31,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(api_router)
@@ -58,6 +64,14 @@ def on_startup() -> None:
         except Exception:
             db.rollback()
 
+        # create_all() does not add indexes to tables that already exist
+        for index in Job.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+        JobService(db).backfill_job_files()
+        # Analyses run in the API process, so a restart loses any that were in flight.
+        CleanupService(db).fail_orphaned_analyses()
+
         if db.query(User).count() == 0:
             admin_user = User(
                 id=uuid.uuid4().hex,
@@ -69,3 +83,6 @@ def on_startup() -> None:
             db.commit()
     finally:
         db.close()
+
+    start_file_catalog_reconciler(SessionLocal)
+    start_cleanup_scheduler(SessionLocal)
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class StoredFile(Base):
+    """Catalog entry for a file under the uploads or outputs root."""
+
+    __tablename__ = "stored_files"
+    __table_args__ = (
+        UniqueConstraint("source", "relative_path", name="uq_stored_files_source_path"),
+        Index("ix_stored_files_source_mtime", "source", "mtime"),
+        Index("ix_stored_files_source_size", "source", "size"),
+        Index("ix_stored_files_source_parent", "source", "parent"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    source: Mapped[str] = mapped_column(String(20))
+    relative_path: Mapped[str] = mapped_column(Text)
+    parent: Mapped[str] = mapped_column(Text, default="")
+    name: Mapped[str] = mapped_column(String(255))
+    size: Mapped[int] = mapped_column(BigInteger, default=0)
+    mtime: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    job_id: Mapped[str | None] = mapped_column(String(36), nullable=True, index=True)
+    user_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+
+
+class StoredFileDir(Base):
+    """Last seen mtime of a catalogued directory; lets the reconciler skip unchanged ones."""
+
+    __tablename__ = "stored_file_dirs"
+    __table_args__ = (
+        UniqueConstraint("source", "relative_path", name="uq_stored_file_dirs_source_path"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    source: Mapped[str] = mapped_column(String(20))
+    relative_path: Mapped[str] = mapped_column(Text)
+    mtime_ns: Mapped[int] = mapped_column(BigInteger)
@@ -5,6 +5,7 @@ class AudioJobCreateResponse(BaseModel):
     job_id: str
     status: str
     target_format: str
+    target_formats: list[str] = Field(default_factory=list)
     bitrate: str
     original_filename: str
     output_filename: str | None = None
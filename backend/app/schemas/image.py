@@ -6,11 +6,34 @@ class ImageJobCreateResponse(BaseModel):
     status: str
     target_format: str
     quality: int
+    resize_enabled: bool = False
+    width: int | None = None
+    height: int | None = None
+    resize_mode: str = "fit_pad"
+    encoder_profile: str = "balanced"
+    target_kb: int | None = None
     original_filename: str
     output_filename: str | None = None
     download_url: str | None = None
 
 
+class ImageSetJobCreateResponse(BaseModel):
+    job_id: str
+    status: str
+    widths: list[int] = Field(default_factory=list)
+    target_formats: list[str] = Field(default_factory=list)
+    ico_sizes: list[int] = Field(default_factory=list)
+    quality: int
+    encoder_profile: str = "balanced"
+    original_filename: str
+
+
 class ImageJobRequest(BaseModel):
     target_format: str = Field(default="PNG")
     quality: int = Field(default=90, ge=1, le=100)
+    resize_enabled: bool = Field(default=False)
+    width: int | None = Field(default=None, ge=1)
+    height: int | None = Field(default=None, ge=1)
+    resize_mode: str = Field(default="fit_pad")
+    encoder_profile: str = Field(default="balanced")
+    target_kb: int | None = Field(default=None, ge=1)
@@ -21,3 +21,20 @@ class JobResponse(BaseModel):
     model_config = {
         "from_attributes": True,
     }
+
+
+class JobListItem(BaseModel):
+    id: str
+    job_type: str
+    status: str
+    original_filename: str
+    output_filename: str | None
+    error_message: str | None
+    progress: int
+    progress_detail: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {
+        "from_attributes": True,
+    }
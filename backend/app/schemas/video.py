@@ -5,6 +5,7 @@ class VideoJobCreateResponse(BaseModel):
     job_id: str
     status: str
     target_format: str
+    target_formats: list[str] = Field(default_factory=list)
     fps: int
     resize_enabled: bool
     width: int | None = None
@@ -12,6 +13,7 @@ class VideoJobCreateResponse(BaseModel):
     trim_enabled: bool = False
     trim_start: float | None = None
     trim_end: float | None = None
+    preset: str = "balanced"
     original_filename: str
     output_filename: str | None = None
     download_url: str | None = None
@@ -26,3 +28,4 @@ class VideoJobRequest(BaseModel):
     trim_enabled: bool = Field(default=False)
     trim_start: float | None = Field(default=None, ge=0)
     trim_end: float | None = Field(default=None, ge=0)
+    preset: str = Field(default="balanced")
@@ -29,6 +29,43 @@ class YouTubeAnalyzeResponse(BaseModel):
     items: list[YouTubeAnalysisItem]
 
 
+class YouTubeAnalyzeJobCreateResponse(BaseModel):
+    job_id: str
+    status: str
+    item_count: int
+
+
+class YouTubeAnalyzeJobResponse(BaseModel):
+    job_id: str
+    status: str
+    progress: int = 0
+    progress_detail: str | None = None
+    error_message: str | None = None
+    items: list[YouTubeAnalysisItem]
+
+
+class YouTubePlaylistRequest(BaseModel):
+    url: str
+    start: int = Field(default=1, ge=1)
+    page_size: int = Field(default=50, ge=1, le=200)
+
+
+class YouTubePlaylistEntry(BaseModel):
+    index: int
+    url: str
+    title: str | None = None
+    duration_seconds: int | None = None
+    thumbnail_url: str | None = None
+
+
+class YouTubePlaylistPage(BaseModel):
+    url: str
+    title: str | None = None
+    total_count: int | None = None
+    entries: list[YouTubePlaylistEntry]
+    next_start: int | None = None
+
+
 class YouTubeJobCreateRequest(BaseModel):
     urls: list[str] = Field(min_length=1)
     download_mode: str = Field(default="video")
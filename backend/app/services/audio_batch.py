@@ -0,0 +1,61 @@
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+from app.core.config import get_settings
+from app.services.encoder_budget import cpus_per_worker
+from app.services.media_probe import MediaProbeService
+
+
+def audio_batch_workers() -> int:
+    """Concurrent ffmpeg processes for one batch: this worker's CPUs minus some headroom.
+
+    Audio encoders are single-threaded, so each process gets one thread and the batch gets
+    the cores instead.
+    """
+    settings = get_settings()
+    if settings.audio_batch_workers > 0:
+        return settings.audio_batch_workers
+    return max(1, cpus_per_worker() - settings.audio_batch_headroom_cpus)
+
+
+def longest_first(paths: Sequence[Path], probe: MediaProbeService | None = None) -> list[int]:
+    """Indices of paths, longest duration first; files ffprobe cannot time go last, biggest first."""
+    probe = probe or MediaProbeService()
+
+    def weight(index: int) -> tuple[float, int]:
+        try:
+            duration = probe.duration(paths[index]) or 0.0
+        except Exception:
+            duration = 0.0
+        try:
+            size = paths[index].stat().st_size
+        except OSError:
+            size = 0
+        return duration, size
+
+    return sorted(range(len(paths)), key=weight, reverse=True)
+
+
+def run_longest_first(
+    func: Callable[..., Any],
+    items: Sequence[dict[str, Any]],
+    *,
+    order: Sequence[int],
+    max_workers: int,
+) -> Iterator[tuple[int, Any]]:
+    """Run func(**item) on a thread pool, starting items in order, and yield (index, result) as each finishes.
+
+    Threads are enough: the work happens in ffmpeg subprocesses. Starting the longest files
+    first keeps one long track from running alone at the end of the batch. The first failure
+    cancels what has not started yet and is re-raised.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(func, **items[index]): index for index in order}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
@@ -2,10 +2,27 @@ import os
 import subprocess
 from pathlib import Path
 
+from app.services.encoder_budget import encoder_thread_budget
+from app.services.loudness import DEFAULT_SAMPLE_RATE, LoudnessService, is_normalizable, normalize_filter
+from app.services.media_probe import MediaProbeService, probe_streams
 
 AUDIO_FORMATS = {"MP3", "WAV", "FLAC", "OGG", "M4A", "AAC", "WMA", "OPUS", "AIFF"}
 AUDIO_BITRATES = {"128k", "192k", "256k", "320k"}
 
+# Source codecs each target container can take as they are (-c:a copy).
+COPY_CODECS = {
+    "MP3": {"mp3"},
+    "AAC": {"aac"},
+    "M4A": {"aac", "alac"},
+    "OGG": {"vorbis", "opus"},
+    "OPUS": {"opus"},
+    "FLAC": {"flac"},
+    "WAV": {"pcm_s16le", "pcm_s24le", "pcm_f32le"},
+    "AIFF": {"pcm_s16be"},
+    "WMA": {"wmav2"},
+}
+LOSSLESS_FORMATS = {"FLAC", "WAV", "AIFF"}
+
 
 def get_ffmpeg_cmd() -> list[str]:
     exe = "ffmpeg.exe" if os.name == "nt" else "ffmpeg"
@@ -16,8 +33,111 @@ def get_ffmpeg_cmd() -> list[str]:
     return ["ffmpeg"]
 
 
+def audio_codec_args(ext: str, bitrate: str) -> list[str]:
+    args = ["-b:a", bitrate]
+    if ext == "wma":
+        args += ["-c:a", "wmav2"]
+    elif ext == "opus":
+        args += ["-c:a", "libopus"]
+    elif ext == "aiff":
+        args += ["-c:a", "pcm_s16be"]
+    return args
+
+
+def _validate(target_format: str, bitrate: str) -> str:
+    normalized_format = target_format.upper()
+
+    if normalized_format not in AUDIO_FORMATS:
+        raise ValueError(f"Unsupported target format: {target_format}")
+
+    if bitrate not in AUDIO_BITRATES:
+        raise ValueError(f"Unsupported bitrate: {bitrate}")
+    return normalized_format
+
+
+def _input_args(
+    source_path: Path,
+    *,
+    trim_enabled: bool,
+    trim_start: float | None,
+    trim_end: float | None,
+    threads: int | None,
+) -> list[str]:
+    if trim_enabled:
+        if trim_start is None or trim_end is None:
+            raise ValueError("trim_start and trim_end are required when trim is enabled")
+        if trim_end <= trim_start:
+            raise ValueError("trim_end must be greater than trim_start")
+
+    cmd = get_ffmpeg_cmd() + ["-y"]
+
+    # Input-side -ss/-t so the decoder stops at trim_end for every output.
+    if trim_enabled and trim_start is not None and trim_end is not None:
+        cmd += ["-ss", f"{trim_start}", "-t", f"{trim_end - trim_start}"]
+
+    cmd += ["-threads", str(threads or encoder_thread_budget()), "-i", str(source_path)]
+    return cmd
+
+
+def _source_audio_stream(source_path: Path) -> dict | None:
+    try:
+        streams = probe_streams(MediaProbeService().probe(source_path), "audio")
+    except Exception:
+        return None
+    return streams[0] if streams else None
+
+
+def _source_sample_rate(source_path: Path) -> int:
+    try:
+        return int(_source_audio_stream(source_path)["sample_rate"])
+    except (TypeError, KeyError, ValueError):
+        return DEFAULT_SAMPLE_RATE
+
+
+def can_stream_copy(stream: dict | None, target_format: str, bitrate: str) -> bool:
+    """True when the source audio can be remuxed into target_format without re-encoding.
+
+    Lossy sources are only copied when they are not above the requested bitrate (or report
+    none, as in many MKV/WebM files); copying never makes a file bigger than asked for.
+    """
+    if stream is None or stream.get("codec_name") not in COPY_CODECS.get(target_format, ()):
+        return False
+    if target_format in LOSSLESS_FORMATS:
+        return True
+    try:
+        source_bitrate = int(stream["bit_rate"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return source_bitrate <= int(bitrate.rstrip("k")) * 1000 * 1.05
+
+
+def _copy_args(source_path: Path, target_format: str, bitrate: str, filter_args: list[str]) -> list[str] | None:
+    """Stream-copy arguments when the output needs no filtering and the source codec fits, else None."""
+    if filter_args or not can_stream_copy(_source_audio_stream(source_path), target_format, bitrate):
+        return None
+    # Mapping only the audio stream also extracts it from video containers.
+    return ["-map", "0:a:0", "-c:a", "copy"]
+
+
+def _normalize_args(
+    source_path: Path,
+    input_cmd: list[str],
+    *,
+    trim_enabled: bool,
+    trim_start: float | None,
+    trim_end: float | None,
+) -> list[str]:
+    """Second loudnorm pass; the first (measuring) pass comes from the cache when this content was seen before."""
+    window = (trim_start, trim_end) if trim_enabled else None
+    measured = LoudnessService().measure(input_cmd, source_path, window=window)
+    if not is_normalizable(measured):
+        # Nothing to normalize (silence); convert as if normalization was off.
+        return []
+    return ["-af", normalize_filter(measured), "-ar", str(_source_sample_rate(source_path))]
+
+
 class AudioConversionService:
-    def convert(
+    def build_command(
         self,
         *,
         source_path: Path,
@@ -27,45 +147,111 @@ class AudioConversionService:
         trim_enabled: bool = False,
         trim_start: float | None = None,
         trim_end: float | None = None,
-    ) -> Path:
-        normalized_format = target_format.upper()
-
-        if normalized_format not in AUDIO_FORMATS:
-            raise ValueError(f"Unsupported target format: {target_format}")
-
-        if bitrate not in AUDIO_BITRATES:
-            raise ValueError(f"Unsupported bitrate: {bitrate}")
-
-        if trim_enabled:
-            if trim_start is None or trim_end is None:
-                raise ValueError("trim_start and trim_end are required when trim is enabled")
-            if trim_end <= trim_start:
-                raise ValueError("trim_end must be greater than trim_start")
-
-        cmd = get_ffmpeg_cmd() + ["-y"]
-
-        if trim_enabled and trim_start is not None:
-            cmd += ["-ss", f"{trim_start}"]
-
-        cmd += ["-i", str(source_path)]
+        threads: int | None = None,
+        normalize: bool = False,
+    ) -> list[str]:
+        normalized_format = _validate(target_format, bitrate)
+        cmd = _input_args(
+            source_path,
+            trim_enabled=trim_enabled,
+            trim_start=trim_start,
+            trim_end=trim_end,
+            threads=threads,
+        )
+        filter_args: list[str] = []
+        if normalize:
+            filter_args = _normalize_args(source_path, cmd, trim_enabled=trim_enabled, trim_start=trim_start, trim_end=trim_end)
+        copy_args = _copy_args(source_path, normalized_format, bitrate, filter_args)
+        cmd += copy_args or filter_args + audio_codec_args(normalized_format.lower(), bitrate)
+        cmd += [str(output_path)]
+        return cmd
 
-        if trim_enabled and trim_end is not None and trim_start is not None:
-            cmd += ["-to", f"{trim_end - trim_start}"]
+    def build_multi_command(
+        self,
+        *,
+        source_path: Path,
+        outputs: list[tuple[str, Path]],
+        bitrate: str,
+        trim_enabled: bool = False,
+        trim_start: float | None = None,
+        trim_end: float | None = None,
+        threads: int | None = None,
+        normalize: bool = False,
+    ) -> list[str]:
+        """One ffmpeg run, one decode: every output maps the same decoded audio stream."""
+        if not outputs:
+            raise ValueError("At least one target format is required")
 
-        ext = normalized_format.lower()
-        cmd += ["-b:a", bitrate]
+        cmd = _input_args(
+            source_path,
+            trim_enabled=trim_enabled,
+            trim_start=trim_start,
+            trim_end=trim_end,
+            threads=threads,
+        )
+        filter_args: list[str] = []
+        if normalize:
+            filter_args = _normalize_args(source_path, cmd, trim_enabled=trim_enabled, trim_start=trim_start, trim_end=trim_end)
+        for target_format, output_path in outputs:
+            normalized_format = _validate(target_format, bitrate)
+            copy_args = _copy_args(source_path, normalized_format, bitrate, filter_args)
+            cmd += copy_args or ["-map", "0:a:0"] + filter_args + audio_codec_args(normalized_format.lower(), bitrate)
+            cmd += [str(output_path)]
+        return cmd
 
-        if ext == "wma":
-            cmd += ["-c:a", "wmav2"]
-        elif ext == "opus":
-            cmd += ["-c:a", "libopus"]
-        elif ext == "aiff":
-            cmd += ["-c:a", "pcm_s16be"]
+    def convert(
+        self,
+        *,
+        source_path: Path,
+        output_path: Path,
+        target_format: str,
+        bitrate: str,
+        trim_enabled: bool = False,
+        trim_start: float | None = None,
+        trim_end: float | None = None,
+        threads: int | None = None,
+        normalize: bool = False,
+    ) -> Path:
+        cmd = self.build_command(
+            source_path=source_path,
+            output_path=output_path,
+            target_format=target_format,
+            bitrate=bitrate,
+            trim_enabled=trim_enabled,
+            trim_start=trim_start,
+            trim_end=trim_end,
+            threads=threads,
+            normalize=normalize,
+        )
+        self.run(cmd)
+        return output_path
 
-        cmd += [str(output_path)]
+    def convert_many(
+        self,
+        *,
+        source_path: Path,
+        outputs: list[tuple[str, Path]],
+        bitrate: str,
+        trim_enabled: bool = False,
+        trim_start: float | None = None,
+        trim_end: float | None = None,
+        threads: int | None = None,
+        normalize: bool = False,
+    ) -> list[Path]:
+        cmd = self.build_multi_command(
+            source_path=source_path,
+            outputs=outputs,
+            bitrate=bitrate,
+            trim_enabled=trim_enabled,
+            trim_start=trim_start,
+            trim_end=trim_end,
+            threads=threads,
+            normalize=normalize,
+        )
+        self.run(cmd)
+        return [output_path for _, output_path in outputs]
 
+    def run(self, cmd: list[str]) -> None:
         result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         if result.returncode != 0:
             raise RuntimeError(result.stderr or "FFmpeg audio conversion error")
-
-        return output_path
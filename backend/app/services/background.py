@@ -0,0 +1,62 @@
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable
+
+from redis import Redis
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.constants import PERIODIC_TASK_LOCK_PREFIX
+
+
+logger = logging.getLogger(__name__)
+
+
+def acquire_cycle_lock(name: str, ttl_seconds: int, connection: Redis | None = None) -> bool:
+    """Claim this interval's run of `name` across every API process (SET NX EX).
+
+    The key is left to expire rather than released, so however many processes run the
+    scheduler the task runs once per interval. Without Redis every process runs it, as before.
+    """
+    try:
+        if connection is None:
+            connection = Redis.from_url(get_settings().redis_url, socket_connect_timeout=2, socket_timeout=2)
+        return bool(connection.set(PERIODIC_TASK_LOCK_PREFIX + name, uuid.uuid4().hex, nx=True, ex=ttl_seconds))
+    except Exception:
+        logger.warning("Could not take the %s lock; running without it", name, exc_info=True)
+        return True
+
+
+def start_periodic_task(
+    name: str,
+    interval_seconds: int,
+    task: Callable[[Session], object],
+    session_factory: Callable[[], Session],
+) -> threading.Thread | None:
+    """Call `task(db)` on a daemon thread every `interval_seconds` with a fresh session.
+
+    Each cycle is skipped when another process already holds the cycle lock.
+    Returns None without starting anything when the interval is 0 or negative.
+    """
+    if interval_seconds <= 0:
+        return None
+
+    def _loop() -> None:
+        while True:
+            time.sleep(interval_seconds)
+            if not acquire_cycle_lock(name, interval_seconds):
+                continue
+            db = session_factory()
+            try:
+                task(db)
+            except Exception:
+                db.rollback()
+                logger.exception("Periodic task %s failed", name)
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=_loop, name=name, daemon=True)
+    thread.start()
+    return thread
@@ -1,75 +1,203 @@
+import shutil
+import threading
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
 
-from sqlalchemy import select
-from app.models.job import Job
 from app.core.config import get_settings
-from app.services.jobs import JobService
+from app.core.constants import JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, JOB_STATUS_PROCESSING, JOB_STATUS_QUEUED
+from app.models.job import Job
+from app.models.job_file import JobFile
+from app.models.stored_file import StoredFile
+from app.services.background import start_periodic_task
+from app.services.file_catalog import FileCatalogService
+from app.services.loudness import LoudnessService
+from app.services.media_probe import MediaProbeService
+
+
+FINISHED_STATUSES = (JOB_STATUS_COMPLETED, JOB_STATUS_FAILED)
+PENDING_STATUSES = (JOB_STATUS_QUEUED, JOB_STATUS_PROCESSING)
 
 
 class CleanupService:
-    def __init__(self, db: Session) -> None:
+    """Removes finished jobs and their artifacts in bounded, bulk-deleted chunks."""
+
+    def __init__(self, db: Session, *, batch_size: int | None = None) -> None:
         self.db = db
         self.settings = get_settings()
-        self.job_service = JobService(db)
+        self.batch_size = max(1, batch_size or self.settings.cleanup_batch_size)
+        self.catalog = FileCatalogService(db)
+        self._roots = [self.settings.output_dir.resolve(), self.settings.upload_dir.resolve()]
 
     def cleanup_finished_jobs(self, older_than_hours: int = 24, user_id: str | None = None) -> int:
         """
         Remove completed or failed jobs older than X hours.
         If user_id is provided, only removes jobs for that user.
-        Deletes files (outputs, bundles) and the database records.
+        Deletes every artifact (inputs, outputs, bundles, job dirs) and the database records.
         """
         cutoff = datetime.now(timezone.utc) - timedelta(hours=older_than_hours)
-        query = select(Job).where(
-            Job.status.in_(["completed", "failed"]),
-            Job.updated_at <= cutoff
-        )
+        query = select(Job.id).where(Job.status.in_(FINISHED_STATUSES), Job.updated_at <= cutoff)
         if user_id:
             query = query.where(Job.user_id == user_id)
-            
-        jobs_to_delete = self.db.scalars(query).all()
+
         deleted = 0
+        while True:
+            job_ids = list(self.db.scalars(query.order_by(Job.updated_at).limit(self.batch_size)).all())
+            if not job_ids:
+                return deleted
+            deleted += self._purge_jobs(job_ids)
 
-        for job in jobs_to_delete:
-            for path_value in [job.input_path, job.output_path]:
-                if not path_value:
-                    continue
-                path = Path(path_value)
-                if path.exists() and path.is_file():
-                    path.unlink(missing_ok=True)
+    def cleanup_stale_pending_files(self, *, older_than_hours: int = 6) -> int:
+        """Fail queued/processing jobs that stopped updating and delete their inputs."""
+        threshold = datetime.now(timezone.utc) - timedelta(hours=older_than_hours)
+        query = (
+            select(Job.id, Job.job_type, Job.input_path)
+            .where(Job.status.in_(PENDING_STATUSES), Job.updated_at < threshold)
+            .order_by(Job.updated_at)
+            .limit(self.batch_size)
+        )
+        cleaned = 0
 
-            if job.output_path:
-                output_parent = Path(job.output_path).parent
-                if output_parent.exists() and output_parent.is_dir() and output_parent != self.settings.output_dir:
-                    try:
-                        output_parent.rmdir()
-                    except OSError:
-                        pass
+        while True:
+            rows = self.db.execute(query).all()
+            if not rows:
+                return cleaned
+            job_ids = [job_id for job_id, _, _ in rows]
+            paths = self._registered_paths(job_ids, role="input")
+            legacy_ids = self._jobs_without_files(job_ids)
+            for job_id, job_type, input_path in rows:
+                if job_id in legacy_ids:
+                    paths.update(self._legacy_input_paths(job_type, input_path))
+            cleaned += sum(1 for path in paths if self._remove_file(path))
 
-            self.job_service.delete_job(job)
-            deleted += 1
+            self.db.execute(
+                update(Job)
+                .where(Job.id.in_(job_ids))
+                .values(status=JOB_STATUS_FAILED, error_message="Cleaned as stale pending job")
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
 
-        return deleted
+    def fail_orphaned_analyses(self, *, older_than_seconds: int | None = None) -> int:
+        """Fail youtube_analyze jobs whose API process went away (restart, crash) mid-analysis.
 
-    def cleanup_stale_pending_files(self, *, older_than_hours: int = 6) -> int:
-        threshold = datetime.utcnow() - timedelta(hours=older_than_hours)  # noqa: DTZ003
-        jobs = self.job_service.list_jobs()
-        cleaned = 0
+        They never reach RQ, so nothing else would move them out of queued/processing.
+        """
+        if older_than_seconds is None:
+            older_than_seconds = self.settings.youtube_analyze_stale_after_seconds
+        threshold = datetime.now(timezone.utc) - timedelta(seconds=older_than_seconds)
+        result = self.db.execute(
+            update(Job)
+            .where(Job.job_type == "youtube_analyze", Job.status.in_(PENDING_STATUSES), Job.updated_at < threshold)
+            .values(
+                status=JOB_STATUS_FAILED,
+                error_message="Analysis was interrupted; analyze the links again",
+                progress_detail="Failed",
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount or 0
 
-        for job in jobs:
-            if job.updated_at >= threshold or job.status not in {"queued", "processing"}:
-                continue
+    def enforce_quota(self, quota_bytes: int | None = None) -> int:
+        """Evict the oldest finished jobs until stored files fit in the quota. Returns jobs evicted."""
+        if quota_bytes is None:
+            quota_bytes = self.settings.storage_quota_mb * 1024 * 1024
+        if quota_bytes <= 0:
+            return 0
 
-            input_path = Path(job.input_path)
-            if input_path.exists() and input_path.is_file():
-                input_path.unlink(missing_ok=True)
-                cleaned += 1
+        # Totals come from the catalog kept current by the periodic reconciler and by
+        # register()/unregister(); only a source that was never scanned is walked here.
+        for source in self.catalog.roots():
+            if self.catalog.is_empty(source):
+                self.catalog.reconcile(source)
+        evicted = 0
+        query = select(Job.id).where(Job.status.in_(FINISHED_STATUSES)).order_by(Job.updated_at).limit(self.batch_size)
+        while self.catalog.total_size() > quota_bytes:
+            job_ids = list(self.db.scalars(query).all())
+            if not job_ids:
+                break
+            evicted += self._purge_jobs(job_ids)
+        return evicted
 
-            job.status = "failed"
-            job.error_message = "Cleaned as stale pending job"
-            self.db.add(job)
+    def run_cycle(self) -> dict[str, int]:
+        """One full pass: finished jobs, stale pending jobs and analyses, then the disk quota."""
+        return {
+            "deleted_jobs": self.cleanup_finished_jobs(older_than_hours=self.settings.cleanup_finished_after_hours),
+            "stale_jobs_cleaned": self.cleanup_stale_pending_files(older_than_hours=self.settings.cleanup_stale_after_hours),
+            "orphaned_analyses_failed": self.fail_orphaned_analyses(),
+            "evicted_jobs": self.enforce_quota(),
+            "probe_cache_pruned": MediaProbeService().prune_cache(older_than_hours=self.settings.cleanup_finished_after_hours),
+            "loudness_cache_pruned": LoudnessService().prune_cache(older_than_hours=self.settings.cleanup_finished_after_hours),
+        }
 
+    def _purge_jobs(self, job_ids: list[str]) -> int:
+        rows = self.db.execute(
+            select(Job.id, Job.job_type, Job.input_path, Job.output_path, Job.bundle_path).where(Job.id.in_(job_ids))
+        ).all()
+        paths = self._registered_paths(job_ids)
+        legacy_ids = self._jobs_without_files(job_ids)
+        for job_id, job_type, input_path, output_path, bundle_path in rows:
+            if job_id in legacy_ids:
+                paths.update(self._legacy_input_paths(job_type, input_path))
+            paths.update(Path(value) for value in (output_path, bundle_path) if value)
+
+        for path in paths:
+            self._remove_file(path)
+            self.catalog.unregister(path)
+        for job_id in job_ids:
+            job_dir = self.settings.output_dir / job_id
+            if job_dir.is_dir():
+                shutil.rmtree(job_dir, ignore_errors=True)
+                self.catalog.unregister(job_dir)
+
+        self.db.execute(delete(JobFile).where(JobFile.job_id.in_(job_ids)))
+        self.db.execute(delete(StoredFile).where(StoredFile.job_id.in_(job_ids)))
+        result = self.db.execute(delete(Job).where(Job.id.in_(job_ids)).execution_options(synchronize_session=False))
         self.db.commit()
-        return cleaned
+        return result.rowcount or 0
+
+    def _registered_paths(self, job_ids: list[str], role: str | None = None) -> set[Path]:
+        query = select(JobFile.path).where(JobFile.job_id.in_(job_ids))
+        if role:
+            query = query.where(JobFile.role == role)
+        return {Path(value) for value in self.db.scalars(query).all()}
+
+    def _jobs_without_files(self, job_ids: list[str]) -> set[str]:
+        """Rows from before job_files, whose inputs are only recorded in input_path."""
+        tracked = set(self.db.scalars(select(JobFile.job_id).where(JobFile.job_id.in_(job_ids)).distinct()).all())
+        return set(job_ids) - tracked
+
+    def _legacy_input_paths(self, job_type: str, input_path: str | None) -> set[Path]:
+        # YouTube jobs keep their source URLs in input_path; older batch rows
+        # joined every upload with newlines.
+        if not input_path or job_type.startswith("youtube"):
+            return set()
+        return {Path(line.strip()) for line in input_path.splitlines() if line.strip()}
+
+    def _remove_file(self, path: Path) -> bool:
+        resolved = path.resolve()
+        if not any(root in resolved.parents for root in self._roots):
+            return False
+        if not resolved.is_file():
+            return False
+        resolved.unlink(missing_ok=True)
+        parent = resolved.parent
+        if parent not in self._roots:
+            try:
+                parent.rmdir()
+            except OSError:
+                pass
+        return True
+
+
+def start_cleanup_scheduler(session_factory) -> threading.Thread | None:
+    """Run `CleanupService.run_cycle()` every `cleanup_interval_seconds`."""
+    return start_periodic_task(
+        "cleanup-scheduler",
+        get_settings().cleanup_interval_seconds,
+        lambda db: CleanupService(db).run_cycle(),
+        session_factory,
+    )
@@ -0,0 +1,29 @@
+import os
+
+from app.core.config import get_settings
+from app.worker import get_worker_target_count
+
+
+def available_cpus() -> int:
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except (AttributeError, OSError):
+        return max(1, os.cpu_count() or 1)
+
+
+def cpus_per_worker(worker_count: int | None = None) -> int:
+    """This worker's share of the CPUs we are allowed on."""
+    if worker_count is None:
+        try:
+            worker_count = get_worker_target_count()
+        except Exception:
+            worker_count = get_settings().worker_target_default
+    return max(1, available_cpus() // max(worker_count, 1))
+
+
+def encoder_thread_budget(worker_count: int | None = None) -> int:
+    """Threads one ffmpeg process may use so that all workers together fit the CPUs we are allowed on."""
+    settings = get_settings()
+    if settings.encoder_threads > 0:
+        return settings.encoder_threads
+    return cpus_per_worker(worker_count)
@@ -0,0 +1,318 @@
+import base64
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.constants import FILE_CATALOG_SORT_FIELDS, FILE_SOURCE_OUTPUTS, FILE_SOURCE_UPLOADS
+from app.models.job import Job
+from app.models.job_file import JobFile
+from app.models.stored_file import StoredFile, StoredFileDir
+from app.services.background import start_periodic_task
+
+
+# Keep IN (...) lists under SQLite's bound-parameter limit.
+_IN_CHUNK_SIZE = 500
+
+
+def _chunks(values: list, size: int = _IN_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _mtime(stat_result: os.stat_result) -> datetime:
+    return datetime.fromtimestamp(stat_result.st_mtime, tz=timezone.utc)
+
+
+def _same_instant(stored: datetime | None, current: datetime) -> bool:
+    if stored is None:
+        return False
+    # SQLite hands back naive datetimes; every value written here is UTC.
+    if stored.tzinfo is None:
+        stored = stored.replace(tzinfo=timezone.utc)
+    return stored == current
+
+
+def _parent_of(relative_path: str) -> str:
+    return relative_path.rsplit("/", 1)[0] if "/" in relative_path else ""
+
+
+class FileCatalogService:
+    """Indexed catalog of files under the upload and output roots.
+
+    Rows are written when the job layer registers files and removed when files
+    are deleted through the API; `reconcile()` picks up anything changed
+    behind the catalog's back by rescanning only directories whose mtime moved.
+    Callers own the transaction: nothing here commits except `reconcile()`.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self.settings = get_settings()
+
+    def roots(self) -> dict[str, Path]:
+        return {
+            FILE_SOURCE_OUTPUTS: self.settings.output_dir.resolve(),
+            FILE_SOURCE_UPLOADS: self.settings.upload_dir.resolve(),
+        }
+
+    def locate(self, path: Path) -> tuple[str, str] | None:
+        """Return (source, relative_path) for a path under one of the roots."""
+        resolved = path.resolve()
+        for source, root in self.roots().items():
+            if resolved == root or root not in resolved.parents:
+                continue
+            return source, resolved.relative_to(root).as_posix()
+        return None
+
+    def register(self, path: Path, *, job_id: str | None = None, user_id: str | None = None) -> StoredFile | None:
+        located = self.locate(path)
+        if located is None or not path.is_file():
+            return None
+        source, relative_path = located
+        stat_result = path.stat()
+        row = self.db.scalar(
+            select(StoredFile).where(StoredFile.source == source, StoredFile.relative_path == relative_path)
+        )
+        if row is None:
+            row = StoredFile(source=source, relative_path=relative_path)
+        row.parent = _parent_of(relative_path)
+        row.name = path.name
+        row.size = stat_result.st_size
+        row.mtime = _mtime(stat_result)
+        if job_id is not None:
+            row.job_id = job_id
+        if user_id is not None:
+            row.user_id = user_id
+        self.db.add(row)
+        return row
+
+    def unregister(self, path: Path) -> None:
+        """Drop the catalog entry for a file, or every entry below a directory."""
+        located = self.locate(path)
+        if located is None:
+            return
+        source, relative_path = located
+        prefix = f"{relative_path}/"
+        self.db.execute(
+            delete(StoredFile).where(
+                StoredFile.source == source,
+                or_(
+                    StoredFile.relative_path == relative_path,
+                    StoredFile.relative_path.startswith(prefix, autoescape=True),
+                ),
+            )
+        )
+        self.db.execute(
+            delete(StoredFileDir).where(
+                StoredFileDir.source == source,
+                or_(
+                    StoredFileDir.relative_path == relative_path,
+                    StoredFileDir.relative_path.startswith(prefix, autoescape=True),
+                ),
+            )
+        )
+
+    def forget_job(self, job_id: str) -> None:
+        self.db.execute(delete(StoredFile).where(StoredFile.job_id == job_id))
+
+    def clear(self, source: str | None = None) -> None:
+        file_query = delete(StoredFile)
+        dir_query = delete(StoredFileDir)
+        if source is not None:
+            file_query = file_query.where(StoredFile.source == source)
+            dir_query = dir_query.where(StoredFileDir.source == source)
+        self.db.execute(file_query)
+        self.db.execute(dir_query)
+
+    def total_size(self) -> int:
+        return int(self.db.scalar(select(func.coalesce(func.sum(StoredFile.size), 0))) or 0)
+
+    def is_empty(self, source: str) -> bool:
+        return self.db.scalar(select(StoredFileDir.id).where(StoredFileDir.source == source).limit(1)) is None
+
+    def list_page(
+        self,
+        source: str,
+        *,
+        limit: int = 500,
+        cursor: str | None = None,
+        sort: str = "modified_at",
+    ) -> tuple[list[StoredFile], str | None]:
+        """Newest/largest/last-named first, served from the (source, <sort>) index."""
+        if sort not in FILE_CATALOG_SORT_FIELDS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        column = {"modified_at": StoredFile.mtime, "size": StoredFile.size, "name": StoredFile.relative_path}[sort]
+
+        query = select(StoredFile).where(StoredFile.source == source)
+        if cursor:
+            value, row_id = self._decode_cursor(cursor, sort)
+            query = query.where(or_(column < value, and_(column == value, StoredFile.id < row_id)))
+        query = query.order_by(column.desc(), StoredFile.id.desc()).limit(limit + 1)
+        rows = list(self.db.scalars(query).all())
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = self._encode_cursor({"modified_at": last.mtime, "size": last.size, "name": last.relative_path}[sort], last.id)
+        return rows, next_cursor
+
+    def reconcile(self, source: str | None = None) -> int:
+        """Rescan directories whose mtime changed since the last pass. Returns rows touched."""
+        touched = 0
+        for root_source, root in self.roots().items():
+            if source is not None and root_source != source:
+                continue
+            if root.exists():
+                touched += self._reconcile_root(root_source, root)
+        self.db.commit()
+        return touched
+
+    def _reconcile_root(self, source: str, root: Path) -> int:
+        known_dirs = {
+            relative_path: (row_id, mtime_ns)
+            for relative_path, row_id, mtime_ns in self.db.execute(
+                select(StoredFileDir.relative_path, StoredFileDir.id, StoredFileDir.mtime_ns).where(StoredFileDir.source == source)
+            ).all()
+        }
+        seen_dirs: set[str] = set()
+        touched = 0
+        stack: list[Path] = [root]
+
+        while stack:
+            directory = stack.pop()
+            relative_dir = "" if directory == root else directory.relative_to(root).as_posix()
+            seen_dirs.add(relative_dir)
+            try:
+                dir_mtime_ns = directory.stat().st_mtime_ns
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+
+            # Listing names is cheap; only changed directories pay for stat() and DB writes.
+            stack.extend(Path(entry.path) for entry in entries if entry.is_dir(follow_symlinks=False))
+            known = known_dirs.get(relative_dir)
+            if known is not None and known[1] == dir_mtime_ns:
+                continue
+
+            touched += self._rescan_directory(source, root, relative_dir, entries)
+            if known is None:
+                self.db.add(StoredFileDir(source=source, relative_path=relative_dir, mtime_ns=dir_mtime_ns))
+            else:
+                self.db.get(StoredFileDir, known[0]).mtime_ns = dir_mtime_ns
+
+        for relative_dir in set(known_dirs) - seen_dirs:
+            self.unregister(root / relative_dir)
+        return touched
+
+    def _rescan_directory(self, source: str, root: Path, relative_dir: str, entries: list[os.DirEntry]) -> int:
+        existing = {
+            row.relative_path: row
+            for row in self.db.scalars(
+                select(StoredFile).where(StoredFile.source == source, StoredFile.parent == relative_dir)
+            ).all()
+        }
+        on_disk: dict[str, tuple[str, os.stat_result]] = {}
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                on_disk[relative_path] = (entry.name, entry.stat())
+            except OSError:
+                continue
+
+        touched = 0
+        for relative_path, row in existing.items():
+            if relative_path not in on_disk:
+                self.db.delete(row)
+                touched += 1
+
+        new_paths = [relative_path for relative_path in on_disk if relative_path not in existing]
+        owners = self._resolve_owners(source, root, new_paths)
+        for relative_path, (name, stat_result) in on_disk.items():
+            row = existing.get(relative_path)
+            mtime = _mtime(stat_result)
+            if row is not None and row.size == stat_result.st_size and _same_instant(row.mtime, mtime):
+                continue
+            if row is None:
+                job_id, user_id = owners.get(relative_path, (None, None))
+                row = StoredFile(
+                    source=source,
+                    relative_path=relative_path,
+                    parent=relative_dir,
+                    name=name,
+                    job_id=job_id,
+                    user_id=user_id,
+                )
+            row.size = stat_result.st_size
+            row.mtime = mtime
+            self.db.add(row)
+            touched += 1
+        return touched
+
+    def _resolve_owners(self, source: str, root: Path, relative_paths: list[str]) -> dict[str, tuple[str | None, str | None]]:
+        owners: dict[str, tuple[str | None, str | None]] = {}
+        if not relative_paths:
+            return owners
+
+        by_absolute = {(root / relative_path).as_posix(): relative_path for relative_path in relative_paths}
+        for chunk in _chunks(list(by_absolute)):
+            rows = self.db.execute(
+                select(JobFile.path, JobFile.job_id, Job.user_id)
+                .join(Job, Job.id == JobFile.job_id)
+                .where(JobFile.path.in_(chunk))
+            ).all()
+            for path, job_id, user_id in rows:
+                owners[by_absolute[path]] = (job_id, user_id)
+
+        if source != FILE_SOURCE_OUTPUTS:
+            return owners
+
+        # Unregistered outputs live under `<job_id>/...` or are named `<job_id>_...`.
+        guessed: dict[str, str] = {}
+        for relative_path in relative_paths:
+            if relative_path in owners:
+                continue
+            if "/" in relative_path:
+                guessed[relative_path] = relative_path.split("/", 1)[0]
+            elif "_" in relative_path:
+                guessed[relative_path] = relative_path.split("_", 1)[0]
+        job_users: dict[str, str | None] = {}
+        for chunk in _chunks(list(set(guessed.values()))):
+            job_users.update(self.db.execute(select(Job.id, Job.user_id).where(Job.id.in_(chunk))).all())
+        for relative_path, job_id in guessed.items():
+            if job_id in job_users:
+                owners[relative_path] = (job_id, job_users[job_id])
+        return owners
+
+    def _encode_cursor(self, value: object, row_id: int) -> str:
+        raw_value = value.isoformat() if isinstance(value, datetime) else str(value)
+        return base64.urlsafe_b64encode(f"{row_id}|{raw_value}".encode("utf-8")).decode("ascii")
+
+    def _decode_cursor(self, cursor: str, sort: str) -> tuple[object, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            row_id_raw, raw_value = raw.split("|", 1)
+            if sort == "modified_at":
+                return datetime.fromisoformat(raw_value), int(row_id_raw)
+            if sort == "size":
+                return int(raw_value), int(row_id_raw)
+            return raw_value, int(row_id_raw)
+        except Exception as exc:
+            raise ValueError("Invalid cursor") from exc
+
+
+def start_file_catalog_reconciler(session_factory) -> threading.Thread | None:
+    """Run `reconcile()` every `file_catalog_reconcile_interval_seconds`."""
+    return start_periodic_task(
+        "file-catalog-reconciler",
+        get_settings().file_catalog_reconcile_interval_seconds,
+        lambda db: FileCatalogService(db).reconcile(),
+        session_factory,
+    )
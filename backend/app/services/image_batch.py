@@ -0,0 +1,84 @@
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from app.core.config import get_settings
+from app.services.encoder_budget import encoder_thread_budget
+from app.services.image_service import ImageConversionService
+
+
+def estimate_decoded_bytes(path: Path) -> int:
+    """Memory one decoded frame of path needs (width x height x bands); reads only the header.
+
+    Anything over image_max_pixels is either decoded in strips or rejected, so it never costs more.
+    A header Pillow refuses (including decompression bombs) is charged that full cap, never 0,
+    so it cannot slip past the memory budget.
+    """
+    max_pixels = get_settings().image_max_pixels
+    try:
+        with Image.open(path) as image:
+            return min(image.width * image.height, max_pixels) * len(image.getbands())
+    except Exception:
+        return max_pixels * 4
+
+
+def image_batch_workers() -> int:
+    settings = get_settings()
+    if settings.image_batch_workers > 0:
+        return settings.image_batch_workers
+    return encoder_thread_budget()
+
+
+def image_batch_memory_budget() -> int:
+    return get_settings().image_batch_memory_mb * 1024 * 1024
+
+
+def run_bounded(
+    func: Callable[..., Any],
+    items: Iterable[dict[str, Any]],
+    *,
+    cost: Callable[[dict[str, Any]], int],
+    max_workers: int,
+    memory_budget: int,
+) -> Iterator[tuple[int, Any]]:
+    """Run func(**item) in a process pool and yield (index, result) as each item finishes.
+
+    Items are admitted in order while the estimated decoded size of everything in flight stays
+    under memory_budget; one item always runs, so a single oversized image still goes through.
+    The first failure cancels what has not started yet and is re-raised.
+    """
+    max_workers = max(1, max_workers)
+    pending = [(index, item, cost(item)) for index, item in enumerate(items)]
+    pending.reverse()
+    running: dict[Future, tuple[int, int]] = {}
+    in_flight = 0
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        try:
+            while pending or running:
+                while pending and len(running) < max_workers:
+                    index, item, size = pending[-1]
+                    if running and in_flight + size > memory_budget:
+                        break
+                    pending.pop()
+                    running[pool.submit(func, **item)] = (index, size)
+                    in_flight += size
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, size = running.pop(future)
+                    in_flight -= size
+                    yield index, future.result()
+        except BaseException:
+            for future in running:
+                future.cancel()
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+
+
+def convert_image_file(**kwargs: Any) -> Path:
+    """Process-pool entry point; ImageConversionService holds no state worth sharing."""
+    return ImageConversionService().convert(**kwargs)
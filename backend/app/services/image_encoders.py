@@ -0,0 +1,96 @@
+from io import BytesIO
+from typing import Any
+
+from PIL import Image
+
+# Speed/size trade-off per Pillow writer. The desktop app carries the same table in
+# image_encoders.py at the repo root; keep the two in step.
+ENCODER_PROFILES: dict[str, dict[str, dict[str, Any]]] = {
+    "fast": {
+        "JPEG": {"subsampling": "4:2:0"},
+        "WEBP": {"method": 0},
+        "PNG": {"compress_level": 1},
+        "TIFF": {},
+        "GIF": {},
+    },
+    "balanced": {
+        "JPEG": {"optimize": True, "subsampling": "4:2:0"},
+        "WEBP": {"method": 4},
+        "PNG": {"compress_level": 6},
+        "TIFF": {"compression": "tiff_adobe_deflate"},
+        "GIF": {"optimize": True},
+    },
+    "small": {
+        "JPEG": {"optimize": True, "progressive": True, "subsampling": "4:2:0"},
+        "WEBP": {"method": 6},
+        "PNG": {"optimize": True},
+        "TIFF": {"compression": "tiff_adobe_deflate"},
+        "GIF": {"optimize": True},
+    },
+}
+DEFAULT_ENCODER_PROFILE = "balanced"
+
+# Profiles that keep full (4:4:4) JPEG chroma from this quality up; the others always subsample.
+# "small" leaves it out: its files stay as small as the desktop's pre-profile progressive JPEGs.
+JPEG_FULL_CHROMA_MIN_QUALITY: dict[str, int] = {"balanced": 90}
+
+# Formats whose size can be steered through quality.
+QUALITY_FORMATS = {"JPEG", "WEBP"}
+TARGET_MIN_QUALITY = 10
+TARGET_MAX_QUALITY = 95
+
+
+def encoder_options(pillow_format: str, profile: str, quality: int | None = None) -> dict[str, Any]:
+    if profile not in ENCODER_PROFILES:
+        raise ValueError(f"Unsupported encoder profile: {profile}")
+    options = dict(ENCODER_PROFILES[profile].get(pillow_format, {}))
+    if pillow_format in QUALITY_FORMATS and quality is not None:
+        options["quality"] = quality
+        full_chroma_from = JPEG_FULL_CHROMA_MIN_QUALITY.get(profile)
+        if pillow_format == "JPEG" and full_chroma_from is not None and quality >= full_chroma_from:
+            # Chroma subsampling is the most visible JPEG artefact at high quality.
+            options["subsampling"] = "4:4:4"
+    return options
+
+
+def encode(image: Image.Image, pillow_format: str, options: dict[str, Any]) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format=pillow_format, **options)
+    return buffer.getvalue()
+
+
+def encode_to_target(
+    image: Image.Image,
+    pillow_format: str,
+    target_bytes: int,
+    *,
+    profile: str = DEFAULT_ENCODER_PROFILE,
+    max_quality: int = TARGET_MAX_QUALITY,
+) -> tuple[bytes, int]:
+    """Binary-search the highest quality whose in-memory encode fits target_bytes.
+
+    Returns the encoded bytes and the quality used; raises ValueError when even the lowest
+    quality is too big, so the caller can report the smallest size reachable.
+    """
+    if pillow_format not in QUALITY_FORMATS:
+        raise ValueError("Target file size is only supported for JPG and WEBP output")
+
+    low, high = TARGET_MIN_QUALITY, max(TARGET_MIN_QUALITY, min(max_quality, TARGET_MAX_QUALITY))
+    best: tuple[bytes, int] | None = None
+    smallest = 0
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode(image, pillow_format, encoder_options(pillow_format, profile, quality))
+        if len(data) <= target_bytes:
+            best = (data, quality)
+            low = quality + 1
+        else:
+            smallest = len(data)
+            high = quality - 1
+
+    if best is None:
+        raise ValueError(
+            f"Cannot reach {target_bytes // 1024} KB; the smallest {pillow_format} is {smallest // 1024} KB "
+            f"at quality {TARGET_MIN_QUALITY}"
+        )
+    return best
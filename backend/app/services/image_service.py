@@ -1,6 +1,11 @@
+from collections.abc import Callable, Iterator
 from pathlib import Path
 
-from PIL import Image
+from PIL import Image, ImageSequence
+
+from app.core.config import get_settings
+from app.services.image_encoders import DEFAULT_ENCODER_PROFILE, ENCODER_PROFILES, encode_to_target, encoder_options
+from app.services.image_tiles import can_decode_in_strips, resize_in_strips
 
 
 IMAGE_FORMAT_MAP: dict[str, tuple[str, str]] = {
@@ -12,10 +17,166 @@ IMAGE_FORMAT_MAP: dict[str, tuple[str, str]] = {
     "BMP": ("BMP", "bmp"),
     "GIF": ("GIF", "gif"),
     "ICO": ("ICO", "ico"),
+    "PDF": ("PDF", "pdf"),
 }
 
+# Pillow writers that keep every frame (animation) or page when saved with save_all.
+ANIMATED_FORMATS = {"GIF", "WEBP"}
+MULTI_FRAME_FORMATS = ANIMATED_FORMATS | {"TIFF", "PDF"}
+
+# Our own budget is checked from the header first; Pillow's bomb check is the backstop. Set once
+# here so every Pillow caller in the process (batch cost estimates, upload checks) opens
+# headers under the same limit.
+Image.MAX_IMAGE_PIXELS = get_settings().image_tiled_max_pixels
+
+# Icon frames written for ICO output, largest first; Windows uses 256 as its biggest size.
+ICO_SIZES = (256, 128, 64, 48, 32, 24, 16)
+
+# fit: shrink inside the box; fit_pad: same, centred on a white canvas of the box size
+# (the desktop default); fill: cover the box and centre-crop; stretch: exact size.
+RESIZE_MODES = {"fit", "fit_pad", "fill", "stretch"}
+DEFAULT_RESIZE_MODE = "fit_pad"
+
+
+def plan_resize(source_size: tuple[int, int], box: tuple[int, int], mode: str) -> tuple[int, int]:
+    """Size the decoded image must be resampled to; never upscales, like the desktop tab."""
+    if mode not in RESIZE_MODES:
+        raise ValueError(f"Unsupported resize mode: {mode}")
+    width, height = source_size
+    box_width, box_height = min(box[0], width), min(box[1], height)
+    if mode == "stretch":
+        return box_width, box_height
+
+    if mode == "fill":
+        scale = min(max(box_width / width, box_height / height), 1.0)
+    else:
+        scale = min(box_width / width, box_height / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def resample_ready(image: Image.Image) -> Image.Image:
+    """image in a mode reduce() and LANCZOS work on: palettes expand to RGB(A), 1-bit to L, 16-bit to I.
+
+    reduce() rejects P, 1 and I;16, and resize() silently falls back to NEAREST for palettes.
+    """
+    if image.mode in {"P", "PA"}:
+        return image.convert("RGBA" if image.has_transparency_data else "RGB")
+    if image.mode == "1":
+        return image.convert("L")
+    if image.mode.startswith("I;16"):
+        return image.convert("I")
+    return image
+
+
+def fast_resize(image: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """Integer reduce() down to about 2x the target, then one LANCZOS pass for quality."""
+    if image.size == size:
+        return image
+    image = resample_ready(image)
+    factor = min(image.width // size[0], image.height // size[1]) // 2
+    if factor >= 2:
+        image = image.reduce(factor)
+    return image.resize(size, Image.LANCZOS)
+
+
+def resize_image(
+    image: Image.Image,
+    box: tuple[int, int],
+    mode: str,
+    *,
+    source_size: tuple[int, int] | None = None,
+) -> Image.Image:
+    """Resize to box using mode; source_size is the pre-draft size when the decode was already scaled."""
+    source_size = source_size or image.size
+    box = (min(box[0], source_size[0]), min(box[1], source_size[1]))
+    resized = fast_resize(image, plan_resize(source_size, box, mode))
+
+    if mode == "fill" and resized.size != box:
+        left = (resized.width - box[0]) // 2
+        top = (resized.height - box[1]) // 2
+        return resized.crop((left, top, left + box[0], top + box[1]))
+    if mode == "fit_pad" and resized.size != box:
+        canvas = Image.new("RGB", box, (255, 255, 255))
+        work = resized.convert("RGB") if resized.mode != "RGB" else resized
+        canvas.paste(work, ((box[0] - work.width) // 2, (box[1] - work.height) // 2))
+        return canvas
+    return resized
+
+
+def icon_frames(image: Image.Image, sizes: tuple[int, ...] | list[int] = ICO_SIZES) -> list[Image.Image]:
+    """Square RGBA icon frames, largest first; each is resized from the previous one, never upscaled."""
+    work = image.convert("RGBA")
+    wanted = sorted({size for size in sizes if 0 < size <= 256}, reverse=True)
+    fitting = [size for size in wanted if size <= max(work.size)] or [max(work.size)]
+    frames = []
+    for size in fitting:
+        work = fast_resize(work, plan_resize(work.size, (size, size), "fit"))
+        canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        canvas.paste(work, ((size - work.width) // 2, (size - work.height) // 2))
+        frames.append(canvas)
+    return frames
+
+
+def save_icon(image: Image.Image, output_path: Path, sizes: tuple[int, ...] | list[int] = ICO_SIZES) -> Path:
+    frames = icon_frames(image, sizes)
+    frames[0].save(
+        output_path,
+        format="ICO",
+        sizes=[frame.size for frame in frames],
+        append_images=frames[1:],
+    )
+    return output_path
+
+
+def check_pixel_budget(image: Image.Image, box: tuple[int, int] | None, *, max_pixels: int, tiled_max_pixels: int) -> bool:
+    """Decide from the header alone how image may be decoded; True means strip by strip.
+
+    Anything over max_pixels is only accepted when it is being downscaled into a box that fits
+    the budget and its layout can be decoded a band of rows at a time.
+    """
+    pixels = image.width * image.height
+    if pixels <= max_pixels:
+        return False
+    limit = f"{image.width}x{image.height} exceeds the {max_pixels / 1_000_000:g} megapixel limit"
+    if pixels > tiled_max_pixels:
+        raise ValueError(f"Image is too large: {limit}")
+    if box is None or box[0] * box[1] > max_pixels:
+        raise ValueError(f"Image is too large to convert without resizing: {limit}")
+    if not can_decode_in_strips(image):
+        raise ValueError(f"Image is too large for a full decode and {image.format} cannot be read in strips: {limit}")
+    return True
+
+
+def frame_timing(image: Image.Image) -> tuple[list[int], int | None]:
+    """Per-frame durations (ms) and the loop count; for GIF, seeking only reads frame headers."""
+    durations = []
+    for frame in ImageSequence.Iterator(image):
+        if image.format == "WEBP":
+            # The WEBP reader only fills in the duration once the frame is decoded.
+            frame.load()
+        durations.append(int(frame.info.get("duration") or 0))
+    image.seek(0)
+    return durations, image.info.get("loop")
+
+
+def iter_frames(image: Image.Image, transform: Callable[[Image.Image], Image.Image], *, start: int = 0) -> Iterator[Image.Image]:
+    """Lazily yield transform(frame) so only the frame being encoded is decoded."""
+    for index in range(start, getattr(image, "n_frames", 1)):
+        image.seek(index)
+        yield transform(image)
+
+
+def _frame_for_resize(frame: Image.Image) -> Image.Image:
+    # P frames would resample with NEAREST; GIF frames keep transparency through RGBA.
+    if frame.mode in {"P", "PA", "LA"}:
+        return frame.convert("RGBA" if frame.has_transparency_data else "RGB")
+    return frame.copy()
+
 
 class ImageConversionService:
+    def __init__(self) -> None:
+        self.settings = get_settings()
+
     def convert(
         self,
         *,
@@ -23,6 +184,12 @@ class ImageConversionService:
         output_path: Path,
         target_format: str,
         quality: int = 90,
+        resize_enabled: bool = False,
+        width: int | None = None,
+        height: int | None = None,
+        resize_mode: str = DEFAULT_RESIZE_MODE,
+        encoder_profile: str = DEFAULT_ENCODER_PROFILE,
+        target_kb: int | None = None,
     ) -> Path:
         normalized_format = target_format.upper()
 
@@ -30,14 +197,194 @@ class ImageConversionService:
             raise ValueError(f"Unsupported target format: {target_format}")
 
         pillow_format, _ = IMAGE_FORMAT_MAP[normalized_format]
+        if encoder_profile not in ENCODER_PROFILES:
+            raise ValueError(f"Unsupported encoder profile: {encoder_profile}")
 
-        with Image.open(source_path) as image:
-            save_image = image.convert("RGB") if pillow_format == "JPEG" else image
-            save_kwargs: dict[str, int] = {}
+        box: tuple[int, int] | None = None
+        if resize_enabled:
+            if not width or not height or width < 1 or height < 1:
+                raise ValueError("Width and height are required when resize is enabled")
+            if resize_mode not in RESIZE_MODES:
+                raise ValueError(f"Unsupported resize mode: {resize_mode}")
+            box = (width, height)
+
+        try:
+            image = Image.open(source_path)
+        except Image.DecompressionBombError as exc:
+            raise ValueError(f"Image is too large: {exc}") from exc
 
-            if pillow_format in {"JPEG", "WEBP"}:
-                save_kwargs["quality"] = quality
+        with image:
+            frame_count = getattr(image, "n_frames", 1)
+            if frame_count > 1 and pillow_format in MULTI_FRAME_FORMATS:
+                if target_kb:
+                    raise ValueError("Target file size is not supported for animated or multi-page output")
+                return self._convert_frames(image, output_path, pillow_format, quality, box, resize_mode, encoder_profile)
 
-            save_image.save(output_path, format=pillow_format, **save_kwargs)
+            source_size = image.size
+            if box is not None and image.format == "JPEG":
+                # libjpeg decodes at 1/2, 1/4 or 1/8 scale while still covering the target.
+                image.draft(image.mode, plan_resize(source_size, box, resize_mode))
+            tiled = check_pixel_budget(
+                image,
+                box,
+                max_pixels=self.settings.image_max_pixels,
+                tiled_max_pixels=self.settings.image_tiled_max_pixels,
+            )
+            work_image = image
+            if tiled:
+                strips = resize_in_strips(
+                    source_path,
+                    plan_resize(source_size, box, resize_mode),
+                    max_pixels=self.settings.image_strip_pixels,
+                )
+                work_image = resize_image(strips, box, resize_mode, source_size=source_size)
+            elif box is not None:
+                work_image = resize_image(image, box, resize_mode, source_size=source_size)
+            save_image = work_image.convert("RGB") if pillow_format in {"JPEG", "PDF"} else work_image
+            if pillow_format == "ICO":
+                save_icon(work_image, output_path)
+            elif target_kb:
+                data, _ = encode_to_target(
+                    save_image, pillow_format, target_kb * 1024, profile=encoder_profile, max_quality=quality
+                )
+                output_path.write_bytes(data)
+            else:
+                save_image.save(output_path, format=pillow_format, **encoder_options(pillow_format, encoder_profile, quality))
 
         return output_path
+
+    def _convert_frames(
+        self,
+        image: Image.Image,
+        output_path: Path,
+        pillow_format: str,
+        quality: int,
+        box: tuple[int, int] | None,
+        resize_mode: str,
+        encoder_profile: str,
+    ) -> Path:
+        """Keep every frame: animated GIF/WEBP with durations and loop, multi-page TIFF/PDF."""
+        frame_count = image.n_frames
+        max_pixels = self.settings.image_max_pixels
+        if image.width * image.height > max_pixels:
+            raise ValueError(
+                f"Image is too large: {image.width}x{image.height} exceeds the {max_pixels / 1_000_000:g} megapixel limit"
+            )
+        if box is None:
+            frame_size = image.size
+        elif resize_mode == "fit":
+            frame_size = plan_resize(image.size, box, resize_mode)
+        else:
+            frame_size = (min(box[0], image.width), min(box[1], image.height))
+        if frame_count * frame_size[0] * frame_size[1] > max_pixels:
+            raise ValueError(
+                f"Image has too many frames: {frame_count} x {frame_size[0]}x{frame_size[1]} exceeds the "
+                f"{max_pixels / 1_000_000:g} megapixel limit"
+            )
+
+        def transform(frame: Image.Image) -> Image.Image:
+            if box is not None:
+                frame = resize_image(_frame_for_resize(frame), box, resize_mode)
+            if pillow_format == "PDF" and frame.mode not in {"1", "L", "RGB", "CMYK"}:
+                return frame.convert("RGB")
+            return frame.copy() if frame is image else frame
+
+        save_kwargs = encoder_options(pillow_format, encoder_profile, quality)
+        save_kwargs["save_all"] = True
+        if pillow_format in ANIMATED_FORMATS:
+            durations, loop = frame_timing(image)
+            save_kwargs["duration"] = durations
+            if loop is not None:
+                save_kwargs["loop"] = loop
+            elif pillow_format == "WEBP":
+                # A GIF without a NETSCAPE loop block plays once; WEBP loop=0 would mean forever.
+                save_kwargs["loop"] = 1
+
+        if box is None and pillow_format != "PDF":
+            # Nothing to change per frame: the writer seeks through the source itself.
+            image.save(output_path, format=pillow_format, **save_kwargs)
+        else:
+            first = transform(image)
+            first.save(
+                output_path,
+                format=pillow_format,
+                append_images=iter_frames(image, transform, start=1),
+                **save_kwargs,
+            )
+        return output_path
+
+    def derive(
+        self,
+        *,
+        source_path: Path,
+        output_dir: Path,
+        stem: str,
+        widths: list[int],
+        target_formats: list[str],
+        quality: int = 90,
+        encoder_profile: str = DEFAULT_ENCODER_PROFILE,
+        ico_sizes: list[int] | None = None,
+    ) -> list[Path]:
+        """Write every width in every format (plus an optional multi-size ICO) from one decode.
+
+        Widths are produced largest first and each one is resized from the previous derivative,
+        so the full-resolution image is only resampled once. Widths never upscale.
+        """
+        formats_by_extension: dict[str, str] = {}
+        for target_format in target_formats:
+            normalized_format = target_format.upper()
+            if normalized_format not in IMAGE_FORMAT_MAP:
+                raise ValueError(f"Unsupported target format: {normalized_format}")
+            # JPG and JPEG both write .jpg; encode each output file once.
+            formats_by_extension.setdefault(IMAGE_FORMAT_MAP[normalized_format][1], normalized_format)
+        normalized_formats = list(formats_by_extension.values())
+        if encoder_profile not in ENCODER_PROFILES:
+            raise ValueError(f"Unsupported encoder profile: {encoder_profile}")
+        if any(width < 1 for width in widths):
+            raise ValueError("Widths must be positive")
+        if not widths and not ico_sizes:
+            raise ValueError("Nothing to generate: pass widths or ico_sizes")
+
+        outputs: list[Path] = []
+        with Image.open(source_path) as image:
+            source_size = image.size
+            box = (max(widths or [ICO_SIZES[0]]), source_size[1])
+            if image.format == "JPEG":
+                image.draft(image.mode, plan_resize(source_size, box, "fit"))
+            tiled = check_pixel_budget(
+                image,
+                box,
+                max_pixels=self.settings.image_max_pixels,
+                tiled_max_pixels=self.settings.image_tiled_max_pixels,
+            )
+            largest = plan_resize(source_size, box, "fit")
+            if tiled:
+                current = resize_in_strips(source_path, largest, max_pixels=self.settings.image_strip_pixels)
+            else:
+                current = fast_resize(resample_ready(image), largest)
+            base = current
+
+            produced: set[int] = set()
+            for width in sorted(set(widths), reverse=True):
+                current = fast_resize(current, plan_resize(current.size, (width, current.height), "fit"))
+                if current.width in produced:
+                    continue
+                produced.add(current.width)
+                for normalized_format in normalized_formats:
+                    pillow_format, extension = IMAGE_FORMAT_MAP[normalized_format]
+                    output_path = output_dir / f"{stem}_{current.width}w.{extension}"
+                    if pillow_format == "ICO":
+                        save_icon(current, output_path)
+                    else:
+                        save_image = current.convert("RGB") if pillow_format in {"JPEG", "PDF"} else current
+                        save_image.save(
+                            output_path,
+                            format=pillow_format,
+                            **encoder_options(pillow_format, encoder_profile, quality),
+                        )
+                    outputs.append(output_path)
+
+            if ico_sizes:
+                outputs.append(save_icon(base, output_dir / f"{stem}.ico", ico_sizes))
+
+        return outputs
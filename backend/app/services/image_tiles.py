@@ -0,0 +1,84 @@
+import math
+from pathlib import Path
+
+from PIL import Image
+
+
+def _raw_args(args) -> tuple[str, int, int]:
+    args = (args,) if isinstance(args, str) else tuple(args)
+    rawmode, stride, orientation = (args + (0, 1)[len(args) - 1:])[:3]
+    return rawmode, stride, orientation
+
+
+def can_decode_in_strips(image: Image.Image) -> bool:
+    """True when every tile is an uncompressed full-width run of rows (BMP, PPM, uncompressed TIFF).
+
+    Only those layouts can be decoded a band of rows at a time; PNG and compressed TIFF are a
+    single zlib/libtiff stream in Pillow and always decode the whole frame.
+    """
+    return bool(image.tile) and all(
+        tile[0] == "raw" and tile[1][0] == 0 and tile[1][2] == image.width for tile in image.tile
+    )
+
+
+def band_tiles(image: Image.Image, top: int, bottom: int) -> list:
+    """Rewrite image.tile so that decoding yields only rows [top, bottom)."""
+    width = image.width
+    tiles = []
+    for tile in image.tile:
+        codec, (_, tile_top, _, tile_bottom), offset, args = tile[:4]
+        start, end = max(tile_top, top), min(tile_bottom, bottom)
+        if start >= end:
+            continue
+        rawmode, stride, orientation = _raw_args(args)
+        stride = stride or len(Image.new(image.mode, (width, 1)).tobytes("raw", rawmode))
+        if orientation < 0:
+            # Bottom-up rows: the band starts at its last row in the file.
+            offset += (tile_bottom - end) * stride
+        else:
+            offset += (start - tile_top) * stride
+        tiles.append((codec, (0, start - top, width, end - top), offset, (rawmode, stride, orientation)))
+    return tiles
+
+
+def decode_rows(path: Path, top: int, bottom: int) -> Image.Image:
+    """Decode only rows [top, bottom) of a strip-decodable image."""
+    with Image.open(path) as strip:
+        width = strip.width
+        strip.tile = band_tiles(strip, top, bottom)
+        strip._size = (width, bottom - top)
+        strip.load()
+        if strip.mode == "P":
+            return strip.convert("RGBA" if "transparency" in strip.info else "RGB")
+        return strip.copy()
+
+
+def resize_in_strips(path: Path, size: tuple[int, int], *, max_pixels: int) -> Image.Image:
+    """Downscale path to size while holding roughly max_pixels decoded source pixels at once.
+
+    Each output band is resampled from its exact source region plus enough context rows for the
+    LANCZOS kernel, so band seams are invisible.
+    """
+    with Image.open(path) as header:
+        width, height = header.size
+    scale = height / size[1]
+    margin = math.ceil(3 * scale) + 1
+    band_rows = max(1, int((max_pixels // max(width, 1) - 2 * margin) / scale))
+    canvas: Image.Image | None = None
+
+    for dest_top in range(0, size[1], band_rows):
+        dest_bottom = min(dest_top + band_rows, size[1])
+        source_top, source_bottom = dest_top * scale, dest_bottom * scale
+        top = max(0, math.floor(source_top) - margin)
+        bottom = min(height, math.ceil(source_bottom) + margin)
+        strip = decode_rows(path, top, bottom)
+        band = strip.resize(
+            (size[0], dest_bottom - dest_top),
+            Image.LANCZOS,
+            box=(0, source_top - top, width, source_bottom - top),
+        )
+        if canvas is None:
+            canvas = Image.new(band.mode, size)
+        canvas.paste(band, (0, dest_top))
+
+    return canvas
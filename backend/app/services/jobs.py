@@ -1,7 +1,56 @@
-from sqlalchemy import select
+import base64
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
+from app.core.constants import JOB_FILE_ROLE_BUNDLE, JOB_FILE_ROLE_INPUT, JOB_FILE_ROLE_OUTPUT
 from app.models.job import Job
+from app.models.job_file import JobFile
+from app.services.file_catalog import FileCatalogService
+from app.services.hashing import file_sha256
+
+
+# Columns needed by list views; skips long text such as batch input_path.
+JOB_LIST_COLUMNS = (
+    Job.id,
+    Job.user_id,
+    Job.job_type,
+    Job.status,
+    Job.original_filename,
+    Job.output_filename,
+    Job.error_message,
+    Job.progress,
+    Job.progress_detail,
+    Job.created_at,
+    Job.updated_at,
+)
+
+
+# Bookkeeping jobs with nothing to download (the analysis step before a YouTube download);
+# job listings leave them out unless asked for by job_type.
+HIDDEN_JOB_TYPES = ("youtube_analyze",)
+
+
+def encode_job_cursor(created_at: datetime, job_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{job_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_job_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at_raw, job_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at_raw), job_id
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def normalize_file_path(path: str | Path) -> str:
+    """Canonical form used for job_files.path so lookups are exact-match index hits."""
+    return Path(path).resolve().as_posix()
 
 
 class JobService:
@@ -16,7 +65,12 @@ class JobService:
         stored_filename: str,
         input_path: str,
         user_id: str | None = None,
+        input_files: list[Path] | None = None,
     ) -> Job:
+        """input_files go to job_files; for batch jobs input_path only holds the first of them.
+
+        Runs inside the upload request, so input hashes are left to the worker (mark_processing).
+        """
         job = Job(
             user_id=user_id,
             job_type=job_type,
@@ -27,20 +81,166 @@ class JobService:
             progress=0,
         )
         self.db.add(job)
+        if input_files:
+            self.db.flush()
+            self._add_files(job.id, JOB_FILE_ROLE_INPUT, input_files, user_id=user_id)
         self.db.commit()
         self.db.refresh(job)
         return job
 
     def list_jobs(self, user_id: str | None = None, is_admin: bool = False) -> list[Job]:
-        query = select(Job)
+        query = select(Job).where(Job.job_type.not_in(HIDDEN_JOB_TYPES))
         if not is_admin and user_id:
             query = query.filter(Job.user_id == user_id)
         return list(self.db.scalars(query.order_by(Job.created_at.desc())).all())
 
+    def list_job_page(
+        self,
+        *,
+        user_id: str | None = None,
+        is_admin: bool = False,
+        limit: int = 100,
+        cursor: str | None = None,
+        status: str | None = None,
+        job_type: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> tuple[list[Row], str | None]:
+        """Keyset-paginated job listing, newest first, using JOB_LIST_COLUMNS only.
+
+        Returns the page rows and the cursor for the next page (None on the last page).
+        """
+        query = select(*JOB_LIST_COLUMNS)
+        if not is_admin and user_id:
+            query = query.where(Job.user_id == user_id)
+        if status:
+            query = query.where(Job.status == status)
+        if job_type:
+            query = query.where(Job.job_type == job_type)
+        else:
+            query = query.where(Job.job_type.not_in(HIDDEN_JOB_TYPES))
+        if created_after is not None:
+            query = query.where(Job.created_at >= created_after)
+        if created_before is not None:
+            query = query.where(Job.created_at < created_before)
+        if cursor:
+            cursor_created_at, cursor_id = decode_job_cursor(cursor)
+            query = query.where(
+                or_(
+                    Job.created_at < cursor_created_at,
+                    and_(Job.created_at == cursor_created_at, Job.id < cursor_id),
+                )
+            )
+
+        query = query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1)
+        rows = list(self.db.execute(query).all())
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_job_cursor(last.created_at, last.id)
+        return rows, next_cursor
+
+    def list_job_file_paths(self, job_id: str, role: str | None = None) -> list[str]:
+        query = select(JobFile.path).where(JobFile.job_id == job_id)
+        if role:
+            query = query.where(JobFile.role == role)
+        return list(self.db.scalars(query.order_by(JobFile.role, JobFile.position, JobFile.id)).all())
+
+    def count_job_files(self, job_id: str, role: str) -> int:
+        query = select(func.count(JobFile.id)).where(JobFile.job_id == job_id, JobFile.role == role)
+        return int(self.db.scalar(query) or 0)
+
+    def find_file_owners(self, paths: list[str]) -> dict[str, tuple[str, str | None]]:
+        """Map normalized paths to (job_id, user_id) using the job_files path index."""
+        owners: dict[str, tuple[str, str | None]] = {}
+        unique_paths = list(dict.fromkeys(paths))
+        # stay under SQLite's bound-parameter limit
+        for start in range(0, len(unique_paths), 500):
+            chunk = unique_paths[start:start + 500]
+            rows = self.db.execute(
+                select(JobFile.path, JobFile.job_id, Job.user_id)
+                .join(Job, Job.id == JobFile.job_id)
+                .where(JobFile.path.in_(chunk))
+            ).all()
+            for path, job_id, user_id in rows:
+                owners[path] = (job_id, user_id)
+        return owners
+
+    def record_output(self, job: Job, output_path: Path, *, position: int, total: int) -> Job:
+        """Store one finished batch item and advance progress in a single commit."""
+        self._add_files(job.id, JOB_FILE_ROLE_OUTPUT, [output_path], user_id=job.user_id, start_position=position)
+        job.progress = max(0, min(95, 10 + int(position / max(total, 1) * 85)))
+        job.progress_detail = f"Converted {position}/{total}"
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def backfill_job_files(self) -> int:
+        """One-off migration of legacy rows whose files only live in the jobs columns."""
+        if self.db.scalar(select(func.count(JobFile.id))):
+            return 0
+        added = 0
+        rows = self.db.execute(
+            select(Job.id, Job.user_id, Job.job_type, Job.input_path, Job.output_path, Job.bundle_path)
+        ).all()
+        for job_id, user_id, job_type, input_path, output_path, bundle_path in rows:
+            if input_path and not job_type.startswith("youtube"):
+                entries = [Path(entry.strip()) for entry in input_path.splitlines() if entry.strip()]
+                added += len(self._add_files(job_id, JOB_FILE_ROLE_INPUT, entries, user_id=user_id))
+            if output_path:
+                added += len(self._add_files(job_id, JOB_FILE_ROLE_OUTPUT, [Path(output_path)], user_id=user_id))
+            if bundle_path:
+                added += len(self._add_files(job_id, JOB_FILE_ROLE_BUNDLE, [Path(bundle_path)], user_id=user_id))
+        self.db.commit()
+        return added
+
+    def _add_files(
+        self,
+        job_id: str,
+        role: str,
+        paths: list[Path],
+        *,
+        user_id: str | None = None,
+        start_position: int = 1,
+    ) -> list[JobFile]:
+        catalog = FileCatalogService(self.db)
+        rows: list[JobFile] = []
+        for position, path in enumerate(paths, start=start_position):
+            size = path.stat().st_size if path.is_file() else None
+            row = JobFile(
+                job_id=job_id,
+                role=role,
+                position=position,
+                path=normalize_file_path(path),
+                size=size,
+            )
+            self.db.add(row)
+            rows.append(row)
+            catalog.register(path, job_id=job_id, user_id=user_id)
+        return rows
+
     def get_job(self, job_id: str) -> Job | None:
         return self.db.get(Job, job_id)
 
+    def hash_input_files(self, job_id: str) -> None:
+        """Fill in the content hash of inputs that do not have one yet."""
+        rows = self.db.scalars(
+            select(JobFile).where(
+                JobFile.job_id == job_id, JobFile.role == JOB_FILE_ROLE_INPUT, JobFile.sha256.is_(None)
+            )
+        ).all()
+        for row in rows:
+            path = Path(row.path)
+            if path.is_file():
+                row.sha256 = file_sha256(path)
+                self.db.add(row)
+
     def mark_processing(self, job: Job) -> Job:
+        # Called from the worker, so hashing large uploads never holds up the API.
+        self.hash_input_files(job.id)
         job.status = "processing"
         job.progress = 10
         job.progress_detail = "Processing started"
@@ -64,6 +264,7 @@ class JobService:
         job.progress_detail = "Completed"
         job.output_path = output_path
         job.output_filename = output_path.split("/")[-1].split("\\")[-1]
+        self._add_files(job.id, JOB_FILE_ROLE_OUTPUT, [Path(output_path)], user_id=job.user_id)
         self.db.add(job)
         self.db.commit()
         self.db.refresh(job)
@@ -75,12 +276,15 @@ class JobService:
         job.progress_detail = "Completed"
         job.bundle_path = bundle_path
         job.output_filename = output_filename
+        self._add_files(job.id, JOB_FILE_ROLE_BUNDLE, [Path(bundle_path)], user_id=job.user_id)
         self.db.add(job)
         self.db.commit()
         self.db.refresh(job)
         return job
 
     def delete_job(self, job: Job) -> None:
+        self.db.execute(delete(JobFile).where(JobFile.job_id == job.id))
+        FileCatalogService(self.db).forget_job(job.id)
         self.db.delete(job)
         self.db.commit()
 
@@ -0,0 +1,115 @@
+import json
+import math
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.services.hashing import file_sha256
+
+
+# EBU R128 targets for the loudnorm filter (integrated loudness, true peak, loudness range).
+LOUDNORM_TARGET = {"I": -16.0, "TP": -1.5, "LRA": 11.0}
+LOUDNORM_MEASURED_FIELDS = ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset")
+# loudnorm resamples to 192 kHz internally; put the output back at the source rate.
+DEFAULT_SAMPLE_RATE = 48000
+
+_JSON_BLOCK = re.compile(r"\{[^{}]*\"input_i\"[^{}]*\}")
+
+
+def _target_args() -> str:
+    return ":".join(f"{key}={value}" for key, value in LOUDNORM_TARGET.items())
+
+
+def measure_filter() -> str:
+    return f"loudnorm={_target_args()}:print_format=json"
+
+
+def is_normalizable(measured: dict[str, float]) -> bool:
+    """False for silent or near-silent input, where loudnorm reports -inf and cannot apply a gain."""
+    return all(math.isfinite(value) for value in measured.values())
+
+
+def normalize_filter(measured: dict[str, float]) -> str:
+    """Second-pass filter: with the first pass's measurements loudnorm can apply one linear gain."""
+    return (
+        f"loudnorm={_target_args()}"
+        f":measured_I={measured['input_i']}"
+        f":measured_TP={measured['input_tp']}"
+        f":measured_LRA={measured['input_lra']}"
+        f":measured_thresh={measured['input_thresh']}"
+        f":offset={measured['target_offset']}"
+        ":linear=true:print_format=none"
+    )
+
+
+def parse_measurement(stderr: str) -> dict[str, float]:
+    """The JSON block loudnorm prints at the end of the measuring pass."""
+    matches = _JSON_BLOCK.findall(stderr or "")
+    if not matches:
+        raise RuntimeError("Loudness measurement produced no result")
+    raw = json.loads(matches[-1])
+    try:
+        return {field: float(raw[field]) for field in LOUDNORM_MEASURED_FIELDS}
+    except (KeyError, TypeError, ValueError) as exc:
+        raise RuntimeError("Loudness measurement is incomplete") from exc
+
+
+class LoudnessService:
+    """First loudnorm pass, cached by the source's content hash.
+
+    The measurement depends only on the decoded audio (and the trim window), not on the target
+    format or bitrate, so every later conversion of the same content skips the analysis decode.
+    Results are JSON files under temp_dir/loudness_cache, shared by the API and all workers.
+    """
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        self.cache_dir = cache_dir or get_settings().temp_dir / "loudness_cache"
+
+    def measure(self, measure_cmd: list[str], source_path: Path, *, window: tuple[float, float] | None = None) -> dict[str, float]:
+        """measure_cmd is the input half of an ffmpeg command (everything up to and including -i)."""
+        cache_file = self._cache_file(source_path, window)
+        try:
+            measured = json.loads(cache_file.read_text(encoding="utf-8"))
+            os.utime(cache_file)  # keeps entries that are still in use out of prune_cache
+            return measured
+        except (OSError, ValueError):
+            pass
+
+        cmd = measure_cmd + ["-map", "0:a:0", "-af", measure_filter(), "-f", "null", "-"]
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr or "FFmpeg loudness measurement error")
+        measured = parse_measurement(result.stderr)
+
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps(measured), encoding="utf-8")
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            # The disk copy is an optimisation only.
+            pass
+        return measured
+
+    def prune_cache(self, *, older_than_hours: int) -> int:
+        """Drop entries not used recently; measure() refreshes the mtime of every hit."""
+        if not self.cache_dir.is_dir():
+            return 0
+        cutoff = time.time() - older_than_hours * 3600
+        removed = 0
+        for cache_file in self.cache_dir.glob("*/*.json"):
+            try:
+                if cache_file.stat().st_mtime < cutoff:
+                    cache_file.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _cache_file(self, source_path: Path, window: tuple[float, float] | None) -> Path:
+        digest = file_sha256(source_path)
+        name = digest if window is None else f"{digest}_{window[0]:g}_{window[1]:g}"
+        return self.cache_dir / digest[:2] / f"{name}_{_target_args().replace(':', '_')}.json"
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from app.core.config import get_settings
+
+
+PROBE_CACHE_MAX_ENTRIES = 256
+PROBE_TIMEOUT_SECONDS = 30
+# The keyframe scan reads every packet of the file, so it gets longer than a header probe.
+KEYFRAME_SCAN_TIMEOUT_SECONDS = 120
+
+
+def get_ffprobe_cmd() -> list[str]:
+    exe = "ffprobe.exe" if os.name == "nt" else "ffprobe"
+    here = os.path.dirname(os.path.abspath(__file__))
+    local = os.path.join(here, exe)
+    if os.path.exists(local):
+        return [local]
+    return ["ffprobe"]
+
+
+class ProbeTimeoutError(RuntimeError):
+    pass
+
+
+_probe_cache: "OrderedDict[tuple[str, int, int, str], dict | list]" = OrderedDict()
+_probe_lock = threading.Lock()
+
+
+def _remember(key: tuple[str, int, int, str], info: dict | list) -> None:
+    with _probe_lock:
+        _probe_cache[key] = info
+        _probe_cache.move_to_end(key)
+        while len(_probe_cache) > PROBE_CACHE_MAX_ENTRIES:
+            _probe_cache.popitem(last=False)
+
+
+class MediaProbeService:
+    """ffprobe stream/format inspection and keyframe scans, cached per (path, size, mtime).
+
+    Results live in a per-process LRU and in JSON files under temp_dir/probe_cache,
+    so the API, every worker process and later retries share one ffprobe run per file.
+    """
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        self.cache_dir = cache_dir or get_settings().temp_dir / "probe_cache"
+
+    def probe(self, path: Path, *, timeout: float | None = PROBE_TIMEOUT_SECONDS) -> dict:
+        return self._cached(path, "", dict, lambda: self._run_ffprobe(path, timeout=timeout))
+
+    def keyframe_times(self, path: Path, *, timeout: float | None = KEYFRAME_SCAN_TIMEOUT_SECONDS) -> list[float]:
+        """Presentation times of video keyframes, read from packet flags (no decoding)."""
+        return self._cached(path, "keyframes", list, lambda: self._run_keyframe_scan(path, timeout=timeout))
+
+    def _cached(self, path: Path, kind: str, result_type: type, run: Callable[[], dict | list]) -> dict | list:
+        stat = path.stat()
+        key = (path.resolve().as_posix(), stat.st_size, stat.st_mtime_ns, kind)
+        with _probe_lock:
+            cached = _probe_cache.get(key)
+            if cached is not None:
+                _probe_cache.move_to_end(key)
+                return cached
+
+        cache_file = self._cache_file(key)
+        try:
+            info = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            info = None
+        if isinstance(info, result_type):
+            _remember(key, info)
+            return info
+
+        info = run()
+        _remember(key, info)
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps(info), encoding="utf-8")
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            # The disk copy is an optimisation only.
+            pass
+        return info
+
+    def duration(self, path: Path) -> float | None:
+        return probe_duration(self.probe(path))
+
+    def prune_cache(self, *, older_than_hours: int) -> int:
+        """Drop disk entries not rewritten recently; stale keys can never match again anyway."""
+        if not self.cache_dir.is_dir():
+            return 0
+        cutoff = time.time() - older_than_hours * 3600
+        removed = 0
+        for cache_file in self.cache_dir.glob("*/*.json"):
+            try:
+                if cache_file.stat().st_mtime < cutoff:
+                    cache_file.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _cache_file(self, key: tuple[str, int, int, str]) -> Path:
+        *file_key, kind = key
+        digest = hashlib.sha1("|".join(str(part) for part in file_key).encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / (f"{digest}_{kind}.json" if kind else f"{digest}.json")
+
+    def _run_ffprobe(self, path: Path, *, timeout: float | None) -> dict:
+        cmd = get_ffprobe_cmd() + [
+            "-v",
+            "error",
+            "-print_format",
+            "json",
+            "-show_streams",
+            "-show_format",
+            str(path),
+        ]
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired as exc:
+            raise ProbeTimeoutError("FFprobe timed out") from exc
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr or "FFprobe error")
+
+        info = json.loads(result.stdout or "{}")
+        if not isinstance(info, dict):
+            raise ValueError("Unexpected ffprobe output")
+        return info
+
+    def _run_keyframe_scan(self, path: Path, *, timeout: float | None) -> list[float]:
+        cmd = get_ffprobe_cmd() + [
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=print_section=0",
+            str(path),
+        ]
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired as exc:
+            raise ProbeTimeoutError("FFprobe keyframe scan timed out") from exc
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr or "FFprobe error")
+
+        times: list[float] = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(",")
+            if "K" not in flags:
+                continue
+            try:
+                times.append(float(pts_time))
+            except ValueError:
+                continue
+        return sorted(times)
+
+
+def probe_duration(info: dict) -> float | None:
+    try:
+        return float(info.get("format", {}).get("duration"))
+    except (TypeError, ValueError):
+        return None
+
+
+def probe_streams(info: dict, codec_type: str) -> list[dict]:
+    return [stream for stream in info.get("streams", []) if stream.get("codec_type") == codec_type]
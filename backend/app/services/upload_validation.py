@@ -1,8 +1,106 @@
+from collections.abc import Callable
 from pathlib import Path
 
 from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, UnidentifiedImageError
 
 from app.core.config import get_settings
+# Imported for the Image.MAX_IMAGE_PIXELS it sets, so headers open under the conversion limit.
+from app.services import image_service  # noqa: F401
+from app.services.media_probe import MediaProbeService, ProbeTimeoutError, probe_streams
+
+
+MagicSignature = tuple[tuple[int, bytes], ...]
+
+
+def _starts(*prefixes: bytes) -> tuple[MagicSignature, ...]:
+    return tuple(((0, prefix),) for prefix in prefixes)
+
+
+def _container(outer: bytes, *forms: bytes) -> tuple[MagicSignature, ...]:
+    """RIFF/FORM style files: outer tag at 0, form type at 8."""
+    return tuple(((0, outer), (8, form)) for form in forms)
+
+
+# A file passes when every (offset, prefix) pair of any one signature matches.
+# Extensions without an entry (plain text) are not checked.
+_ISO_BMFF = tuple(((4, box),) for box in (b"ftyp", b"moov", b"mdat", b"free", b"wide"))
+_ASF = _starts(bytes.fromhex("3026b2758e66cf11"))
+_EBML = _starts(bytes.fromhex("1a45dfa3"))
+_OLE = _starts(bytes.fromhex("d0cf11e0a1b11ae1"))
+_ZIP = _starts(b"PK\x03\x04")
+
+MAGIC_SIGNATURES: dict[str, tuple[MagicSignature, ...]] = {
+    ".png": _starts(b"\x89PNG\r\n\x1a\n"),
+    ".jpg": _starts(b"\xff\xd8\xff"),
+    ".jpeg": _starts(b"\xff\xd8\xff"),
+    ".gif": _starts(b"GIF87a", b"GIF89a"),
+    ".webp": _container(b"RIFF", b"WEBP"),
+    ".bmp": _starts(b"BM"),
+    ".tiff": _starts(b"II*\x00", b"MM\x00*"),
+    ".ico": _starts(b"\x00\x00\x01\x00"),
+    ".mp3": _starts(b"ID3"),
+    ".wav": _container(b"RIFF", b"WAVE"),
+    ".flac": _starts(b"fLaC", b"ID3"),
+    ".ogg": _starts(b"OggS"),
+    ".opus": _starts(b"OggS"),
+    ".m4a": _ISO_BMFF,
+    ".aac": _starts(b"ADIF", b"ID3"),
+    ".wma": _ASF,
+    ".aiff": _container(b"FORM", b"AIFF", b"AIFC"),
+    ".aif": _container(b"FORM", b"AIFF", b"AIFC"),
+    ".mp4": _ISO_BMFF,
+    ".mov": _ISO_BMFF,
+    ".mkv": _EBML,
+    ".webm": _EBML,
+    ".avi": _container(b"RIFF", b"AVI "),
+    ".wmv": _ASF,
+    ".flv": _starts(b"FLV"),
+    ".pdf": _starts(b"%PDF"),
+    ".docx": _ZIP,
+    ".xlsx": _ZIP,
+    ".pptx": _ZIP,
+    ".odt": _ZIP,
+    ".doc": _OLE,
+    ".xls": _OLE,
+    ".ppt": _OLE,
+    ".rtf": _starts(b"{\\rtf"),
+}
+MAGIC_HEAD_BYTES = 16
+
+
+def _is_mpeg_audio_frame(head: bytes) -> bool:
+    """11 sync bits, a version that is not reserved and Layer III, with or without CRC."""
+    if len(head) < 2 or head[0] != 0xFF or head[1] & 0xE0 != 0xE0:
+        return False
+    return (head[1] >> 3) & 0x03 != 0x01 and (head[1] >> 1) & 0x03 == 0x01
+
+
+def _is_adts_frame(head: bytes) -> bool:
+    """12 sync bits and layer 00, with or without CRC, MPEG-2 or MPEG-4."""
+    return len(head) >= 2 and head[0] == 0xFF and head[1] & 0xF6 == 0xF0
+
+
+# Raw frame streams have no fixed magic bytes, only sync bits; checked next to MAGIC_SIGNATURES.
+FRAME_SYNC_CHECKS: dict[str, Callable[[bytes], bool]] = {
+    ".mp3": _is_mpeg_audio_frame,
+    ".aac": _is_adts_frame,
+}
+
+
+def matches_magic(head: bytes, extension: str) -> bool:
+    extension = extension.lower()
+    signatures = MAGIC_SIGNATURES.get(extension)
+    if signatures is None:
+        return True
+    frame_check = FRAME_SYNC_CHECKS.get(extension)
+    if frame_check is not None and frame_check(head):
+        return True
+    return any(
+        all(head[offset:offset + len(prefix)] == prefix for offset, prefix in signature)
+        for signature in signatures
+    )
 
 
 class UploadValidationService:
@@ -29,3 +127,62 @@ class UploadValidationService:
     async def validate_files(self, uploads: list[UploadFile], *, allowed_extensions: list[str], max_size_mb: int | None = None) -> None:
         for upload in uploads:
             await self.validate_file(upload, allowed_extensions=allowed_extensions, max_size_mb=max_size_mb)
+
+    async def validate_content(self, path: Path, *, kind: str, display_name: str | None = None) -> None:
+        """Reject a persisted upload whose bytes do not match its type; the file is removed on rejection."""
+        if not self.settings.upload_content_validation:
+            return
+        error = await run_in_threadpool(self._content_error, path, kind)
+        if error is not None:
+            path.unlink(missing_ok=True)
+            raise HTTPException(status_code=400, detail=f"{display_name or path.name}: {error}")
+
+    async def validate_contents(self, paths: list[Path], *, kind: str, display_names: list[str | None] | None = None) -> None:
+        for index, path in enumerate(paths):
+            display_name = display_names[index] if display_names and index < len(display_names) else None
+            try:
+                await self.validate_content(path, kind=kind, display_name=display_name)
+            except HTTPException:
+                for other in paths:
+                    other.unlink(missing_ok=True)
+                raise
+
+    def _content_error(self, path: Path, kind: str) -> str | None:
+        try:
+            with path.open("rb") as handle:
+                head = handle.read(MAGIC_HEAD_BYTES)
+        except OSError:
+            return "File could not be read"
+        if not head:
+            return "File is empty"
+        if not matches_magic(head, path.suffix):
+            return "File content does not match its extension"
+
+        if kind == "image":
+            max_pixels = self.settings.image_tiled_max_pixels
+            try:
+                with Image.open(path) as image:
+                    pixels = image.width * image.height
+                    image.verify()
+            except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+                # Pillow only complains above image_tiled_max_pixels (or a warnings filter made it fatal).
+                return f"Image is larger than {max_pixels:,} pixels"
+            except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+                return "File is not a readable image"
+            # Anything up to the tiled limit is accepted; conversion decodes it in strips or rejects it per target.
+            if pixels > max_pixels:
+                return f"Image is larger than {max_pixels:,} pixels"
+        elif kind in {"audio", "video"}:
+            try:
+                info = MediaProbeService().probe(path, timeout=self.settings.upload_probe_timeout_seconds)
+            except ProbeTimeoutError:
+                # Slow to inspect is not the same as broken; let the worker decide.
+                return None
+            except FileNotFoundError:
+                # No ffprobe on this host; the magic check above is all we can do.
+                return None
+            except (RuntimeError, ValueError):
+                return f"File is not a readable {kind} file"
+            if not probe_streams(info, kind):
+                return f"File has no {kind} stream"
+        return None
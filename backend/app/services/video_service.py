@@ -1,9 +1,51 @@
 import os
 import subprocess
+import tempfile
+from collections.abc import Callable
 from pathlib import Path
 
+from app.services.encoder_budget import encoder_thread_budget
+from app.services.media_probe import MediaProbeService, probe_duration, probe_streams
+
 
 VIDEO_FORMATS = {"MP4", "MOV", "MKV", "AVI", "WEBM", "GIF", "WMV", "FLV"}
+VIDEO_PRESETS = {"fast", "balanced", "quality"}
+DEFAULT_VIDEO_PRESET = "balanced"
+
+GIF_DITHER_MODES = {"sierra2_4a", "floyd_steinberg", "bayer", "none"}
+DEFAULT_GIF_DITHER = "sierra2_4a"
+DEFAULT_GIF_FPS = 12
+DEFAULT_GIF_MAX_WIDTH = 480
+GIF_MAX_FPS = 30
+GIF_MIN_FPS = 5
+GIF_MIN_WIDTH = 120
+GIF_SIZE_ATTEMPTS = 4
+
+# Speed/quality knobs per preset; "balanced" matches the encoders' own defaults for x264.
+X264_PRESETS = {
+    "fast": ("veryfast", "26"),
+    "balanced": ("medium", "23"),
+    "quality": ("slow", "20"),
+}
+VP9_PRESETS = {
+    "fast": ("realtime", "6", "34"),
+    "balanced": ("good", "2", "31"),
+    "quality": ("good", "1", "28"),
+}
+
+# Codecs each container can take with "-c copy"; anything else is re-encoded.
+STREAM_COPY_CODECS = {
+    "mp4": {"video": {"h264", "hevc", "av1", "mpeg4"}, "audio": {"aac", "mp3", "ac3", "eac3", "alac"}},
+    "mov": {"video": {"h264", "hevc", "mpeg4", "prores", "mjpeg"}, "audio": {"aac", "mp3", "alac", "ac3", "pcm_s16le"}},
+    "mkv": {
+        "video": {"h264", "hevc", "av1", "vp8", "vp9", "mpeg4", "mpeg2video"},
+        "audio": {"aac", "mp3", "opus", "vorbis", "flac", "ac3", "eac3", "dts", "pcm_s16le"},
+    },
+    "webm": {"video": {"vp8", "vp9", "av1"}, "audio": {"opus", "vorbis"}},
+    "avi": {"video": {"mpeg4", "mjpeg"}, "audio": {"mp3", "ac3", "pcm_s16le"}},
+    "wmv": {"video": {"wmv2", "wmv3", "vc1"}, "audio": {"wmav2"}},
+    "flv": {"video": {"h264", "flv1"}, "audio": {"aac", "mp3"}},
+}
 
 
 def ensure_even_dimension(value: int) -> int:
@@ -22,6 +64,191 @@ def normalize_crop_offset(value: int) -> int:
     return value if value % 2 == 0 else value - 1
 
 
+def get_target_codecs(ext: str) -> tuple[str, str | None]:
+    if ext in {"mp4", "mov", "mkv", "avi"}:
+        return "libx264", "aac"
+    if ext == "webm":
+        return "libvpx-vp9", "libopus"
+    if ext == "wmv":
+        return "wmv2", "wmav2"
+    if ext == "flv":
+        return "flv", "aac"
+    return "gif", None
+
+
+def encoder_args(vcodec: str, preset: str = DEFAULT_VIDEO_PRESET, threads: int | None = None) -> list[str]:
+    if preset not in VIDEO_PRESETS:
+        raise ValueError(f"Unsupported video preset: {preset}")
+
+    args: list[str] = []
+    if vcodec == "libx264":
+        x264_preset, crf = X264_PRESETS[preset]
+        args += ["-preset", x264_preset, "-crf", crf]
+        if threads:
+            args += ["-x264-params", f"threads={threads}:lookahead-threads={max(1, threads // 2)}"]
+    elif vcodec == "libvpx-vp9":
+        deadline, cpu_used, crf = VP9_PRESETS[preset]
+        args += ["-deadline", deadline, "-cpu-used", cpu_used, "-crf", crf, "-b:v", "0", "-row-mt", "1"]
+    if threads:
+        args += ["-threads", str(threads)]
+    return args
+
+
+def primary_streams(probe: dict) -> tuple[dict | None, dict | None]:
+    video_streams = [
+        stream
+        for stream in probe_streams(probe, "video")
+        if not stream.get("disposition", {}).get("attached_pic")
+    ]
+    audio_streams = probe_streams(probe, "audio")
+    return (video_streams[0] if video_streams else None), (audio_streams[0] if audio_streams else None)
+
+
+def choose_audio_codec(ext: str, stream: dict | None) -> str | None:
+    _, acodec = get_target_codecs(ext)
+    if acodec is None:
+        return None
+    copyable = STREAM_COPY_CODECS.get(ext, {}).get("audio", set())
+    if stream is not None and stream.get("codec_name") in copyable:
+        return "copy"
+    return acodec
+
+
+def plan_stream_codecs(
+    ext: str,
+    probe: dict,
+    *,
+    video_needs_decode: bool,
+    preset: str = DEFAULT_VIDEO_PRESET,
+    threads: int | None = None,
+) -> list[str]:
+    """Map the primary video/audio streams, copying each one the container accepts as-is.
+
+    Trim, crop and fps changes all need decoded frames (a copied trim would snap to
+    keyframes), so they force a video re-encode; audio can still be copied.
+    """
+    vcodec, _ = get_target_codecs(ext)
+    copyable = STREAM_COPY_CODECS.get(ext, {}).get("video", set())
+    video_stream, audio_stream = primary_streams(probe)
+
+    args: list[str] = []
+    if video_stream is not None:
+        copy_video = not video_needs_decode and video_stream.get("codec_name") in copyable
+        args += ["-map", f"0:{video_stream['index']}", "-c:v", "copy" if copy_video else vcodec]
+        if not copy_video:
+            args += encoder_args(vcodec, preset, threads)
+    audio_codec = choose_audio_codec(ext, audio_stream)
+    if audio_stream is not None and audio_codec is not None:
+        args += ["-map", f"0:{audio_stream['index']}", "-c:a", audio_codec]
+    return args
+
+
+def needs_video_encode(ext: str, probe: dict, *, video_needs_decode: bool) -> bool:
+    video_stream, _ = primary_streams(probe)
+    if video_stream is None:
+        return False
+    if ext == "gif" or video_needs_decode:
+        return True
+    return video_stream.get("codec_name") not in STREAM_COPY_CODECS.get(ext, {}).get("video", set())
+
+
+def check_video_targets(outputs: list[tuple[str, Path]], probe: dict | None) -> None:
+    """GIF is made from the picture only; reject it up front when the source has no video stream."""
+    if probe is None or primary_streams(probe)[0] is not None:
+        return
+    if any(target_format.upper() == "GIF" for target_format, _ in outputs):
+        raise ValueError("GIF output needs a video stream, but the source has none")
+
+
+def plan_segments(keyframes: list[float], start: float, end: float, count: int) -> list[tuple[float, float]]:
+    """Split [start, end) into up to `count` contiguous ranges whose inner cuts sit on keyframes.
+
+    Cutting on keyframes means every segment encoder seeks straight to a decodable
+    frame, and contiguous ranges let the concat demuxer join them without gaps.
+    """
+    if count < 2 or end <= start:
+        return [(start, end)]
+
+    step = (end - start) / count
+    cuts: list[float] = []
+    for index in range(1, count):
+        target = start + step * index
+        cut = next((time for time in keyframes if time >= target), None)
+        if cut is None or cut >= end:
+            break
+        if cut > (cuts[-1] if cuts else start):
+            cuts.append(cut)
+
+    bounds = [start] + cuts + [end]
+    return [(bounds[index], bounds[index + 1]) for index in range(len(bounds) - 1)]
+
+
+def build_video_filter_args(
+    *,
+    fps: int = 0,
+    resize_enabled: bool = False,
+    width: int | None = None,
+    height: int | None = None,
+    crop_x: int | None = None,
+    crop_y: int | None = None,
+) -> list[str]:
+    args: list[str] = []
+    if resize_enabled:
+        normalized_width, normalized_height = normalize_resize_dimensions(width, height)
+        nx = normalize_crop_offset(crop_x if crop_x is not None else 0)
+        ny = normalize_crop_offset(crop_y if crop_y is not None else 0)
+        args += [
+            "-vf",
+            f"crop={normalized_width}:{normalized_height}:{nx}:{ny}",
+        ]
+
+    if fps > 0:
+        args += ["-r", str(fps)]
+    return args
+
+
+def build_gif_filter(
+    *,
+    fps: int = 0,
+    max_width: int | None = None,
+    dither: str = DEFAULT_GIF_DITHER,
+    resize_enabled: bool = False,
+    width: int | None = None,
+    height: int | None = None,
+    crop_x: int | None = None,
+    crop_y: int | None = None,
+) -> str:
+    """Single-pass filter graph: palettegen and paletteuse share one decode through split."""
+    if dither not in GIF_DITHER_MODES:
+        raise ValueError(f"Unsupported GIF dither mode: {dither}")
+
+    steps: list[str] = []
+    if resize_enabled:
+        normalized_width, normalized_height = normalize_resize_dimensions(width, height)
+        nx = normalize_crop_offset(crop_x if crop_x is not None else 0)
+        ny = normalize_crop_offset(crop_y if crop_y is not None else 0)
+        steps.append(f"crop={normalized_width}:{normalized_height}:{nx}:{ny}")
+
+    gif_fps = min(fps if fps > 0 else DEFAULT_GIF_FPS, GIF_MAX_FPS)
+    gif_width = max_width or DEFAULT_GIF_MAX_WIDTH
+    steps.append(f"fps={gif_fps}")
+    steps.append(f"scale='min({gif_width},iw)':-2:flags=lanczos")
+
+    paletteuse = "paletteuse=dither=none" if dither == "none" else f"paletteuse=dither={dither}"
+    if dither == "bayer":
+        paletteuse += ":bayer_scale=3"
+    return ",".join(steps) + f",split[a][b];[a]palettegen=stats_mode=diff[p];[b][p]{paletteuse}:diff_mode=rectangle"
+
+
+def write_concat_list(segment_paths: list[Path], list_path: Path) -> Path:
+    lines = []
+    for segment_path in segment_paths:
+        escaped = segment_path.resolve().as_posix().replace("'", "'\\''")
+        lines.append(f"file '{escaped}'")
+    list_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return list_path
+
+
 def get_ffmpeg_cmd() -> list[str]:
     exe = "ffmpeg.exe" if os.name == "nt" else "ffmpeg"
     here = os.path.dirname(os.path.abspath(__file__))
@@ -47,6 +274,11 @@ class VideoConversionService:
         trim_enabled: bool = False,
         trim_start: float | None = None,
         trim_end: float | None = None,
+        probe: dict | None = None,
+        preset: str = DEFAULT_VIDEO_PRESET,
+        threads: int | None = None,
+        gif_max_width: int | None = None,
+        gif_dither: str = DEFAULT_GIF_DITHER,
     ) -> list[str]:
         normalized_format = target_format.upper()
 
@@ -62,39 +294,45 @@ class VideoConversionService:
                 raise ValueError("trim_end must be greater than trim_start")
             cmd += ["-ss", f"{trim_start}", "-to", f"{trim_end}"]
 
+        if threads:
+            cmd += ["-threads", str(threads)]
         cmd += ["-i", str(source_path)]
 
-        if resize_enabled:
-            normalized_width, normalized_height = normalize_resize_dimensions(width, height)
-            nx = normalize_crop_offset(crop_x if crop_x is not None else 0)
-            ny = normalize_crop_offset(crop_y if crop_y is not None else 0)
-            cmd += [
-                "-vf",
-                f"crop={normalized_width}:{normalized_height}:{nx}:{ny}",
-            ]
+        ext = normalized_format.lower()
+        if ext == "gif":
+            gif_filter = build_gif_filter(
+                fps=fps,
+                max_width=gif_max_width,
+                dither=gif_dither,
+                resize_enabled=resize_enabled,
+                width=width,
+                height=height,
+                crop_x=crop_x,
+                crop_y=crop_y,
+            )
+            cmd += ["-map", "0:v:0", "-an", "-vf", gif_filter, "-loop", "0", str(output_path)]
+            return cmd
 
-        if fps > 0:
-            cmd += ["-r", str(fps)]
+        cmd += build_video_filter_args(
+            fps=fps,
+            resize_enabled=resize_enabled,
+            width=width,
+            height=height,
+            crop_x=crop_x,
+            crop_y=crop_y,
+        )
+        vcodec, acodec = get_target_codecs(ext)
 
-        ext = normalized_format.lower()
-        if ext in {"mp4", "mov", "mkv", "avi"}:
-            vcodec = "libx264"
-            acodec = "aac"
-        elif ext == "webm":
-            vcodec = "libvpx-vp9"
-            acodec = "libopus"
-        elif ext == "wmv":
-            vcodec = "wmv2"
-            acodec = "wmav2"
-        elif ext == "flv":
-            vcodec = "flv"
-            acodec = "aac"
+        if probe is not None:
+            cmd += plan_stream_codecs(
+                ext,
+                probe,
+                video_needs_decode=resize_enabled or fps > 0 or trim_enabled,
+                preset=preset,
+                threads=threads,
+            )
         else:
-            vcodec = "gif"
-            acodec = None
-
-        if ext != "gif":
-            cmd += ["-c:v", vcodec]
+            cmd += ["-c:v", vcodec] + encoder_args(vcodec, preset, threads)
             if acodec is not None:
                 cmd += ["-c:a", acodec]
 
@@ -116,7 +354,38 @@ class VideoConversionService:
         trim_enabled: bool = False,
         trim_start: float | None = None,
         trim_end: float | None = None,
+        preset: str = DEFAULT_VIDEO_PRESET,
+        threads: int | None = None,
+        gif_max_width: int | None = None,
+        gif_dither: str = DEFAULT_GIF_DITHER,
+        gif_target_kb: int | None = None,
+        on_progress: Callable[[float], None] | None = None,
     ) -> Path:
+        if target_format.upper() == "GIF":
+            return self.convert_gif(
+                source_path=source_path,
+                output_path=output_path,
+                fps=fps,
+                resize_enabled=resize_enabled,
+                width=width,
+                height=height,
+                crop_x=crop_x,
+                crop_y=crop_y,
+                trim_enabled=trim_enabled,
+                trim_start=trim_start,
+                trim_end=trim_end,
+                threads=threads,
+                max_width=gif_max_width,
+                dither=gif_dither,
+                target_kb=gif_target_kb,
+            )
+
+        try:
+            probe = MediaProbeService().probe(source_path)
+        except (OSError, RuntimeError, ValueError):
+            # Unprobeable input: fall back to a full re-encode.
+            probe = None
+
         cmd = self.build_command(
             source_path=source_path,
             output_path=output_path,
@@ -130,10 +399,330 @@ class VideoConversionService:
             trim_enabled=trim_enabled,
             trim_start=trim_start,
             trim_end=trim_end,
+            probe=probe,
+            preset=preset,
+            threads=threads or encoder_thread_budget(),
         )
+        self.run(cmd, duration=self._expected_duration(probe, trim_enabled, trim_start, trim_end), on_progress=on_progress)
+        return output_path
 
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(result.stderr or "FFmpeg video conversion error")
+    def build_multi_command(
+        self,
+        *,
+        source_path: Path,
+        outputs: list[tuple[str, Path]],
+        fps: int = 0,
+        resize_enabled: bool = False,
+        width: int | None = None,
+        height: int | None = None,
+        crop_x: int | None = None,
+        crop_y: int | None = None,
+        trim_enabled: bool = False,
+        trim_start: float | None = None,
+        trim_end: float | None = None,
+        probe: dict | None = None,
+        preset: str = DEFAULT_VIDEO_PRESET,
+        threads: int | None = None,
+        gif_max_width: int | None = None,
+        gif_dither: str = DEFAULT_GIF_DITHER,
+    ) -> list[str]:
+        """Several target formats from one decode: the crop runs once and `split` fans out the frames."""
+        if not outputs:
+            raise ValueError("At least one target format is required")
+        for target_format, _ in outputs:
+            if target_format.upper() not in VIDEO_FORMATS:
+                raise ValueError(f"Unsupported target format: {target_format}")
+
+        check_video_targets(outputs, probe)
+        cmd = get_ffmpeg_cmd() + ["-y"]
+        if trim_enabled:
+            if trim_start is None or trim_end is None:
+                raise ValueError("trim_start and trim_end are required when trim is enabled")
+            if trim_end <= trim_start:
+                raise ValueError("trim_end must be greater than trim_start")
+            cmd += ["-ss", f"{trim_start}", "-to", f"{trim_end}"]
+        if threads:
+            cmd += ["-threads", str(threads)]
+        cmd += ["-i", str(source_path)]
+
+        video_stream, audio_stream = primary_streams(probe) if probe is not None else (None, None)
+        video_input = f"0:{video_stream['index']}" if video_stream is not None else "0:v:0"
+        audio_input = f"0:{audio_stream['index']}" if audio_stream is not None else "0:a:0?"
+        has_audio = probe is None or audio_stream is not None
+        video_needs_decode = resize_enabled or fps > 0 or trim_enabled
+
+        encoded = [
+            (target_format.upper(), output_path)
+            for target_format, output_path in outputs
+            if probe is None
+            or needs_video_encode(target_format.lower(), probe, video_needs_decode=video_needs_decode)
+        ]
+        labels: dict[Path, str] = {}
+        if encoded:
+            crop = ""
+            if resize_enabled:
+                normalized_width, normalized_height = normalize_resize_dimensions(width, height)
+                nx = normalize_crop_offset(crop_x if crop_x is not None else 0)
+                ny = normalize_crop_offset(crop_y if crop_y is not None else 0)
+                crop = f"crop={normalized_width}:{normalized_height}:{nx}:{ny},"
+            branches = "".join(f"[s{index}]" for index in range(len(encoded)))
+            graph = [f"[{video_input}]{crop}split={len(encoded)}{branches}"]
+            for index, (target_format, output_path) in enumerate(encoded):
+                labels[output_path] = f"[s{index}]"
+                if target_format == "GIF":
+                    gif_filter = build_gif_filter(fps=fps, max_width=gif_max_width, dither=gif_dither)
+                    graph.append(f"[s{index}]{gif_filter}[g{index}]")
+                    labels[output_path] = f"[g{index}]"
+            cmd += ["-filter_complex", ";".join(graph)]
+
+        for target_format, output_path in outputs:
+            ext = target_format.lower()
+            if ext == "gif":
+                cmd += ["-map", labels[output_path], "-an", "-loop", "0", str(output_path)]
+                continue
+
+            vcodec, _ = get_target_codecs(ext)
+            if output_path in labels:
+                cmd += ["-map", labels[output_path], "-c:v", vcodec] + encoder_args(vcodec, preset, threads)
+                if fps > 0:
+                    cmd += ["-r", str(fps)]
+            elif probe is None or video_stream is not None:
+                cmd += ["-map", video_input, "-c:v", "copy"]
+
+            audio_codec = choose_audio_codec(ext, audio_stream) if probe is not None else get_target_codecs(ext)[1]
+            if has_audio and audio_codec is not None:
+                cmd += ["-map", audio_input, "-c:a", audio_codec]
+            cmd += [str(output_path)]
+        return cmd
+
+    def convert_many(
+        self,
+        *,
+        source_path: Path,
+        outputs: list[tuple[str, Path]],
+        fps: int = 0,
+        resize_enabled: bool = False,
+        width: int | None = None,
+        height: int | None = None,
+        crop_x: int | None = None,
+        crop_y: int | None = None,
+        trim_enabled: bool = False,
+        trim_start: float | None = None,
+        trim_end: float | None = None,
+        preset: str = DEFAULT_VIDEO_PRESET,
+        threads: int | None = None,
+        gif_max_width: int | None = None,
+        gif_dither: str = DEFAULT_GIF_DITHER,
+        gif_target_kb: int | None = None,
+    ) -> list[Path]:
+        """One shared decode for every output; a GIF with a size target gets its own fitting loop."""
+        try:
+            probe = MediaProbeService().probe(source_path)
+        except (OSError, RuntimeError, ValueError):
+            probe = None
+        check_video_targets(outputs, probe)
+
+        sized_gifs = [output for output in outputs if gif_target_kb and output[0].upper() == "GIF"]
+        shared = [output for output in outputs if output not in sized_gifs]
+
+        for _, output_path in sized_gifs:
+            self.convert_gif(
+                source_path=source_path,
+                output_path=output_path,
+                fps=fps,
+                resize_enabled=resize_enabled,
+                width=width,
+                height=height,
+                crop_x=crop_x,
+                crop_y=crop_y,
+                trim_enabled=trim_enabled,
+                trim_start=trim_start,
+                trim_end=trim_end,
+                threads=threads,
+                max_width=gif_max_width,
+                dither=gif_dither,
+                target_kb=gif_target_kb,
+            )
+        if not shared:
+            return [output_path for _, output_path in outputs]
+
+        cmd = self.build_multi_command(
+            source_path=source_path,
+            outputs=shared,
+            fps=fps,
+            resize_enabled=resize_enabled,
+            width=width,
+            height=height,
+            crop_x=crop_x,
+            crop_y=crop_y,
+            trim_enabled=trim_enabled,
+            trim_start=trim_start,
+            trim_end=trim_end,
+            probe=probe,
+            preset=preset,
+            threads=threads or encoder_thread_budget(),
+            gif_max_width=gif_max_width,
+            gif_dither=gif_dither,
+        )
+        self.run(cmd)
+        return [output_path for _, output_path in outputs]
+
+    def convert_gif(
+        self,
+        *,
+        source_path: Path,
+        output_path: Path,
+        fps: int = 0,
+        resize_enabled: bool = False,
+        width: int | None = None,
+        height: int | None = None,
+        crop_x: int | None = None,
+        crop_y: int | None = None,
+        trim_enabled: bool = False,
+        trim_start: float | None = None,
+        trim_end: float | None = None,
+        threads: int | None = None,
+        max_width: int | None = None,
+        dither: str = DEFAULT_GIF_DITHER,
+        target_kb: int | None = None,
+    ) -> Path:
+        """Palette GIF encode; with target_kb, shrink fps and width until the file fits."""
+        gif_fps = min(fps if fps > 0 else DEFAULT_GIF_FPS, GIF_MAX_FPS)
+        gif_width = max_width or DEFAULT_GIF_MAX_WIDTH
+        threads = threads or encoder_thread_budget()
+
+        for _ in range(GIF_SIZE_ATTEMPTS):
+            cmd = self.build_command(
+                source_path=source_path,
+                output_path=output_path,
+                target_format="GIF",
+                fps=gif_fps,
+                resize_enabled=resize_enabled,
+                width=width,
+                height=height,
+                crop_x=crop_x,
+                crop_y=crop_y,
+                trim_enabled=trim_enabled,
+                trim_start=trim_start,
+                trim_end=trim_end,
+                threads=threads,
+                gif_max_width=gif_width,
+                gif_dither=dither,
+            )
+            self.run(cmd)
+
+            if not target_kb:
+                break
+            size_kb = output_path.stat().st_size / 1024
+            if size_kb <= target_kb or (gif_fps <= GIF_MIN_FPS and gif_width <= GIF_MIN_WIDTH):
+                break
+            # Size grows with fps x width^2, so scaling both by the cube root lands near the target.
+            ratio = (target_kb / size_kb) ** (1 / 3)
+            gif_fps = max(GIF_MIN_FPS, int(gif_fps * ratio))
+            gif_width = max(GIF_MIN_WIDTH, int(gif_width * ratio))
 
         return output_path
+
+    def build_segment_command(
+        self,
+        *,
+        source_path: Path,
+        segment_path: Path,
+        target_format: str,
+        start: float,
+        end: float,
+        fps: int = 0,
+        resize_enabled: bool = False,
+        width: int | None = None,
+        height: int | None = None,
+        crop_x: int | None = None,
+        crop_y: int | None = None,
+        preset: str = DEFAULT_VIDEO_PRESET,
+        threads: int | None = None,
+    ) -> list[str]:
+        """Video-only encode of one [start, end) range; audio is muxed once at concat time."""
+        vcodec, _ = get_target_codecs(target_format.lower())
+        cmd = get_ffmpeg_cmd() + ["-y", "-ss", f"{start}", "-to", f"{end}"]
+        if threads:
+            cmd += ["-threads", str(threads)]
+        cmd += ["-i", str(source_path), "-map", "0:v:0", "-an", "-sn"]
+        cmd += build_video_filter_args(
+            fps=fps,
+            resize_enabled=resize_enabled,
+            width=width,
+            height=height,
+            crop_x=crop_x,
+            crop_y=crop_y,
+        )
+        cmd += ["-c:v", vcodec] + encoder_args(vcodec, preset, threads) + [str(segment_path)]
+        return cmd
+
+    def build_concat_command(
+        self,
+        *,
+        list_path: Path,
+        source_path: Path,
+        output_path: Path,
+        target_format: str,
+        start: float,
+        end: float,
+        probe: dict,
+    ) -> list[str]:
+        """Join encoded segments losslessly and take audio from the same source range."""
+        ext = target_format.lower()
+        _, audio_stream = primary_streams(probe)
+        audio_codec = choose_audio_codec(ext, audio_stream)
+
+        cmd = get_ffmpeg_cmd() + ["-y", "-f", "concat", "-safe", "0", "-i", str(list_path)]
+        if audio_stream is not None and audio_codec is not None:
+            cmd += ["-ss", f"{start}", "-to", f"{end}", "-i", str(source_path)]
+            cmd += ["-map", "0:v:0", "-map", f"1:{audio_stream['index']}", "-c:v", "copy", "-c:a", audio_codec]
+        else:
+            cmd += ["-map", "0:v:0", "-c:v", "copy"]
+        cmd += [str(output_path)]
+        return cmd
+
+    def run(
+        self,
+        cmd: list[str],
+        *,
+        duration: float | None = None,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> None:
+        if not duration or on_progress is None:
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr or "FFmpeg video conversion error")
+            return
+
+        # -progress writes key=value blocks to stdout; stderr goes to a file so neither pipe can fill up.
+        progress_cmd = cmd[:1] + ["-progress", "pipe:1", "-nostats"] + cmd[1:]
+        reported = 0.0
+        with tempfile.TemporaryFile(mode="w+") as stderr_file:
+            process = subprocess.Popen(progress_cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True)
+            for line in process.stdout:
+                key, _, value = line.strip().partition("=")
+                if key != "out_time_us":
+                    continue
+                try:
+                    fraction = min(1.0, max(0.0, int(value) / 1_000_000 / duration))
+                except ValueError:
+                    continue
+                if fraction - reported >= 0.02:
+                    reported = fraction
+                    on_progress(fraction)
+            process.wait()
+            if process.returncode != 0:
+                stderr_file.seek(0)
+                raise RuntimeError(stderr_file.read() or "FFmpeg video conversion error")
+
+    @staticmethod
+    def _expected_duration(
+        probe: dict | None,
+        trim_enabled: bool,
+        trim_start: float | None,
+        trim_end: float | None,
+    ) -> float | None:
+        if trim_enabled and trim_start is not None and trim_end is not None:
+            return trim_end - trim_start
+        return probe_duration(probe) if probe is not None else None
@@ -0,0 +1,60 @@
+import hashlib
+import json
+
+from redis import Redis
+
+from app.core.config import get_settings
+from app.core.constants import YOUTUBE_INFO_CACHE_PREFIX
+
+
+# Only what analysis and download_item read; full extract_info dicts run to hundreds of KB.
+YOUTUBE_INFO_FIELDS = ("webpage_url", "title", "duration", "thumbnail", "extractor_key", "extractor")
+YOUTUBE_FORMAT_FIELDS = ("format_id", "height", "vcodec", "acodec", "abr")
+
+
+def trim_info(info: dict) -> dict:
+    trimmed = {field: info.get(field) for field in YOUTUBE_INFO_FIELDS}
+    trimmed["formats"] = [
+        {field: fmt.get(field) for field in YOUTUBE_FORMAT_FIELDS}
+        for fmt in info.get("formats") or []
+    ]
+    return trimmed
+
+
+class YouTubeInfoCache:
+    """extract_info results shared by the API (analysis) and workers (downloads) through Redis.
+
+    Best effort: a Redis outage only means extracting again.
+    """
+
+    def __init__(self, connection: Redis | None = None, ttl_seconds: int | None = None) -> None:
+        settings = get_settings()
+        self.connection = connection
+        self.redis_url = settings.redis_url
+        self.ttl_seconds = settings.youtube_info_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+
+    def _connection(self) -> Redis:
+        if self.connection is None:
+            self.connection = Redis.from_url(self.redis_url, socket_connect_timeout=2, socket_timeout=2)
+        return self.connection
+
+    def _key(self, url: str) -> str:
+        return YOUTUBE_INFO_CACHE_PREFIX + hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> dict | None:
+        if self.ttl_seconds <= 0:
+            return None
+        try:
+            raw = self._connection().get(self._key(url))
+            return json.loads(raw) if raw else None
+        except Exception:
+            return None
+
+    def set(self, url: str, info: dict) -> dict:
+        trimmed = trim_info(info)
+        if self.ttl_seconds > 0:
+            try:
+                self._connection().set(self._key(url), json.dumps(trimmed), ex=self.ttl_seconds)
+            except Exception:
+                pass
+        return trimmed
@@ -1,16 +1,29 @@
 from __future__ import annotations
 
 import re
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
 from yt_dlp import YoutubeDL
 
+from app.core.config import get_settings
 from app.core.constants import YOUTUBE_AUDIO_FORMATS, YOUTUBE_AUDIO_QUALITY_ORDER, YOUTUBE_DOWNLOAD_MODES, YOUTUBE_VIDEO_QUALITY_ORDER
-from app.schemas.youtube import YouTubeAnalysisItem, YouTubeQualityOption
+from app.schemas.youtube import YouTubeAnalysisItem, YouTubePlaylistEntry, YouTubePlaylistPage, YouTubeQualityOption
+from app.services.youtube_cache import YouTubeInfoCache
+
+
+# Channel/playlist pages; a watch?v=...&list=... link still means the single video.
+PLAYLIST_PATH_PATTERN = re.compile(r"^/(playlist|channel/[^/]+|c/[^/]+|user/[^/]+|@[^/]+)(/(videos|shorts|streams|playlists))?/?$")
 
 
 class YouTubeService:
+    def __init__(self, info_cache: YouTubeInfoCache | None = None) -> None:
+        self.settings = get_settings()
+        self.info_cache = info_cache or YouTubeInfoCache()
+
     def normalize_urls(self, raw_urls: list[str]) -> list[str]:
         cleaned: list[str] = []
         seen: set[str] = set()
@@ -36,6 +49,15 @@ class YouTubeService:
                 return f"https://www.youtube.com/watch?v={video_id}"
         return url.strip()
 
+    def is_playlist_url(self, url: str) -> bool:
+        parsed = urlparse(url.strip())
+        host = parsed.netloc.lower()
+        if "youtube.com" not in host or parse_qs(parsed.query).get("v"):
+            return False
+        if parsed.path.rstrip("/") == "/playlist":
+            return bool(parse_qs(parsed.query).get("list"))
+        return bool(PLAYLIST_PATH_PATTERN.match(parsed.path))
+
     def validate_mode(self, mode: str) -> str:
         normalized = mode.lower().strip()
         if normalized not in YOUTUBE_DOWNLOAD_MODES:
@@ -48,36 +70,78 @@ class YouTubeService:
             raise ValueError("Unsupported audio format")
         return normalized
 
-    def analyze_urls(self, raw_urls: list[str], mode: str) -> list[YouTubeAnalysisItem]:
+    def analyze_urls(
+        self,
+        raw_urls: list[str],
+        mode: str,
+        on_item: Callable[[int, YouTubeAnalysisItem], None] | None = None,
+    ) -> list[YouTubeAnalysisItem]:
+        """Extract every URL in parallel (cache first); each one gets its own timeout.
+
+        on_item(index, item) is called on the calling thread as each URL finishes.
+        """
         normalized_mode = self.validate_mode(mode)
-        items: list[YouTubeAnalysisItem] = []
-        for url in self.normalize_urls(raw_urls):
-            try:
-                info = self._extract_info(url)
-                items.append(
-                    YouTubeAnalysisItem(
-                        url=url,
-                        normalized_url=info.get("webpage_url") or url,
-                        title=info.get("title"),
-                        duration_seconds=info.get("duration"),
-                        thumbnail_url=info.get("thumbnail"),
-                        platform=info.get("extractor_key") or info.get("extractor"),
-                        available_qualities=self._build_quality_options(info, normalized_mode),
-                        available_audio_formats=list(YOUTUBE_AUDIO_FORMATS),
-                        status="ready",
-                    )
-                )
-            except Exception as exc:
-                items.append(
-                    YouTubeAnalysisItem(
-                        url=url,
-                        status="failed",
-                        error_message=str(exc),
-                        available_qualities=[],
-                        available_audio_formats=[],
-                    )
-                )
-        return items
+        urls = self.normalize_urls(raw_urls)
+        if not urls:
+            return []
+
+        timeout = self.settings.youtube_analyze_timeout_seconds
+        started: dict[int, float] = {}
+        results: dict[int, YouTubeAnalysisItem] = {}
+
+        def finish(index: int, item: YouTubeAnalysisItem) -> None:
+            results[index] = item
+            if on_item is not None:
+                on_item(index, item)
+
+        def extract(index: int) -> dict:
+            started[index] = time.monotonic()
+            return self.get_info(urls[index])
+
+        pool = ThreadPoolExecutor(max_workers=min(self.settings.youtube_analyze_concurrency, len(urls)))
+        try:
+            pending: dict[Future, int] = {pool.submit(extract, index): index for index in range(len(urls))}
+            while pending:
+                done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        item = self._analysis_item(urls[index], future.result(), normalized_mode)
+                    except Exception as exc:
+                        item = self._failed_item(urls[index], str(exc))
+                    finish(index, item)
+                now = time.monotonic()
+                for future, index in list(pending.items()):
+                    if index in started and now - started[index] > timeout:
+                        # The thread finishes on its own (yt-dlp has a socket timeout); stop waiting for it.
+                        pending.pop(future)
+                        finish(index, self._failed_item(urls[index], f"Timed out after {timeout}s"))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return [results[index] for index in range(len(urls))]
+
+    def _analysis_item(self, url: str, info: dict, mode: str) -> YouTubeAnalysisItem:
+        return YouTubeAnalysisItem(
+            url=url,
+            normalized_url=info.get("webpage_url") or url,
+            title=info.get("title"),
+            duration_seconds=info.get("duration"),
+            thumbnail_url=info.get("thumbnail"),
+            platform=info.get("extractor_key") or info.get("extractor"),
+            available_qualities=self._build_quality_options(info, mode),
+            available_audio_formats=list(YOUTUBE_AUDIO_FORMATS),
+            status="ready",
+        )
+
+    def _failed_item(self, url: str, message: str) -> YouTubeAnalysisItem:
+        return YouTubeAnalysisItem(
+            url=url,
+            status="failed",
+            error_message=message,
+            available_qualities=[],
+            available_audio_formats=[],
+        )
 
     def pick_quality(self, available: list[str], selected: str, mode: str) -> str:
         if selected in available:
@@ -97,23 +161,87 @@ class YouTubeService:
                 best_match = value
         return best_match or (available[-1] if available else selected)
 
-    def download_item(self, url: str, output_dir: Path, mode: str, selected_quality: str, audio_format: str) -> tuple[Path, str]:
-        info = self._extract_info(url)
+    def list_playlist_page(self, url: str, start: int, page_size: int) -> YouTubePlaylistPage:
+        """One page of a playlist or channel, from flat extraction only.
+
+        Entries carry what the listing itself reports (title, duration, thumbnail); formats are
+        only extracted later for the entries the user picks. One extra entry is requested to
+        know whether another page exists, and lazy_playlist stops yt-dlp from walking the rest.
+        """
+        ydl_opts = {
+            "quiet": True,
+            "skip_download": True,
+            "extract_flat": "in_playlist",
+            "lazy_playlist": True,
+            "playliststart": start,
+            "playlistend": start + page_size,
+            "socket_timeout": self.settings.youtube_analyze_timeout_seconds,
+        }
+        with YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+
+        if info.get("_type") not in ("playlist", "multi_video"):
+            raise ValueError("This link is not a playlist or channel")
+        raw_entries = [entry for entry in info.get("entries") or [] if entry]
+        entries = [
+            YouTubePlaylistEntry(
+                index=start + offset,
+                url=self.normalize_url(entry.get("url") or entry.get("webpage_url") or ""),
+                title=entry.get("title"),
+                duration_seconds=int(entry["duration"]) if entry.get("duration") else None,
+                thumbnail_url=(entry.get("thumbnails") or [{}])[-1].get("url") or entry.get("thumbnail"),
+            )
+            for offset, entry in enumerate(raw_entries[:page_size])
+            if entry.get("url") or entry.get("webpage_url")
+        ]
+        return YouTubePlaylistPage(
+            url=url,
+            title=info.get("title"),
+            total_count=info.get("playlist_count"),
+            entries=entries,
+            next_start=start + page_size if len(raw_entries) > page_size else None,
+        )
+
+    def get_info(self, url: str) -> dict:
+        """Trimmed metadata, from the analysis cache when this URL was analyzed recently."""
+        if self.is_playlist_url(url):
+            # A full extraction would resolve every entry; the playlist has to be browsed instead.
+            raise ValueError("This is a playlist or channel link; browse it to pick videos")
+        return self.info_cache.get(url) or self.info_cache.set(url, self._extract_info(url))
+
+    def title_for(self, info: dict) -> str:
+        return self._sanitize_name(info.get("title") or "youtube_download")
+
+    def download_item(
+        self,
+        url: str,
+        output_dir: Path,
+        mode: str,
+        selected_quality: str,
+        audio_format: str,
+        *,
+        info: dict | None = None,
+        stem: str | None = None,
+    ) -> tuple[Path, str]:
+        info = info or self.get_info(url)
         available = [option.value for option in self._build_quality_options(info, mode)]
         resolved_quality = self.pick_quality(available, selected_quality, mode)
-        title = self._sanitize_name(info.get("title") or "youtube_download")
+        title = stem or self.title_for(info)
         template = str(output_dir / f"{title}.%(ext)s")
 
         ydl_opts = {
             "quiet": True,
+            "noprogress": True,
             "noplaylist": True,
             "outtmpl": template,
             "merge_output_format": "mp4",
+            "concurrent_fragment_downloads": self.settings.youtube_fragment_concurrency,
         }
 
         if mode == "video":
             max_height = resolved_quality.replace("p", "")
-            ydl_opts["format"] = f"bestvideo[height<={max_height}]+bestaudio/best[height<={max_height}]"
+            # <=? keeps formats whose height is unknown (direct links, some non-YouTube sites).
+            ydl_opts["format"] = f"bestvideo[height<=?{max_height}]+bestaudio/best[height<=?{max_height}]"
         else:
             ydl_opts["format"] = "bestaudio/best"
             ydl_opts["postprocessors"] = [{
@@ -130,7 +258,13 @@ class YouTubeService:
             return final_path, resolved_quality
 
     def _extract_info(self, url: str) -> dict:
-        with YoutubeDL({"quiet": True, "skip_download": True, "noplaylist": True}) as ydl:
+        ydl_opts = {
+            "quiet": True,
+            "skip_download": True,
+            "noplaylist": True,
+            "socket_timeout": self.settings.youtube_analyze_timeout_seconds,
+        }
+        with YoutubeDL(ydl_opts) as ydl:
             return ydl.extract_info(url, download=False)
 
     def _build_quality_options(self, info: dict, mode: str) -> list[YouTubeQualityOption]:
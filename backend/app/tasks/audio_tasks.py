@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from app.core.constants import DEFAULT_OUTPUT_FILE_SUFFIX
 from app.db.session import SessionLocal
 from app.services.audio_service import AUDIO_FORMATS, AudioConversionService
 from app.services.jobs import JobService
@@ -13,6 +14,7 @@ def run_audio_conversion(
     trim_enabled: bool = False,
     trim_start: float | None = None,
     trim_end: float | None = None,
+    normalize: bool = False,
 ) -> dict[str, str]:
     db = SessionLocal()
 
@@ -40,6 +42,7 @@ def run_audio_conversion(
             trim_enabled=trim_enabled,
             trim_start=trim_start,
             trim_end=trim_end,
+            normalize=normalize,
         )
         job_service.mark_completed(job, str(output_path))
 
@@ -55,3 +58,62 @@ def run_audio_conversion(
         raise
     finally:
         db.close()
+
+
+def run_audio_multi_conversion(
+    job_id: str,
+    target_formats: list[str],
+    bitrate: str,
+    trim_enabled: bool = False,
+    trim_start: float | None = None,
+    trim_end: float | None = None,
+    normalize: bool = False,
+) -> dict[str, str]:
+    db = SessionLocal()
+
+    try:
+        job_service = JobService(db)
+        audio_service = AudioConversionService()
+        storage_service = StorageService()
+
+        job = job_service.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Job not found: {job_id}")
+
+        normalized_formats = list(dict.fromkeys(target_format.upper() for target_format in target_formats))
+        for normalized_format in normalized_formats:
+            if normalized_format not in AUDIO_FORMATS:
+                raise ValueError(f"Unsupported audio target format: {normalized_format}")
+
+        output_dir = storage_service.build_job_output_dir(job.id)
+        stem = Path(job.original_filename).stem
+        outputs = [
+            (normalized_format, output_dir / f"{stem}.{normalized_format.lower()}")
+            for normalized_format in normalized_formats
+        ]
+
+        job_service.mark_processing(job)
+        output_paths = audio_service.convert_many(
+            source_path=Path(job.input_path),
+            outputs=outputs,
+            bitrate=bitrate,
+            trim_enabled=trim_enabled,
+            trim_start=trim_start,
+            trim_end=trim_end,
+            normalize=normalize,
+        )
+        for index, output_path in enumerate(output_paths, start=1):
+            job_service.record_output(job, output_path, position=index, total=len(output_paths))
+
+        bundle_path = storage_service.build_bundle_path(job.id)
+        storage_service.create_zip_bundle(bundle_path, output_paths)
+        job_service.mark_completed_with_bundle(job, str(bundle_path), f"{stem}{DEFAULT_OUTPUT_FILE_SUFFIX}.zip")
+
+        return {"job_id": job.id, "status": "completed", "bundle_path": str(bundle_path)}
+    except Exception as exc:
+        job = JobService(db).get_job(job_id)
+        if job is not None:
+            JobService(db).mark_failed(job, str(exc))
+        raise
+    finally:
+        db.close()
@@ -3,20 +3,53 @@ import shutil
 from pathlib import Path
 
 from app.db.session import SessionLocal
+from app.services.audio_batch import audio_batch_workers, longest_first, run_longest_first
 from app.services.audio_service import AUDIO_BITRATES, AUDIO_FORMATS, AudioConversionService
 from app.services.document_service import DOCUMENT_TARGET_FORMATS, DocumentConversionService
-from app.services.image_service import IMAGE_FORMAT_MAP, ImageConversionService
+from app.services.image_batch import (
+    convert_image_file,
+    estimate_decoded_bytes,
+    image_batch_memory_budget,
+    image_batch_workers,
+    run_bounded,
+)
+from app.services.image_encoders import DEFAULT_ENCODER_PROFILE
+from app.services.image_service import DEFAULT_RESIZE_MODE, IMAGE_FORMAT_MAP
 from app.services.jobs import JobService
 from app.services.storage import StorageService
-from app.services.video_service import VIDEO_FORMATS, VideoConversionService
+from app.services.video_service import DEFAULT_VIDEO_PRESET, VIDEO_FORMATS, VideoConversionService
 
 
-def run_batch_image_conversion(job_id: str, file_paths: list[str], target_format: str, quality: int) -> dict[str, str]:
+def _reserve_output_path(output_dir: Path, stem: str, extension: str, used_names: set[str]) -> Path:
+    """{stem}.{extension}, or {stem}_2, _3, ... when an earlier item of the batch took the name.
+
+    Items run in parallel, so names are reserved before anything starts writing.
+    """
+    candidate = output_dir / f"{stem}.{extension}"
+    counter = 2
+    while candidate.name.lower() in used_names:
+        candidate = output_dir / f"{stem}_{counter}.{extension}"
+        counter += 1
+    used_names.add(candidate.name.lower())
+    return candidate
+
+
+def run_batch_image_conversion(
+    job_id: str,
+    file_paths: list[str],
+    target_format: str,
+    quality: int,
+    resize_enabled: bool = False,
+    width: int | None = None,
+    height: int | None = None,
+    resize_mode: str = DEFAULT_RESIZE_MODE,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
+    target_kb: int | None = None,
+) -> dict[str, str]:
     db = SessionLocal()
     try:
         job_service = JobService(db)
         storage = StorageService()
-        image_service = ImageConversionService()
         job = job_service.get_job(job_id)
         if job is None:
             raise ValueError(f"Job not found: {job_id}")
@@ -27,10 +60,10 @@ def run_batch_image_conversion(job_id: str, file_paths: list[str], target_format
 
         output_dir = storage.build_job_output_dir(job_id)
         ext = IMAGE_FORMAT_MAP[normalized_format][1]
-        outputs: list[Path] = []
 
-        job_service.mark_processing(job)
-        for index, file_path in enumerate(file_paths, start=1):
+        items: list[dict] = []
+        used_names: set[str] = set()
+        for file_path in file_paths:
             source = Path(file_path)
             
             # Use a cleaner original filename instead of the uuid prefix
@@ -40,9 +73,33 @@ def run_batch_image_conversion(job_id: str, file_paths: list[str], target_format
                 if len(parts) > 1 and len(parts[0]) >= 32:
                     original_name = parts[1]
                     
-            output = output_dir / f"{original_name}_converted.{ext}"
-            image_service.convert(source_path=source, output_path=output, target_format=normalized_format, quality=quality)
-            outputs.append(output)
+            items.append(
+                {
+                    "source_path": source,
+                    "output_path": _reserve_output_path(output_dir, f"{original_name}_converted", ext, used_names),
+                    "target_format": normalized_format,
+                    "quality": quality,
+                    "resize_enabled": resize_enabled,
+                    "width": width,
+                    "height": height,
+                    "resize_mode": resize_mode,
+                    "encoder_profile": encoder_profile,
+                    "target_kb": target_kb,
+                }
+            )
+
+        job_service.mark_processing(job)
+        outputs = [item["output_path"] for item in items]
+        finished = 0
+        for _, output in run_bounded(
+            convert_image_file,
+            items,
+            cost=lambda item: estimate_decoded_bytes(item["source_path"]),
+            max_workers=min(image_batch_workers(), len(items)),
+            memory_budget=image_batch_memory_budget(),
+        ):
+            finished += 1
+            job_service.record_output(job, output, position=finished, total=len(items))
 
         bundle_path = storage.build_bundle_path(job_id, "images")
         storage.create_zip_bundle(bundle_path, outputs)
@@ -58,7 +115,13 @@ def run_batch_image_conversion(job_id: str, file_paths: list[str], target_format
         db.close()
 
 
-def run_batch_audio_conversion(job_id: str, file_paths: list[str], target_format: str, bitrate: str) -> dict[str, str]:
+def run_batch_audio_conversion(
+    job_id: str,
+    file_paths: list[str],
+    target_format: str,
+    bitrate: str,
+    normalize: bool = False,
+) -> dict[str, str]:
     db = SessionLocal()
     try:
         job_service = JobService(db)
@@ -75,21 +138,40 @@ def run_batch_audio_conversion(job_id: str, file_paths: list[str], target_format
             raise ValueError(f"Unsupported bitrate: {bitrate}")
 
         output_dir = storage.build_job_output_dir(job_id)
-        outputs: list[Path] = []
-
-        job_service.mark_processing(job)
-        for index, file_path in enumerate(file_paths, start=1):
-            source = Path(file_path)
-            
+        sources = [Path(file_path) for file_path in file_paths]
+        items: list[dict] = []
+        used_names: set[str] = set()
+        for source in sources:
             original_name = source.stem
             if len(original_name) > 36 and "-" in original_name:
                 parts = original_name.split("_", 1)
                 if len(parts) > 1 and len(parts[0]) >= 32:
                     original_name = parts[1]
-                    
-            output = output_dir / f"{original_name}_converted.{normalized_format.lower()}"
-            audio_service.convert(source_path=source, output_path=output, target_format=normalized_format, bitrate=bitrate)
-            outputs.append(output)
+
+            items.append(
+                {
+                    "source_path": source,
+                    "output_path": _reserve_output_path(
+                        output_dir, f"{original_name}_converted", normalized_format.lower(), used_names
+                    ),
+                    "target_format": normalized_format,
+                    "bitrate": bitrate,
+                    "threads": 1,
+                    "normalize": normalize,
+                }
+            )
+
+        job_service.mark_processing(job)
+        outputs = [item["output_path"] for item in items]
+        finished = 0
+        for _, output in run_longest_first(
+            audio_service.convert,
+            items,
+            order=longest_first(sources),
+            max_workers=min(audio_batch_workers(), len(items)),
+        ):
+            finished += 1
+            job_service.record_output(job, output, position=finished, total=len(items))
 
         bundle_path = storage.build_bundle_path(job_id, "audio")
         storage.create_zip_bundle(bundle_path, outputs)
@@ -113,6 +195,7 @@ def run_batch_video_conversion(
     resize_enabled: bool,
     width: int | None,
     height: int | None,
+    preset: str = DEFAULT_VIDEO_PRESET,
 ) -> dict[str, str]:
     db = SessionLocal()
     try:
@@ -149,8 +232,10 @@ def run_batch_video_conversion(
                 resize_enabled=resize_enabled,
                 width=width,
                 height=height,
+                preset=preset,
             )
             outputs.append(output)
+            job_service.record_output(job, output, position=index, total=len(file_paths))
 
         bundle_path = storage.build_bundle_path(job_id, "video")
         storage.create_zip_bundle(bundle_path, outputs)
@@ -184,7 +269,7 @@ def run_batch_document_conversion(job_id: str, file_paths: list[str], target_for
         outputs: list[Path] = []
 
         job_service.mark_processing(job)
-        for file_path in file_paths:
+        for index, file_path in enumerate(file_paths, start=1):
             source = Path(file_path)
             
             original_name = source.stem
@@ -202,6 +287,7 @@ def run_batch_document_conversion(job_id: str, file_paths: list[str], target_for
                 converted = new_converted_path
                 
             outputs.append(converted)
+            job_service.record_output(job, converted, position=index, total=len(file_paths))
 
         bundle_path = storage.build_bundle_path(job_id, "documents")
         storage.create_zip_bundle(bundle_path, outputs)
@@ -272,6 +358,7 @@ def run_batch_rename(
             shutil.copy2(source, candidate)
             used_names.add(candidate.name.lower())
             outputs.append(candidate)
+            job_service.record_output(job, candidate, position=index, total=len(file_paths))
 
         bundle_path = storage.build_bundle_path(job_id, "renamed")
         storage.create_zip_bundle(bundle_path, outputs)
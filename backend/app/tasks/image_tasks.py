@@ -1,12 +1,24 @@
 from pathlib import Path
 
+from app.core.constants import DEFAULT_OUTPUT_FILE_SUFFIX
 from app.db.session import SessionLocal
-from app.services.image_service import ImageConversionService, IMAGE_FORMAT_MAP
+from app.services.image_encoders import DEFAULT_ENCODER_PROFILE
+from app.services.image_service import DEFAULT_RESIZE_MODE, ImageConversionService, IMAGE_FORMAT_MAP
 from app.services.jobs import JobService
 from app.services.storage import StorageService
 
 
-def run_image_conversion(job_id: str, target_format: str, quality: int) -> dict[str, str]:
+def run_image_conversion(
+    job_id: str,
+    target_format: str,
+    quality: int,
+    resize_enabled: bool = False,
+    width: int | None = None,
+    height: int | None = None,
+    resize_mode: str = DEFAULT_RESIZE_MODE,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
+    target_kb: int | None = None,
+) -> dict[str, str]:
     db = SessionLocal()
 
     try:
@@ -31,6 +43,12 @@ def run_image_conversion(job_id: str, target_format: str, quality: int) -> dict[
             output_path=output_path,
             target_format=normalized_format,
             quality=quality,
+            resize_enabled=resize_enabled,
+            width=width,
+            height=height,
+            resize_mode=resize_mode,
+            encoder_profile=encoder_profile,
+            target_kb=target_kb,
         )
         job_service.mark_completed(job, str(output_path))
 
@@ -46,3 +64,53 @@ def run_image_conversion(job_id: str, target_format: str, quality: int) -> dict[
         raise
     finally:
         db.close()
+
+
+def run_image_derivatives(
+    job_id: str,
+    widths: list[int],
+    target_formats: list[str],
+    quality: int,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
+    ico_sizes: list[int] | None = None,
+) -> dict[str, str]:
+    db = SessionLocal()
+
+    try:
+        job_service = JobService(db)
+        image_service = ImageConversionService()
+        storage_service = StorageService()
+
+        job = job_service.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Job not found: {job_id}")
+
+        output_dir = storage_service.build_job_output_dir(job.id)
+        stem = Path(job.original_filename).stem
+
+        job_service.mark_processing(job)
+        output_paths = image_service.derive(
+            source_path=Path(job.input_path),
+            output_dir=output_dir,
+            stem=stem,
+            widths=widths,
+            target_formats=target_formats,
+            quality=quality,
+            encoder_profile=encoder_profile,
+            ico_sizes=ico_sizes,
+        )
+        for index, output_path in enumerate(output_paths, start=1):
+            job_service.record_output(job, output_path, position=index, total=len(output_paths))
+
+        bundle_path = storage_service.build_bundle_path(job.id)
+        storage_service.create_zip_bundle(bundle_path, output_paths)
+        job_service.mark_completed_with_bundle(job, str(bundle_path), f"{stem}{DEFAULT_OUTPUT_FILE_SUFFIX}.zip")
+
+        return {"job_id": job.id, "status": "completed", "bundle_path": str(bundle_path)}
+    except Exception as exc:
+        job = JobService(db).get_job(job_id)
+        if job is not None:
+            JobService(db).mark_failed(job, str(exc))
+        raise
+    finally:
+        db.close()
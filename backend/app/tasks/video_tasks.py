@@ -1,9 +1,79 @@
+import shutil
 from pathlib import Path
 
+from rq import get_current_job
+
+from app.core.config import get_settings
+from app.core.constants import DEFAULT_OUTPUT_FILE_SUFFIX, JOB_STATUS_FAILED
 from app.db.session import SessionLocal
+from app.services.encoder_budget import encoder_thread_budget
 from app.services.jobs import JobService
+from app.services.media_probe import MediaProbeService, probe_duration
 from app.services.storage import StorageService
-from app.services.video_service import VIDEO_FORMATS, VideoConversionService
+from app.services.video_service import (
+    DEFAULT_GIF_DITHER,
+    DEFAULT_VIDEO_PRESET,
+    VIDEO_FORMATS,
+    VideoConversionService,
+    needs_video_encode,
+    plan_segments,
+    write_concat_list,
+)
+from app.worker import count_online_workers, enqueue_job
+
+
+def _plan_segmented_encode(
+    source_path: Path,
+    target_format: str,
+    *,
+    fps: int,
+    resize_enabled: bool,
+    trim_enabled: bool,
+    trim_start: float | None,
+    trim_end: float | None,
+) -> list[tuple[float, float]] | None:
+    """Return segment ranges when the encode is long enough to fan out, else None."""
+    settings = get_settings()
+    if not settings.video_segment_enabled or target_format == "GIF":
+        return None
+
+    probe_service = MediaProbeService()
+    try:
+        probe = probe_service.probe(source_path)
+    except (OSError, RuntimeError, ValueError):
+        return None
+
+    ext = target_format.lower()
+    if not needs_video_encode(ext, probe, video_needs_decode=resize_enabled or fps > 0 or trim_enabled):
+        # Remuxes are already fast; splitting them would only add overhead.
+        return None
+
+    duration = probe_duration(probe)
+    if duration is None:
+        return None
+    start = float(trim_start) if trim_enabled and trim_start is not None else 0.0
+    end = min(float(trim_end), duration) if trim_enabled and trim_end is not None else duration
+
+    by_length = int((end - start) // max(settings.video_segment_min_seconds, 1))
+    try:
+        workers = count_online_workers()
+    except Exception:
+        return None
+    count = min(settings.video_segment_max_count, by_length, workers)
+    if count < 2:
+        return None
+
+    try:
+        keyframes = probe_service.keyframe_times(source_path)
+    except (OSError, RuntimeError):
+        return None
+    # -ss is relative to the input start, packet times are absolute.
+    try:
+        offset = float(probe.get("format", {}).get("start_time") or 0.0)
+    except (TypeError, ValueError):
+        offset = 0.0
+    ranges = plan_segments([time - offset for time in keyframes], start, end, count)
+    return ranges if len(ranges) > 1 else None
 
 
 def run_video_conversion(
@@ -18,6 +88,10 @@ def run_video_conversion(
     trim_enabled: bool,
     trim_start: float | None,
     trim_end: float | None,
+    preset: str = DEFAULT_VIDEO_PRESET,
+    gif_max_width: int | None = None,
+    gif_dither: str = DEFAULT_GIF_DITHER,
+    gif_target_kb: int | None = None,
 ) -> dict[str, str]:
     db = SessionLocal()
 
@@ -34,11 +108,69 @@ def run_video_conversion(
         if normalized_format not in VIDEO_FORMATS:
             raise ValueError(f"Unsupported video target format: {target_format}")
 
-        output_path = storage_service.build_output_path(Path(job.original_filename).stem, normalized_format.lower())
-
         job_service.mark_processing(job)
+        source_path = Path(job.input_path)
+
+        ranges = _plan_segmented_encode(
+            source_path,
+            normalized_format,
+            fps=fps,
+            resize_enabled=resize_enabled,
+            trim_enabled=trim_enabled,
+            trim_start=trim_start,
+            trim_end=trim_end,
+        )
+        if ranges:
+            segment_dir = storage_service.build_job_output_dir(job.id) / "segments"
+            segment_dir.mkdir(parents=True, exist_ok=True)
+            ext = normalized_format.lower()
+            segment_paths = [str(segment_dir / f"segment_{index:03d}.{ext}") for index in range(len(ranges))]
+            timeout = storage_service.settings.queue_video_timeout
+
+            segment_jobs = [
+                enqueue_job(
+                    run_video_segment,
+                    job.id,
+                    normalized_format,
+                    segment_path,
+                    start,
+                    end,
+                    len(ranges),
+                    fps,
+                    resize_enabled,
+                    width,
+                    height,
+                    crop_x,
+                    crop_y,
+                    preset,
+                    job_timeout=timeout,
+                    retry_max=1,
+                    job_type=job.job_type,
+                )
+                for segment_path, (start, end) in zip(segment_paths, ranges)
+            ]
+            enqueue_job(
+                run_video_concat,
+                job.id,
+                normalized_format,
+                segment_paths,
+                ranges[0][0],
+                ranges[-1][1],
+                job_timeout=timeout,
+                retry_max=1,
+                job_type=job.job_type,
+                depends_on=segment_jobs,
+            )
+            job_service.update_progress(job, 10, f"Split into {len(ranges)} segments")
+            return {
+                "job_id": job.id,
+                "status": "processing",
+                "segments": str(len(ranges)),
+            }
+
+        output_path = storage_service.build_output_path(Path(job.original_filename).stem, normalized_format.lower())
         video_service.convert(
-            source_path=Path(job.input_path),
+            source_path=source_path,
             output_path=output_path,
             target_format=normalized_format,
             fps=fps,
@@ -50,6 +182,13 @@ def run_video_conversion(
             trim_enabled=trim_enabled,
             trim_start=trim_start,
             trim_end=trim_end,
+            preset=preset,
+            gif_max_width=gif_max_width,
+            gif_dither=gif_dither,
+            gif_target_kb=gif_target_kb,
+            on_progress=lambda fraction: job_service.update_progress(
+                job, 10 + int(fraction * 85), f"Encoding {int(fraction * 100)}%"
+            ),
         )
         job_service.mark_completed(job, str(output_path))
 
@@ -65,3 +204,199 @@ def run_video_conversion(
         raise
     finally:
         db.close()
+
+
+def run_video_multi_conversion(
+    job_id: str,
+    target_formats: list[str],
+    fps: int,
+    resize_enabled: bool,
+    width: int | None,
+    height: int | None,
+    crop_x: int | None,
+    crop_y: int | None,
+    trim_enabled: bool,
+    trim_start: float | None,
+    trim_end: float | None,
+    preset: str = DEFAULT_VIDEO_PRESET,
+    gif_max_width: int | None = None,
+    gif_dither: str = DEFAULT_GIF_DITHER,
+    gif_target_kb: int | None = None,
+) -> dict[str, str]:
+    db = SessionLocal()
+
+    try:
+        job_service = JobService(db)
+        video_service = VideoConversionService()
+        storage_service = StorageService()
+
+        job = job_service.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Job not found: {job_id}")
+
+        normalized_formats = list(dict.fromkeys(target_format.upper() for target_format in target_formats))
+        for normalized_format in normalized_formats:
+            if normalized_format not in VIDEO_FORMATS:
+                raise ValueError(f"Unsupported video target format: {normalized_format}")
+
+        output_dir = storage_service.build_job_output_dir(job.id)
+        stem = Path(job.original_filename).stem
+        outputs = [
+            (normalized_format, output_dir / f"{stem}.{normalized_format.lower()}")
+            for normalized_format in normalized_formats
+        ]
+
+        job_service.mark_processing(job)
+        video_service.convert_many(
+            source_path=Path(job.input_path),
+            outputs=outputs,
+            fps=fps,
+            resize_enabled=resize_enabled,
+            width=width,
+            height=height,
+            crop_x=crop_x,
+            crop_y=crop_y,
+            trim_enabled=trim_enabled,
+            trim_start=trim_start,
+            trim_end=trim_end,
+            preset=preset,
+            gif_max_width=gif_max_width,
+            gif_dither=gif_dither,
+            gif_target_kb=gif_target_kb,
+        )
+        output_paths = [output_path for _, output_path in outputs]
+        for index, output_path in enumerate(output_paths, start=1):
+            job_service.record_output(job, output_path, position=index, total=len(output_paths))
+
+        bundle_path = storage_service.build_bundle_path(job.id)
+        storage_service.create_zip_bundle(bundle_path, output_paths)
+        job_service.mark_completed_with_bundle(job, str(bundle_path), f"{stem}{DEFAULT_OUTPUT_FILE_SUFFIX}.zip")
+
+        return {"job_id": job.id, "status": "completed", "bundle_path": str(bundle_path)}
+    except Exception as exc:
+        job = JobService(db).get_job(job_id)
+        if job is not None:
+            JobService(db).mark_failed(job, str(exc))
+        raise
+    finally:
+        db.close()
+
+
+def _mark_failed_if_final(db, job_id: str, message: str) -> None:
+    # Leave the job alone while RQ still has a retry queued for this sub-job.
+    current = get_current_job()
+    if current is not None and (current.retries_left or 0) > 0:
+        return
+    job = JobService(db).get_job(job_id)
+    if job is not None:
+        JobService(db).mark_failed(job, message)
+
+
+def run_video_segment(
+    job_id: str,
+    target_format: str,
+    segment_path: str,
+    start: float,
+    end: float,
+    segment_count: int,
+    fps: int,
+    resize_enabled: bool,
+    width: int | None,
+    height: int | None,
+    crop_x: int | None,
+    crop_y: int | None,
+    preset: str = DEFAULT_VIDEO_PRESET,
+) -> dict[str, str]:
+    db = SessionLocal()
+
+    try:
+        job_service = JobService(db)
+        video_service = VideoConversionService()
+
+        job = job_service.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Job not found: {job_id}")
+        if job.status == JOB_STATUS_FAILED:
+            return {"job_id": job.id, "status": "skipped"}
+
+        output = Path(segment_path)
+        video_service.run(
+            video_service.build_segment_command(
+                source_path=Path(job.input_path),
+                segment_path=output,
+                target_format=target_format,
+                start=start,
+                end=end,
+                fps=fps,
+                resize_enabled=resize_enabled,
+                width=width,
+                height=height,
+                crop_x=crop_x,
+                crop_y=crop_y,
+                preset=preset,
+                threads=encoder_thread_budget(),
+            )
+        )
+        output.with_suffix(".done").touch()
+
+        done = len(list(output.parent.glob("*.done")))
+        job_service.update_progress(job, 10 + int(done / max(segment_count, 1) * 80), f"Encoded segment {done}/{segment_count}")
+        return {"job_id": job.id, "status": "completed", "output_path": segment_path}
+    except Exception as exc:
+        _mark_failed_if_final(db, job_id, str(exc))
+        raise
+    finally:
+        db.close()
+
+
+def run_video_concat(
+    job_id: str,
+    target_format: str,
+    segment_paths: list[str],
+    start: float,
+    end: float,
+) -> dict[str, str]:
+    db = SessionLocal()
+
+    try:
+        job_service = JobService(db)
+        video_service = VideoConversionService()
+        storage_service = StorageService()
+
+        job = job_service.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Job not found: {job_id}")
+        if job.status == JOB_STATUS_FAILED:
+            return {"job_id": job.id, "status": "skipped"}
+
+        source_path = Path(job.input_path)
+        segments = [Path(path) for path in segment_paths]
+        segment_dir = segments[0].parent
+        list_path = write_concat_list(segments, segment_dir / "concat.txt")
+
+        output_path = storage_service.build_output_path(Path(job.original_filename).stem, target_format.lower())
+        job_service.update_progress(job, 92, "Joining segments")
+        video_service.run(
+            video_service.build_concat_command(
+                list_path=list_path,
+                source_path=source_path,
+                output_path=output_path,
+                target_format=target_format,
+                start=start,
+                end=end,
+                probe=MediaProbeService().probe(source_path),
+            )
+        )
+        shutil.rmtree(segment_dir, ignore_errors=True)
+        job_service.mark_completed(job, str(output_path))
+
+        return {
+            "job_id": job.id,
+            "status": "completed",
+            "output_path": str(output_path),
+        }
+    except Exception as exc:
+        _mark_failed_if_final(db, job_id, str(exc))
+        raise
+    finally:
+        db.close()
@@ -1,11 +1,94 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from app.core.config import get_settings
+from app.core.constants import JOB_STATUS_QUEUED
 from app.db.session import SessionLocal
 from app.services.jobs import JobService
 from app.services.storage import StorageService
+from app.schemas.youtube import YouTubeAnalysisItem
 from app.services.youtube_service import YouTubeService
 
 
+_analyze_executor: ThreadPoolExecutor | None = None
+_analyze_executor_lock = threading.Lock()
+
+
+def analyze_executor() -> ThreadPoolExecutor:
+    """Bounded pool for analyses inside the API process, apart from FastAPI's request threadpool.
+
+    Analysis is a few seconds of network I/O, too short to wait behind transcodes on the RQ queue.
+    """
+    global _analyze_executor
+    with _analyze_executor_lock:
+        if _analyze_executor is None:
+            _analyze_executor = ThreadPoolExecutor(
+                max_workers=get_settings().youtube_analyze_workers,
+                thread_name_prefix="youtube-analyze",
+            )
+        return _analyze_executor
+
+
+def analysis_results_path(job_id: str) -> Path:
+    return StorageService().build_job_output_dir(job_id) / "analysis.json"
+
+
+def read_analysis_results(job_id: str, urls: list[str]) -> list[YouTubeAnalysisItem]:
+    """Finished items as recorded so far; URLs still being analyzed come back as "pending"."""
+    try:
+        recorded = json.loads(analysis_results_path(job_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        recorded = []
+    recorded += [None] * (len(urls) - len(recorded))
+    return [
+        YouTubeAnalysisItem.model_validate(item) if item else YouTubeAnalysisItem(url=url, status="pending")
+        for url, item in zip(urls, recorded)
+    ]
+
+
+def run_youtube_analysis(job_id: str, urls: list[str], download_mode: str) -> dict[str, str]:
+    db = SessionLocal()
+    try:
+        job_service = JobService(db)
+        job = job_service.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Job not found: {job_id}")
+        if job.status != JOB_STATUS_QUEUED:
+            # Failed as orphaned (or cancelled) while waiting for an executor thread; leave it so.
+            return {"job_id": job.id, "status": job.status}
+
+        results_path = analysis_results_path(job_id)
+        recorded: list[dict | None] = [None] * len(urls)
+        job_service.mark_processing(job)
+        job_service.update_progress(job, 10, f"Analyzing {len(urls)} link(s)")
+
+        def record(index: int, item: YouTubeAnalysisItem) -> None:
+            recorded[index] = item.model_dump(mode="json")
+            # Replace rather than rewrite so pollers never read a half-written file.
+            partial_path = results_path.with_suffix(".tmp")
+            partial_path.write_text(json.dumps(recorded), encoding="utf-8")
+            partial_path.replace(results_path)
+            finished = len(urls) - recorded.count(None)
+            job_service.update_progress(
+                job,
+                min(95, 10 + int(finished / len(urls) * 85)),
+                f"Analyzed {finished}/{len(urls)} link(s)",
+            )
+
+        YouTubeService().analyze_urls(urls, download_mode, on_item=record)
+        job_service.mark_completed(job, str(results_path))
+        return {"job_id": job.id, "output_path": str(results_path)}
+    except Exception as exc:
+        job = JobService(db).get_job(job_id)
+        if job is not None:
+            JobService(db).mark_failed(job, str(exc))
+        raise
+    finally:
+        db.close()
+
+
 def run_youtube_download(job_id: str, urls: list[str], download_mode: str, selected_quality: str, audio_format: str) -> dict[str, str]:
     db = SessionLocal()
     try:
@@ -17,15 +100,38 @@ def run_youtube_download(job_id: str, urls: list[str], download_mode: str, selec
             raise ValueError(f"Job not found: {job_id}")
 
         output_dir = storage.build_job_output_dir(job_id)
-        outputs: list[Path] = []
+        outputs: list[Path | None] = [None] * len(urls)
         job_service.mark_processing(job)
+        job_service.update_progress(job, 10, f"Downloading {len(urls)} item(s)")
+
+        used_stems: set[str] = set()
+        stem_lock = threading.Lock()
+
+        def download(url: str) -> tuple[Path, str]:
+            # Network-bound, so threads overlap fine; the DB session stays on this thread.
+            info = youtube.get_info(url)
+            title = youtube.title_for(info)
+            with stem_lock:
+                stem, counter = title, 2
+                while stem.lower() in used_stems:
+                    stem = f"{title}_{counter}"
+                    counter += 1
+                used_stems.add(stem.lower())
+            return youtube.download_item(url, output_dir, download_mode, selected_quality, audio_format, info=info, stem=stem)
 
-        for index, url in enumerate(urls, start=1):
-            progress = 10 + int((index - 1) / max(len(urls), 1) * 80)
-            job_service.update_progress(job, progress, f"Downloading item {index}/{len(urls)}")
-            output_path, resolved_quality = youtube.download_item(url, output_dir, download_mode, selected_quality, audio_format)
-            outputs.append(output_path)
-            job_service.update_progress(job, min(95, progress + 10), f"Downloaded item {index}/{len(urls)} at {resolved_quality}")
+        pool = ThreadPoolExecutor(max_workers=max(1, min(youtube.settings.youtube_download_concurrency, len(urls))))
+        try:
+            futures = {pool.submit(download, url): index for index, url in enumerate(urls)}
+            for finished, future in enumerate(as_completed(futures), start=1):
+                output_path, resolved_quality = future.result()
+                outputs[futures[future]] = output_path
+                job_service.update_progress(
+                    job,
+                    min(95, 10 + int(finished / len(urls) * 85)),
+                    f"Downloaded item {finished}/{len(urls)} at {resolved_quality}",
+                )
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
 
         if len(outputs) == 1:
             job_service.mark_completed(job, str(outputs[0]))
@@ -33,7 +139,7 @@ def run_youtube_download(job_id: str, urls: list[str], download_mode: str, selec
 
         bundle_path = storage.build_bundle_path(job_id, "youtube")
         job_service.update_progress(job, 96, "Creating zip bundle")
-        storage.create_zip_bundle(bundle_path, outputs)
+        storage.create_zip_bundle(bundle_path, [path for path in outputs if path is not None])
         job_service.mark_completed_with_bundle(job, str(bundle_path), bundle_path.name)
         return {"job_id": job.id, "bundle_path": str(bundle_path)}
     except Exception as exc:
@@ -70,6 +70,16 @@ def list_worker_statuses() -> list[dict]:
     return workers
 
 
+def count_online_workers() -> int:
+    threshold = get_settings().worker_offline_threshold_seconds
+    now = _now()
+    return sum(
+        1
+        for worker in list_worker_statuses()
+        if now - int(worker.get("last_seen", 0) or 0) <= threshold
+    )
+
+
 def set_worker_status(worker_id: str, payload: dict) -> None:
     get_redis_connection().hset(WORKER_STATUS_KEY, worker_id, json.dumps(payload))
 
@@ -1,9 +1,40 @@
+import asyncio
+import hashlib
+import http.server
+import struct
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from fastapi import UploadFile
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.models.job import Job
+from app.models.job_file import JobFile
+from app.models.stored_file import StoredFile, StoredFileDir
+from app.services import media_probe
+from app.services.audio_batch import longest_first, run_longest_first
+from app.services.audio_service import AudioConversionService
+from app.services.file_catalog import FileCatalogService
+from app.services.image_encoders import encode_to_target, encoder_options
+from app.services.image_batch import convert_image_file, estimate_decoded_bytes, run_bounded
+from app.services.image_service import ImageConversionService, plan_resize
+from app.services.image_tiles import resize_in_strips
+from app.services.jobs import JobService, normalize_file_path
+from app.services.media_probe import MediaProbeService
 from app.services.storage import StorageService
-from app.services.upload_validation import UploadValidationService
+from app.services.upload_validation import UploadValidationService, matches_magic
+from app.services.video_service import VideoConversionService, plan_segments
+from app.services.youtube_cache import YouTubeInfoCache
+from app.services.youtube_service import YouTubeService
+from app.tasks import youtube_tasks
+from app.tasks.batch_tasks import _reserve_output_path
 
 
 class DummyFile:
@@ -37,3 +68,1020 @@ async def test_upload_validation_accepts_allowed_extension(tmp_path: Path) -> No
     upload = UploadFile(filename="sample.png", file=DummyFile(file_path))
     service = UploadValidationService()
     await service.validate_file(upload, allowed_extensions=[".png"])
+
+
+def _memory_session() -> Session:
+    engine = create_engine("sqlite://", future=True)
+    Job.__table__.create(bind=engine)
+    JobFile.__table__.create(bind=engine)
+    StoredFile.__table__.create(bind=engine)
+    StoredFileDir.__table__.create(bind=engine)
+    return sessionmaker(bind=engine, future=True)()
+
+
+def test_job_list_page_uses_keyset_cursor() -> None:
+    db = _memory_session()
+    base_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for index in range(5):
+        db.add(
+            Job(
+                user_id="user-1",
+                job_type="image",
+                status="completed" if index % 2 == 0 else "failed",
+                original_filename=f"file-{index}.png",
+                stored_filename=f"stored-{index}.png",
+                input_path=f"/tmp/file-{index}.png",
+                created_at=base_time + timedelta(minutes=index),
+            )
+        )
+    db.commit()
+
+    service = JobService(db)
+    first_page, cursor = service.list_job_page(user_id="user-1", limit=2)
+    assert [row.original_filename for row in first_page] == ["file-4.png", "file-3.png"]
+    assert cursor is not None
+
+    second_page, cursor = service.list_job_page(user_id="user-1", limit=2, cursor=cursor)
+    assert [row.original_filename for row in second_page] == ["file-2.png", "file-1.png"]
+
+    last_page, cursor = service.list_job_page(user_id="user-1", limit=2, cursor=cursor)
+    assert [row.original_filename for row in last_page] == ["file-0.png"]
+    assert cursor is None
+
+    completed, _ = service.list_job_page(user_id="user-1", status="completed")
+    assert len(completed) == 3
+    db.close()
+
+
+def test_batch_job_files_are_indexed_by_path(tmp_path: Path) -> None:
+    db = _memory_session()
+    inputs = []
+    for index in range(3):
+        path = tmp_path / f"input-{index}.png"
+        path.write_bytes(b"data" * (index + 1))
+        inputs.append(path)
+
+    service = JobService(db)
+    job = service.create_job(
+        job_type="batch_image",
+        original_filename="3 files",
+        stored_filename=inputs[0].name,
+        input_path=str(inputs[0]),
+        user_id="user-1",
+        input_files=inputs,
+    )
+    assert all(row.sha256 is None for row in db.scalars(select(JobFile).where(JobFile.job_id == job.id)))
+    service.mark_processing(job)
+    hashes = db.scalars(select(JobFile.sha256).where(JobFile.job_id == job.id).order_by(JobFile.position)).all()
+    assert hashes == [hashlib.sha256(b"data" * (index + 1)).hexdigest() for index in range(3)]
+
+    output = tmp_path / "output-1.webp"
+    output.write_bytes(b"out")
+    service.record_output(job, output, position=1, total=3)
+
+    assert service.count_job_files(job.id, "input") == 3
+    assert job.progress_detail == "Converted 1/3"
+    owners = service.find_file_owners([normalize_file_path(inputs[2]), normalize_file_path(output)])
+    assert owners[normalize_file_path(inputs[2])] == (job.id, "user-1")
+    assert owners[normalize_file_path(output)] == (job.id, "user-1")
+
+    service.delete_job(job)
+    assert service.list_job_file_paths(job.id) == []
+    db.close()
+
+
+def test_file_catalog_reconciles_only_changed_directories() -> None:
+    db = _memory_session()
+    catalog = FileCatalogService(db)
+    job_dir = catalog.settings.output_dir / "catalog-test-job"
+    job_dir.mkdir(parents=True, exist_ok=True)
+    first = job_dir / "first.png"
+    first.write_bytes(b"1")
+    try:
+        catalog.reconcile("outputs")
+        rows, _ = catalog.list_page("outputs", limit=5000)
+        assert "catalog-test-job/first.png" in {row.relative_path for row in rows}
+
+        second = job_dir / "second.png"
+        second.write_bytes(b"22")
+        first.unlink()
+        catalog.reconcile("outputs")
+        names = {row.relative_path for row in catalog.list_page("outputs", limit=5000)[0]}
+        assert "catalog-test-job/second.png" in names
+        assert "catalog-test-job/first.png" not in names
+
+        page, cursor = catalog.list_page("outputs", limit=1, sort="size")
+        assert len(page) == 1
+        assert cursor is not None
+    finally:
+        for path in job_dir.iterdir():
+            path.unlink()
+        job_dir.rmdir()
+        db.close()
+
+
+def test_cleanup_removes_all_artifacts_in_chunks() -> None:
+    from app.services.cleanup_service import CleanupService
+
+    db = _memory_session()
+    service = JobService(db)
+    settings = FileCatalogService(db).settings
+    old = datetime.now(timezone.utc) - timedelta(hours=48)
+    job_ids = []
+    created_paths = []
+    for index in range(3):
+        upload = settings.upload_dir / f"cleanup-test-{index}.png"
+        upload.write_bytes(b"in")
+        job = service.create_job(
+            job_type="batch_image",
+            original_filename="1 files",
+            stored_filename=upload.name,
+            input_path=str(upload),
+            input_files=[upload],
+        )
+        job_dir = settings.output_dir / job.id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / "out.webp").write_bytes(b"out")
+        bundle = settings.output_dir / f"{job.id}_images.zip"
+        bundle.write_bytes(b"zip")
+        service.mark_completed_with_bundle(job, str(bundle), bundle.name)
+        job.updated_at = old
+        db.commit()
+        job_ids.append(job.id)
+        created_paths.extend([upload, job_dir, bundle])
+
+    deleted = CleanupService(db, batch_size=2).cleanup_finished_jobs(older_than_hours=24)
+
+    assert deleted == 3
+    assert all(not path.exists() for path in created_paths)
+    assert all(service.get_job(job_id) is None for job_id in job_ids)
+    db.close()
+
+
+def test_cleanup_reads_input_path_only_for_jobs_without_job_files() -> None:
+    from app.services.cleanup_service import CleanupService
+
+    db = _memory_session()
+    settings = FileCatalogService(db).settings
+    uploads = [settings.upload_dir / f"legacy-cleanup-{index}.png" for index in range(3)]
+    for upload in uploads:
+        upload.write_bytes(b"in")
+    old = datetime.now(timezone.utc) - timedelta(hours=48)
+    # Pre-job_files batch row: every input only lives in the newline-joined input_path.
+    legacy = Job(
+        job_type="batch_image", status="completed", original_filename="2 files", stored_filename=uploads[0].name,
+        input_path="\n".join(str(upload) for upload in uploads[:2]), progress=100, updated_at=old,
+    )
+    db.add(legacy)
+    db.commit()
+    tracked = JobService(db).create_job(
+        job_type="batch_image", original_filename="1 files", stored_filename=uploads[2].name,
+        input_path=str(uploads[2]), input_files=[uploads[2]],
+    )
+    tracked.status = "completed"
+    tracked.updated_at = old
+    db.commit()
+
+    cleanup = CleanupService(db)
+    assert cleanup._jobs_without_files([legacy.id, tracked.id]) == {legacy.id}
+    assert cleanup.cleanup_finished_jobs(older_than_hours=24) == 2
+    assert not any(upload.exists() for upload in uploads)
+    db.close()
+
+
+def test_quota_uses_catalog_totals_without_rescanning(monkeypatch) -> None:
+    from app.services.cleanup_service import CleanupService
+
+    db = _memory_session()
+    cleanup = CleanupService(db)
+    cleanup.catalog.reconcile()
+    scanned: list[str | None] = []
+    monkeypatch.setattr(cleanup.catalog, "reconcile", lambda source=None: scanned.append(source))
+
+    assert cleanup.enforce_quota(quota_bytes=1 << 40) == 0
+    assert scanned == []
+    db.close()
+
+
+def test_periodic_cycle_lock_runs_once_per_interval() -> None:
+    from app.services.background import acquire_cycle_lock
+
+    class FakeRedis:
+        def __init__(self) -> None:
+            self.keys: dict[str, tuple[str, int]] = {}
+
+        def set(self, key, value, nx=False, ex=None):
+            if nx and key in self.keys:
+                return None
+            self.keys[key] = (value, ex)
+            return True
+
+    class DownRedis:
+        def set(self, *args, **kwargs):
+            raise ConnectionError("redis is down")
+
+    connection = FakeRedis()
+    assert acquire_cycle_lock("cleanup-scheduler", 60, connection) is True
+    assert acquire_cycle_lock("cleanup-scheduler", 60, connection) is False
+    assert acquire_cycle_lock("file-catalog-reconciler", 60, connection) is True
+    assert connection.keys["periodic_task_lock:cleanup-scheduler"][1] == 60
+    assert acquire_cycle_lock("cleanup-scheduler", 60, DownRedis()) is True
+
+
+def _probe(video_codec: str, audio_codec: str) -> dict:
+    return {
+        "streams": [
+            {"index": 0, "codec_type": "video", "codec_name": "mjpeg", "disposition": {"attached_pic": 1}},
+            {"index": 1, "codec_type": "video", "codec_name": video_codec},
+            {"index": 2, "codec_type": "audio", "codec_name": audio_codec},
+        ]
+    }
+
+
+def test_video_build_command_remuxes_compatible_streams() -> None:
+    cmd = VideoConversionService().build_command(
+        source_path=Path("in.mkv"),
+        output_path=Path("out.mp4"),
+        target_format="MP4",
+        probe=_probe("h264", "aac"),
+    )
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+    assert cmd[cmd.index("-c:a") + 1] == "copy"
+    assert "0:0" not in cmd
+
+
+def test_video_build_command_encodes_only_streams_that_need_it() -> None:
+    service = VideoConversionService()
+    cmd = service.build_command(
+        source_path=Path("in.mkv"),
+        output_path=Path("out.webm"),
+        target_format="WEBM",
+        probe=_probe("vp9", "aac"),
+    )
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+    assert cmd[cmd.index("-c:a") + 1] == "libopus"
+
+    trimmed = service.build_command(
+        source_path=Path("in.mov"),
+        output_path=Path("out.mp4"),
+        target_format="MP4",
+        trim_enabled=True,
+        trim_start=1.0,
+        trim_end=2.0,
+        probe=_probe("h264", "aac"),
+    )
+    assert trimmed[trimmed.index("-c:v") + 1] == "libx264"
+    assert trimmed[trimmed.index("-c:a") + 1] == "copy"
+
+
+def test_plan_segments_cuts_on_keyframes_and_covers_range() -> None:
+    keyframes = [0.0, 2.0, 4.0, 6.0, 8.0, 10.0, 12.0]
+    ranges = plan_segments(keyframes, 1.0, 11.0, 3)
+    assert ranges == [(1.0, 6.0), (6.0, 8.0), (8.0, 11.0)]
+    assert plan_segments([0.0], 0.0, 10.0, 4) == [(0.0, 10.0)]
+
+
+def test_video_build_command_applies_preset_and_thread_budget() -> None:
+    cmd = VideoConversionService().build_command(
+        source_path=Path("in.mov"),
+        output_path=Path("out.webm"),
+        target_format="WEBM",
+        preset="fast",
+        threads=2,
+    )
+    assert cmd[cmd.index("-deadline") + 1] == "realtime"
+    assert cmd[cmd.index("-row-mt") + 1] == "1"
+    assert cmd.count("-threads") == 2
+    assert cmd.index("-threads") < cmd.index("-i")
+
+
+def test_video_gif_uses_single_palette_filter_graph() -> None:
+    cmd = VideoConversionService().build_command(
+        source_path=Path("in.mp4"),
+        output_path=Path("out.gif"),
+        target_format="GIF",
+        fps=60,
+        gif_max_width=320,
+        gif_dither="bayer",
+    )
+    gif_filter = cmd[cmd.index("-vf") + 1]
+    assert gif_filter.startswith("fps=30,scale='min(320,iw)'")
+    assert "palettegen" in gif_filter
+    assert "paletteuse=dither=bayer" in gif_filter
+    assert "-an" in cmd
+
+
+def test_video_multi_command_decodes_once_and_splits() -> None:
+    cmd = VideoConversionService().build_multi_command(
+        source_path=Path("in.mkv"),
+        outputs=[("MP4", Path("out.mp4")), ("WEBM", Path("out.webm")), ("GIF", Path("out.gif"))],
+        probe=_probe("h264", "aac"),
+        threads=2,
+    )
+    assert cmd.count("-i") == 1
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph.startswith("[0:1]split=2[s0][s1]")
+    assert "palettegen" in graph
+    mp4_args = cmd[cmd.index("-filter_complex") + 2:cmd.index("out.mp4")]
+    assert mp4_args[:4] == ["-map", "0:1", "-c:v", "copy"]
+
+
+def test_video_multi_command_rejects_gif_without_video_stream() -> None:
+    audio_only = {"streams": [{"index": 0, "codec_type": "audio", "codec_name": "aac"}]}
+    service = VideoConversionService()
+    with pytest.raises(ValueError, match="needs a video stream"):
+        service.build_multi_command(
+            source_path=Path("in.m4a"), outputs=[("MP4", Path("o.mp4")), ("GIF", Path("o.gif"))], probe=audio_only
+        )
+
+    cmd = service.build_multi_command(
+        source_path=Path("in.m4a"), outputs=[("MP4", Path("o.mp4")), ("MKV", Path("o.mkv"))], probe=audio_only
+    )
+    assert "0:v:0" not in cmd and cmd.count("0:0") == 2
+
+
+def test_video_multi_conversion_keeps_gif_size_target(tmp_path: Path, monkeypatch) -> None:
+    service = VideoConversionService()
+    gif_calls: list[dict] = []
+    shared_runs: list[list[str]] = []
+    monkeypatch.setattr(service, "convert_gif", lambda **kwargs: gif_calls.append(kwargs))
+    monkeypatch.setattr(service, "run", lambda cmd, **kwargs: shared_runs.append(cmd))
+    monkeypatch.setattr(MediaProbeService, "probe", lambda self, path, **kwargs: _probe("h264", "aac"))
+
+    outputs = [("MP4", tmp_path / "out.mp4"), ("GIF", tmp_path / "out.gif")]
+    assert service.convert_many(source_path=tmp_path / "in.mkv", outputs=outputs, gif_target_kb=500) == [
+        tmp_path / "out.mp4",
+        tmp_path / "out.gif",
+    ]
+
+    assert [(call["output_path"], call["target_kb"]) for call in gif_calls] == [(tmp_path / "out.gif", 500)]
+    assert len(shared_runs) == 1
+    assert str(tmp_path / "out.mp4") in shared_runs[0]
+    assert str(tmp_path / "out.gif") not in shared_runs[0]
+
+
+def test_audio_multi_command_maps_one_input_to_every_output() -> None:
+    cmd = AudioConversionService().build_multi_command(
+        source_path=Path("in.wav"),
+        outputs=[("MP3", Path("out.mp3")), ("OPUS", Path("out.opus")), ("WAV", Path("out.wav"))],
+        bitrate="192k",
+        trim_enabled=True,
+        trim_start=1.0,
+        trim_end=3.0,
+        threads=1,
+    )
+    assert cmd.count("-i") == 1
+    assert cmd.count("-map") == 3
+    assert cmd.index("-t") < cmd.index("-i")
+    assert cmd[cmd.index("out.opus") - 1] == "libopus"
+
+
+def test_media_probe_caches_in_memory_and_on_disk(tmp_path: Path, monkeypatch) -> None:
+    source = tmp_path / "clip.mp4"
+    source.write_bytes(b"not really a video")
+    calls: list[Path] = []
+
+    def fake_ffprobe(self, path: Path, *, timeout):
+        calls.append(path)
+        return {"format": {"duration": "12.5"}, "streams": []}
+
+    monkeypatch.setattr(MediaProbeService, "_run_ffprobe", fake_ffprobe)
+    service = MediaProbeService(cache_dir=tmp_path / "cache")
+    assert service.duration(source) == 12.5
+    assert service.duration(source) == 12.5
+    assert len(calls) == 1
+    assert list((tmp_path / "cache").glob("*/*.json"))
+
+    media_probe._probe_cache.clear()
+    assert MediaProbeService(cache_dir=tmp_path / "cache").duration(source) == 12.5
+    assert len(calls) == 1
+
+
+def test_keyframe_scan_is_cached_and_times_out(tmp_path: Path, monkeypatch) -> None:
+    source = tmp_path / "clip.mp4"
+    source.write_bytes(b"not really a video")
+    calls: list[float | None] = []
+
+    def fake_run(cmd, *, timeout, **kwargs):
+        calls.append(timeout)
+        return subprocess.CompletedProcess(cmd, 0, stdout="4.0,K_\n0.0,K_\n2.0,__\n", stderr="")
+
+    monkeypatch.setattr(media_probe.subprocess, "run", fake_run)
+    service = MediaProbeService(cache_dir=tmp_path / "cache")
+    assert service.keyframe_times(source) == [0.0, 4.0]
+    media_probe._probe_cache.clear()
+    assert MediaProbeService(cache_dir=tmp_path / "cache").keyframe_times(source) == [0.0, 4.0]
+    assert calls == [media_probe.KEYFRAME_SCAN_TIMEOUT_SECONDS]
+
+    def slow_run(cmd, *, timeout, **kwargs):
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    monkeypatch.setattr(media_probe.subprocess, "run", slow_run)
+    other = tmp_path / "other.mp4"
+    other.write_bytes(b"another video")
+    with pytest.raises(media_probe.ProbeTimeoutError):
+        service.keyframe_times(other, timeout=1)
+
+
+def test_upload_content_check_rejects_mislabeled_files(tmp_path: Path) -> None:
+    service = UploadValidationService()
+    real_png = tmp_path / "real.png"
+    Image.new("RGB", (4, 4), "red").save(real_png)
+    fake_png = tmp_path / "fake.png"
+    fake_png.write_bytes(b"fake-image")
+    truncated_png = tmp_path / "truncated.png"
+    truncated_png.write_bytes(real_png.read_bytes()[:20])
+
+    assert service._content_error(real_png, "image") is None
+    assert service._content_error(fake_png, "image") == "File content does not match its extension"
+    assert service._content_error(truncated_png, "image") == "File is not a readable image"
+    assert matches_magic(b"RIFF\x24\x00\x00\x00WAVEfmt ", ".wav")
+    assert not matches_magic(b"RIFF\x24\x00\x00\x00AVI LIST", ".wav")
+    # MPEG audio and ADTS frames match on their sync bits, CRC-protected or not.
+    for head, extension in [(b"\xff\xfa", ".mp3"), (b"\xff\xe2", ".mp3"), (b"\xff\xf0", ".aac"), (b"\xff\xf8", ".aac")]:
+        assert matches_magic(head + bytes(14), extension)
+    assert not matches_magic(b"\xff\xf1" + bytes(14), ".mp3")
+    assert not matches_magic(b"\xff\xfb" + bytes(14), ".aac")
+
+
+def _bmp_header(path: Path, width: int, height: int) -> Path:
+    # Header only: Pillow reads the size without any pixel data behind it.
+    info = struct.pack("<IiiHHIIiiII", 40, width, height, 1, 24, 0, 0, 2835, 2835, 0, 0)
+    path.write_bytes(b"BM" + struct.pack("<IHHI", 70, 0, 0, 54) + info + bytes(16))
+    return path
+
+
+def test_upload_content_check_sizes_huge_images_from_the_header(tmp_path: Path, monkeypatch) -> None:
+    service = UploadValidationService()
+    scan = _bmp_header(tmp_path / "scan.bmp", 15000, 15000)
+    assert service._content_error(scan, "image") is None
+
+    monkeypatch.setattr(service.settings, "image_tiled_max_pixels", 100_000_000)
+    assert service._content_error(scan, "image") == "Image is larger than 100,000,000 pixels"
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1_000)
+    assert service._content_error(scan, "image") == "Image is larger than 100,000,000 pixels"
+
+    with pytest.raises(HTTPException):
+        asyncio.run(service.validate_content(scan, kind="image"))
+    assert not scan.exists()
+
+
+def test_image_resize_modes_use_draft_decode(tmp_path: Path) -> None:
+    source = tmp_path / "photo.jpg"
+    Image.new("RGB", (3200, 2400), "green").save(source, quality=85)
+    service = ImageConversionService()
+
+    expected = {"fit": (400, 300), "fit_pad": (400, 400), "fill": (400, 400), "stretch": (400, 400)}
+    for mode, size in expected.items():
+        output = tmp_path / f"{mode}.png"
+        service.convert(
+            source_path=source,
+            output_path=output,
+            target_format="PNG",
+            resize_enabled=True,
+            width=400,
+            height=400,
+            resize_mode=mode,
+        )
+        with Image.open(output) as result:
+            assert result.size == size
+
+    assert plan_resize((3200, 2400), (400, 400), "fill") == (533, 400)
+    assert plan_resize((100, 50), (400, 400), "fit") == (100, 50)
+
+    # Palette sources: reduce() rejects mode P, and resize() would fall back to NEAREST.
+    stripes = Image.new("P", (2000, 1000))
+    stripes.putpalette([0, 0, 0, 255, 255, 255])
+    stripes.putdata([(x // 3) % 2 for _ in range(1000) for x in range(2000)])
+    palette_source = tmp_path / "stripes.png"
+    stripes.save(palette_source)
+    expected = {"fit": (300, 150), "fit_pad": (300, 300), "fill": (300, 300), "stretch": (300, 300)}
+    for mode, size in expected.items():
+        output = tmp_path / f"stripes_{mode}.png"
+        service.convert(
+            source_path=palette_source,
+            output_path=output,
+            target_format="PNG",
+            resize_enabled=True,
+            width=300,
+            height=300,
+            resize_mode=mode,
+        )
+        with Image.open(output) as result:
+            assert result.size == size
+            # Averaged grey, not just the two palette colours NEAREST would keep.
+            assert len(result.convert("L").getcolors(256)) > 2
+
+
+def test_image_batch_streams_results_within_memory_budget(tmp_path: Path, monkeypatch) -> None:
+    items = []
+    for index, size in enumerate([(64, 48), (32, 32), (16, 8)]):
+        source = tmp_path / f"in_{index}.png"
+        Image.new("RGB", size, "blue").save(source)
+        items.append({"source_path": source, "output_path": tmp_path / f"out_{index}.webp", "target_format": "WEBP"})
+
+    assert estimate_decoded_bytes(items[0]["source_path"]) == 64 * 48 * 3
+    cap = StorageService().settings.image_max_pixels * 4
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+    assert estimate_decoded_bytes(tmp_path / "broken.png") == cap
+    results = dict(
+        run_bounded(
+            convert_image_file,
+            items,
+            cost=lambda item: estimate_decoded_bytes(item["source_path"]),
+            max_workers=2,
+            memory_budget=1,
+        )
+    )
+
+    assert results == {index: item["output_path"] for index, item in enumerate(items)}
+    assert all(item["output_path"].exists() for item in items)
+    # A decompression bomb is charged the full cap instead of slipping through at 0.
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100)
+    assert estimate_decoded_bytes(items[0]["source_path"]) == cap
+
+
+def test_batch_output_names_are_reserved_case_insensitively(tmp_path: Path) -> None:
+    used_names: set[str] = set()
+    names = [
+        _reserve_output_path(tmp_path, stem, "webp", used_names).name
+        for stem in ["photo_converted", "Photo_converted", "photo_converted", "other_converted"]
+    ]
+
+    assert names == ["photo_converted.webp", "Photo_converted_2.webp", "photo_converted_3.webp", "other_converted.webp"]
+
+
+def test_oversized_images_are_rejected_or_resized_in_strips(tmp_path: Path, monkeypatch) -> None:
+    source = Image.effect_mandelbrot((600, 400), (-2, -1.5, 1, 1.5), 40).convert("RGB")
+    bmp, png = tmp_path / "big.bmp", tmp_path / "big.png"
+    source.save(bmp)
+    source.save(png)
+    service = ImageConversionService()
+    monkeypatch.setattr(service.settings, "image_max_pixels", 100_000)
+    monkeypatch.setattr(service.settings, "image_strip_pixels", 20_000)
+
+    for path, resize in [(bmp, False), (png, True)]:
+        try:
+            service.convert(
+                source_path=path,
+                output_path=tmp_path / "out.png",
+                target_format="PNG",
+                resize_enabled=resize,
+                width=150,
+                height=100,
+            )
+        except ValueError as exc:
+            assert "600x400" in str(exc)
+        else:
+            raise AssertionError(f"{path.name} should exceed the pixel budget")
+
+    output = tmp_path / "small.png"
+    service.convert(source_path=bmp, output_path=output, target_format="PNG", resize_enabled=True, width=150, height=100)
+    with Image.open(output) as result:
+        assert result.size == (150, 100)
+    strips = resize_in_strips(bmp, (150, 100), max_pixels=20_000)
+    assert strips.tobytes() == source.resize((150, 100), Image.LANCZOS).tobytes()
+
+
+def test_animated_gif_keeps_frames_and_timing(tmp_path: Path) -> None:
+    source = tmp_path / "anim.gif"
+    frames = [Image.new("RGB", (120, 80), (index * 60, 0, 0)) for index in range(4)]
+    frames[0].save(source, save_all=True, append_images=frames[1:], duration=[40, 50, 60, 70], loop=0)
+    service = ImageConversionService()
+
+    webp = service.convert(source_path=source, output_path=tmp_path / "anim.webp", target_format="WEBP")
+    gif = service.convert(
+        source_path=source,
+        output_path=tmp_path / "small.gif",
+        target_format="GIF",
+        resize_enabled=True,
+        width=60,
+        height=60,
+        resize_mode="fit",
+    )
+    pdf = service.convert(source_path=source, output_path=tmp_path / "pages.pdf", target_format="PDF")
+
+    for path, size in [(webp, (120, 80)), (gif, (60, 40))]:
+        with Image.open(path) as result:
+            assert result.size == size
+            assert result.n_frames == 4
+            assert result.info["loop"] == 0
+            durations = []
+            for index in range(result.n_frames):
+                result.seek(index)
+                result.load()
+                durations.append(result.info["duration"])
+            assert durations == [40, 50, 60, 70]
+    assert pdf.read_bytes().count(b"/Type /Page\n") == 4
+
+
+def test_image_target_size_searches_quality_in_memory(tmp_path: Path) -> None:
+    source = tmp_path / "photo.png"
+    Image.effect_mandelbrot((400, 300), (-2, -1.5, 1, 1.5), 60).convert("RGB").save(source)
+    service = ImageConversionService()
+
+    output = service.convert(
+        source_path=source,
+        output_path=tmp_path / "photo.jpg",
+        target_format="JPG",
+        quality=95,
+        encoder_profile="small",
+        target_kb=12,
+    )
+    assert output.stat().st_size <= 12 * 1024
+
+    with Image.open(source) as image:
+        data, quality = encode_to_target(image, "WEBP", 8 * 1024, profile="fast")
+        assert len(data) <= 8 * 1024
+        try:
+            encode_to_target(image, "WEBP", 50, profile="fast")
+        except ValueError as exc:
+            assert "smallest WEBP" in str(exc)
+        else:
+            raise AssertionError("50 bytes should be unreachable")
+    assert encoder_options("JPEG", "balanced", 92)["subsampling"] == "4:4:4"
+    assert encoder_options("JPEG", "balanced", 80)["subsampling"] == "4:2:0"
+    assert encoder_options("JPEG", "small", 92)["subsampling"] == "4:2:0"
+    assert encoder_options("PNG", "fast") == {"compress_level": 1}
+
+
+def test_image_derivatives_share_one_decode(tmp_path: Path) -> None:
+    source = tmp_path / "hero.jpg"
+    Image.new("RGB", (1600, 1000), "orange").save(source)
+
+    outputs = ImageConversionService().derive(
+        source_path=source,
+        output_dir=tmp_path,
+        stem="hero",
+        widths=[400, 3200, 800],
+        target_formats=["WEBP", "JPG"],
+        ico_sizes=[16, 48, 256],
+    )
+
+    assert [path.name for path in outputs] == [
+        "hero_1600w.webp",
+        "hero_1600w.jpg",
+        "hero_800w.webp",
+        "hero_800w.jpg",
+        "hero_400w.webp",
+        "hero_400w.jpg",
+        "hero.ico",
+    ]
+    with Image.open(tmp_path / "hero_400w.webp") as small:
+        assert small.size == (400, 250)
+    with Image.open(tmp_path / "hero.ico") as icon:
+        assert icon.info["sizes"] == {(16, 16), (48, 48), (256, 256)}
+
+    palette = Image.new("P", (2000, 1000))
+    palette.putpalette([255, 0, 0, 0, 0, 255])
+    palette_source = tmp_path / "logo.png"
+    palette.save(palette_source)
+    outputs = ImageConversionService().derive(
+        source_path=palette_source,
+        output_dir=tmp_path,
+        stem="logo",
+        widths=[100],
+        target_formats=["JPG", "JPEG", "PNG"],
+    )
+    assert [path.name for path in outputs] == ["logo_100w.jpg", "logo_100w.png"]
+
+
+def _shared_session_factory() -> sessionmaker:
+    """One in-memory database that task threads and the test see alike."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Job.__table__.create(bind=engine)
+    JobFile.__table__.create(bind=engine)
+    StoredFile.__table__.create(bind=engine)
+    StoredFileDir.__table__.create(bind=engine)
+    return sessionmaker(bind=engine, future=True)
+
+
+def test_youtube_batch_downloads_items_concurrently(tmp_path: Path, monkeypatch) -> None:
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class FixtureMedia(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.3)
+            body = b"\x00\x00\x00\x18ftypmp42" + bytes(4096)
+            self.send_response(200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command == "GET":
+                self.wfile.write(body)
+            with lock:
+                state["active"] -= 1
+
+        do_HEAD = do_GET
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FixtureMedia)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    session_factory = _shared_session_factory()
+    monkeypatch.setattr(youtube_tasks, "SessionLocal", session_factory)
+    monkeypatch.setattr(StorageService, "build_job_output_dir", lambda self, job_id: tmp_path)
+    monkeypatch.setattr(StorageService, "build_bundle_path", lambda self, job_id, stem="results": tmp_path / "bundle.zip")
+    settings = StorageService().settings
+    monkeypatch.setattr(settings, "youtube_info_cache_ttl_seconds", 0)
+    monkeypatch.setattr(settings, "youtube_download_concurrency", 3)
+
+    urls = [f"http://127.0.0.1:{server.server_port}/clip_{name}.mp4" for name in "abc"]
+    job = JobService(session_factory()).create_job(
+        job_type="youtube_batch", original_filename="clips", stored_filename="clips.txt", input_path="\n".join(urls)
+    )
+    try:
+        youtube_tasks.run_youtube_download(job.id, urls, "video", "720p", "mp3")
+    finally:
+        server.shutdown()
+
+    finished = JobService(session_factory()).get_job(job.id)
+    assert finished.status == "completed"
+    assert sorted(path.name for path in tmp_path.glob("clip_*.mp4")) == ["clip_a.mp4", "clip_b.mp4", "clip_c.mp4"]
+    assert state["peak"] > 1
+
+
+def test_youtube_analyze_reads_cache_and_times_out_per_url(monkeypatch) -> None:
+    class DictRedis(dict):
+        def set(self, key, value, ex=None) -> None:
+            self[key] = value
+
+    cache = YouTubeInfoCache(connection=DictRedis(), ttl_seconds=60)
+    service = YouTubeService(info_cache=cache)
+    monkeypatch.setattr(service.settings, "youtube_analyze_timeout_seconds", 1)
+    cached_url = "https://www.youtube.com/watch?v=cached"
+    cache.set(cached_url, {"title": "Cached", "formats": [{"format_id": "22", "height": 720, "vcodec": "avc1"}]})
+    extracted: list[str] = []
+
+    def fake_extract(url: str) -> dict:
+        extracted.append(url)
+        if url.endswith("slow"):
+            time.sleep(3)
+        if url.endswith("broken"):
+            raise ValueError("Video unavailable")
+        return {"title": url, "formats": []}
+
+    monkeypatch.setattr(service, "_extract_info", fake_extract)
+    started = time.monotonic()
+    items = service.analyze_urls(
+        ["https://youtu.be/slow", f"{cached_url}&t=10", "https://youtu.be/broken", "https://youtu.be/fresh"], "video"
+    )
+
+    assert time.monotonic() - started < 2.5
+    assert [item.status for item in items] == ["failed", "ready", "failed", "ready"]
+    assert items[0].error_message == "Timed out after 1s"
+    assert items[1].title == "Cached" and items[1].available_qualities
+    assert items[2].error_message == "Video unavailable"
+    assert cached_url not in extracted
+    assert service.get_info("https://youtu.be/fresh")["title"] == "https://youtu.be/fresh"
+    assert extracted.count("https://youtu.be/fresh") == 1
+
+
+def test_youtube_analysis_job_records_items_as_they_finish(tmp_path: Path, monkeypatch) -> None:
+    session_factory = _shared_session_factory()
+    monkeypatch.setattr(youtube_tasks, "SessionLocal", session_factory)
+    monkeypatch.setattr(StorageService, "build_job_output_dir", lambda self, job_id: tmp_path)
+    monkeypatch.setattr(StorageService().settings, "youtube_info_cache_ttl_seconds", 0)
+    urls = ["https://youtu.be/first", "https://youtu.be/second"]
+    job = JobService(session_factory()).create_job(
+        job_type="youtube_analyze", original_filename="first", stored_filename="analyze.txt", input_path="\n".join(urls)
+    )
+    snapshots: list[list[str]] = []
+
+    def fake_extract(self, url: str) -> dict:
+        if url.endswith("second"):
+            # The first result must become readable while this one is still running.
+            deadline = time.monotonic() + 5
+            while youtube_tasks.read_analysis_results(job.id, urls)[0].status == "pending" and time.monotonic() < deadline:
+                time.sleep(0.01)
+        snapshots.append([item.status for item in youtube_tasks.read_analysis_results(job.id, urls)])
+        if url.endswith("second"):
+            raise ValueError("Private video")
+        return {"title": "First", "formats": [{"format_id": "18", "height": 360, "vcodec": "avc1"}]}
+
+    monkeypatch.setattr(YouTubeService, "_extract_info", fake_extract)
+    monkeypatch.setattr(StorageService().settings, "youtube_analyze_concurrency", 1)
+    youtube_tasks.run_youtube_analysis(job.id, urls, "video")
+
+    finished = JobService(session_factory()).get_job(job.id)
+    assert finished.status == "completed"
+    assert snapshots == [["pending", "pending"], ["ready", "pending"]]
+    items = youtube_tasks.read_analysis_results(job.id, urls)
+    assert [item.status for item in items] == ["ready", "failed"]
+    assert items[0].available_qualities[0].value == "360p"
+    assert items[1].error_message == "Private video"
+
+
+def test_orphaned_youtube_analyses_are_failed(monkeypatch) -> None:
+    from app.services.cleanup_service import CleanupService
+
+    session_factory = _shared_session_factory()
+    monkeypatch.setattr(youtube_tasks, "SessionLocal", session_factory)
+    db = session_factory()
+    service = JobService(db)
+    jobs = {
+        name: service.create_job(
+            job_type=job_type, original_filename=name, stored_filename=f"{name}.txt", input_path="https://youtu.be/x"
+        )
+        for name, job_type in [("lost", "youtube_analyze"), ("running", "youtube_analyze"), ("download", "youtube_batch")]
+    }
+    for name in ("lost", "download"):
+        jobs[name].updated_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.commit()
+
+    assert CleanupService(db).fail_orphaned_analyses(older_than_seconds=600) == 1
+    db.expire_all()
+    assert jobs["lost"].status == "failed" and jobs["lost"].error_message.startswith("Analysis was interrupted")
+    assert jobs["running"].status == "queued"
+    assert jobs["download"].status == "queued"
+
+    # A failed job that finally gets an executor thread is not brought back to life.
+    assert youtube_tasks.run_youtube_analysis(jobs["lost"].id, ["https://youtu.be/x"], "video")["status"] == "failed"
+    db.expire_all()
+    assert jobs["lost"].status == "failed"
+    # Analyses have nothing to download, so job listings leave them out.
+    rows, _ = service.list_job_page()
+    assert [row.original_filename for row in rows] == ["download"]
+    assert len(service.list_job_page(job_type="youtube_analyze")[0]) == 2
+    db.close()
+
+
+def test_youtube_playlist_pages_use_flat_extraction(monkeypatch) -> None:
+    requested: list[dict] = []
+
+    class FlatYoutubeDL:
+        def __init__(self, opts: dict) -> None:
+            requested.append(opts)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc) -> None:
+            pass
+
+        def extract_info(self, url: str, download: bool) -> dict:
+            opts = requested[-1]
+            ids = range(opts["playliststart"], min(opts["playlistend"], 5) + 1)
+            return {
+                "_type": "playlist",
+                "title": "Mix",
+                "playlist_count": 5,
+                "entries": [
+                    {"url": f"https://www.youtube.com/watch?v=id{index}", "title": f"Clip {index}", "duration": 61.0}
+                    for index in ids
+                ],
+            }
+
+    monkeypatch.setattr("app.services.youtube_service.YoutubeDL", FlatYoutubeDL)
+    service = YouTubeService(info_cache=YouTubeInfoCache(ttl_seconds=0))
+    playlist_url = "https://www.youtube.com/playlist?list=PL123"
+    assert service.is_playlist_url(playlist_url)
+    assert service.is_playlist_url("https://www.youtube.com/@someone/videos")
+    assert not service.is_playlist_url("https://www.youtube.com/watch?v=id1&list=PL123")
+
+    first = service.list_playlist_page(playlist_url, 1, 3)
+    assert [entry.index for entry in first.entries] == [1, 2, 3]
+    assert first.next_start == 4 and first.total_count == 5
+    assert requested[0]["extract_flat"] == "in_playlist" and requested[0]["playlistend"] == 4
+    last = service.list_playlist_page(playlist_url, first.next_start, 3)
+    assert [entry.title for entry in last.entries] == ["Clip 4", "Clip 5"]
+    assert last.next_start is None and last.entries[0].duration_seconds == 61
+
+    with pytest.raises(ValueError):
+        service.get_info(playlist_url)
+
+
+def test_audio_batch_starts_longest_files_first(tmp_path: Path) -> None:
+    durations = {"short.wav": 30.0, "long.wav": 600.0, "unknown.wav": None, "medium.wav": 200.0}
+    paths = [tmp_path / name for name in durations]
+    for path in paths:
+        path.write_bytes(b"\0" * 10)
+
+    class FakeProbe:
+        def duration(self, path: Path) -> float | None:
+            return durations[path.name]
+
+    order = longest_first(paths, FakeProbe())
+    assert [paths[index].name for index in order] == ["long.wav", "medium.wav", "short.wav", "unknown.wav"]
+
+    started: list[str] = []
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_convert(source_path: Path) -> str:
+        with lock:
+            started.append(source_path.name)
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= 1
+        return source_path.name
+
+    items = [{"source_path": path} for path in paths]
+    results = dict(run_longest_first(fake_convert, items, order=order, max_workers=2))
+    assert results == {index: path.name for index, path in enumerate(paths)}
+    assert started[:2] == ["long.wav", "medium.wav"]
+    assert active["peak"] == 2
+
+
+def test_loudnorm_measurement_is_cached_by_content(tmp_path: Path, monkeypatch) -> None:
+    from app.services import loudness
+
+    monkeypatch.setattr(StorageService().settings, "temp_dir", tmp_path)
+    measurements: list[list[str]] = []
+    report = (
+        "[Parsed_loudnorm_0 @ 0x1]\n{\n"
+        '\t"input_i" : "-23.40",\n\t"input_tp" : "-4.10",\n\t"input_lra" : "6.20",\n'
+        '\t"input_thresh" : "-33.90",\n\t"output_i" : "-16.02",\n\t"target_offset" : "0.31"\n}\n'
+    )
+
+    def fake_run(cmd, **kwargs):
+        if cmd[0] == "ffprobe":
+            return subprocess.CompletedProcess(cmd, 0, stdout='{"streams": [{"codec_type": "audio", "sample_rate": "44100"}]}', stderr="")
+        measurements.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="", stderr=report)
+
+    monkeypatch.setattr(loudness.subprocess, "run", fake_run)
+    source = tmp_path / "song.wav"
+    source.write_bytes(b"RIFF" + bytes(64))
+    copy = tmp_path / "same_song.wav"
+    copy.write_bytes(source.read_bytes())
+    service = AudioConversionService()
+
+    mp3 = service.build_command(source_path=source, output_path=tmp_path / "a.mp3", target_format="MP3", bitrate="192k", threads=1, normalize=True)
+    ogg = service.build_command(source_path=copy, output_path=tmp_path / "a.ogg", target_format="OGG", bitrate="128k", threads=1, normalize=True)
+    trimmed = service.build_command(
+        source_path=source, output_path=tmp_path / "b.mp3", target_format="MP3", bitrate="192k", threads=1,
+        trim_enabled=True, trim_start=1.0, trim_end=5.0, normalize=True,
+    )
+
+    assert len(measurements) == 2
+    assert "print_format=json" in " ".join(measurements[0]) and measurements[0][-3:] == ["-f", "null", "-"]
+    assert ["-ss", "1.0", "-t", "4.0"] == measurements[1][measurements[1].index("-ss"):measurements[1].index("-ss") + 4]
+    audio_filter = mp3[mp3.index("-af") + 1]
+    assert "measured_I=-23.4" in audio_filter and "offset=0.31" in audio_filter and "linear=true" in audio_filter
+    assert ogg[ogg.index("-af") + 1] == audio_filter
+    assert mp3[mp3.index("-ar") + 1] == "44100" and "-af" in trimmed
+
+
+def test_loudnorm_skips_silent_input(tmp_path: Path, monkeypatch) -> None:
+    from app.services import loudness
+
+    monkeypatch.setattr(StorageService().settings, "temp_dir", tmp_path)
+    report = (
+        '{\n\t"input_i" : "-inf",\n\t"input_tp" : "-inf",\n\t"input_lra" : "0.00",\n'
+        '\t"input_thresh" : "-70.00",\n\t"target_offset" : "inf"\n}\n'
+    )
+
+    def fake_run(cmd, **kwargs):
+        if cmd[0] == "ffprobe":
+            return subprocess.CompletedProcess(cmd, 0, stdout='{"streams": []}', stderr="")
+        return subprocess.CompletedProcess(cmd, 0, stdout="", stderr=report)
+
+    monkeypatch.setattr(loudness.subprocess, "run", fake_run)
+    source = tmp_path / "silence.wav"
+    source.write_bytes(b"RIFF" + bytes(64))
+
+    cmd = AudioConversionService().build_command(
+        source_path=source, output_path=tmp_path / "out.mp3", target_format="MP3", bitrate="192k", threads=1, normalize=True
+    )
+    assert "-af" not in cmd and "-b:a" in cmd
+
+
+def test_audio_stream_copies_when_source_codec_fits(tmp_path: Path, monkeypatch) -> None:
+    streams = {
+        "voice.m4a": [{"codec_type": "audio", "codec_name": "aac", "bit_rate": "128000"}],
+        "clip.mp4": [{"codec_type": "video", "codec_name": "h264"}, {"codec_type": "audio", "codec_name": "aac"}],
+        "loud.mp3": [{"codec_type": "audio", "codec_name": "mp3", "bit_rate": "320000"}],
+    }
+    monkeypatch.setattr(MediaProbeService, "probe", lambda self, path, **kwargs: {"streams": streams[path.name]})
+    service = AudioConversionService()
+
+    def build(name: str, target: str, **kwargs) -> list[str]:
+        return service.build_command(
+            source_path=tmp_path / name, output_path=tmp_path / f"out.{target.lower()}", target_format=target,
+            bitrate="192k", threads=1, **kwargs,
+        )
+
+    remux = build("voice.m4a", "AAC", trim_enabled=True, trim_start=2.0, trim_end=8.0)
+    assert remux[remux.index("-c:a") + 1] == "copy" and "-b:a" not in remux
+    assert remux[remux.index("-ss"):remux.index("-ss") + 4] == ["-ss", "2.0", "-t", "6.0"]
+    extract = build("clip.mp4", "M4A")
+    assert extract[extract.index("-map") + 1] == "0:a:0" and "copy" in extract
+    assert "copy" not in build("loud.mp3", "MP3")
+    assert "copy" not in build("voice.m4a", "MP3")
+
+    multi = service.build_multi_command(
+        source_path=tmp_path / "voice.m4a",
+        outputs=[("M4A", tmp_path / "a.m4a"), ("OGG", tmp_path / "a.ogg")],
+        bitrate="192k",
+        threads=1,
+    )
+    ogg_args = multi[multi.index(str(tmp_path / "a.m4a")) + 1:]
+    assert multi.count("copy") == 1 and "-b:a" in ogg_args and ogg_args[:2] == ["-map", "0:a:0"]
@@ -4,6 +4,7 @@ import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk
 import argparse
+import multiprocessing
 import subprocess
 
 import localization as i18n
@@ -336,6 +337,8 @@ class BambamConverterSuite:
 
 
 if __name__ == "__main__":
+    # Frozen builds re-launch this exe for image batch worker processes.
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser(description='Bambam Converter Suite')
     parser.add_argument('--convert', help='Convert file path', type=str)
     parser.add_argument('--to', help='Target format', type=str)
@@ -45,7 +45,7 @@ JOB_TYPE_ROUTES = {
 }
 
 SUPPORTED_FORMATS = {
-    "image": {"PNG", "JPG", "WEBP", "TIFF", "BMP", "GIF", "ICO"},
+    "image": {"PNG", "JPG", "WEBP", "TIFF", "BMP", "GIF", "ICO", "PDF"},
     "audio": {"MP3", "WAV", "FLAC", "OGG", "M4A", "AAC", "WMA", "OPUS", "AIFF"},
     "video": {"MP4", "MOV", "MKV", "AVI", "WEBM", "WMV", "FLV", "GIF"},
     "document": DOCUMENT_FORMATS,
@@ -4,10 +4,11 @@ Handles inline keyboard callback queries.
 Flow:
   1. Parse action from callback data
   2. Retrieve session (file_id, file_type)
-  3. Download file from Telegram
-  4. Submit job to backend
-  5. Poll until done
-  6. Send result to user
+  3. Re-send a cached result if this file was already converted to the target
+  4. Download file from Telegram
+  5. Submit job to backend
+  6. Poll until done
+  7. Send result to user and remember its file_id
 """
 
 import io
@@ -17,7 +18,7 @@ from aiogram import Router, F, Bot
 from aiogram.types import CallbackQuery, BufferedInputFile
 
 from bot.api import client as api
-from bot.services import session_store
+from bot.services import result_cache, session_store
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -45,6 +46,17 @@ async def handle_action(callback: CallbackQuery, bot: Bot) -> None:
 
     target_format = action[len("conv_"):]  # e.g. "MP3"
 
+    cached = result_cache.get_result(session.file_unique_id, target_format)
+    if cached is not None:
+        try:
+            await callback.message.answer_document(document=cached.file_id, caption="Completed 🎉")
+            session_store.clear_session(user_id)
+            return
+        except Exception:
+            # file_id can become unusable (e.g. bot token changed); convert again
+            logger.warning("Cached result for user %s could not be re-sent", user_id)
+            result_cache.invalidate(session.file_unique_id, target_format)
+
     status_msg = await callback.message.answer("Processing... ⏳")
 
     try:
@@ -73,10 +85,17 @@ async def handle_action(callback: CallbackQuery, bot: Bot) -> None:
         )
 
         # --- Send result to user ---
-        await callback.message.answer_document(
+        sent = await callback.message.answer_document(
             document=BufferedInputFile(result_bytes, filename=output_filename),
             caption="Completed 🎉",
         )
+        if sent.document is not None:
+            result_cache.set_result(
+                session.file_unique_id,
+                target_format,
+                sent.document.file_id,
+                output_filename,
+            )
 
     except TimeoutError:
         logger.warning("Job timed out for user %s", user_id)
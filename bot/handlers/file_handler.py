@@ -29,7 +29,7 @@ async def handle_file(message: Message) -> None:
         await message.answer("❌ Sorry, this file type is not supported.")
         return
 
-    file_type, file_id, filename, mime_type = detected
+    file_type, file_id, filename, mime_type, file_unique_id = detected
 
     # Persist session for callback resolution
     session_store.set_session(
@@ -40,6 +40,7 @@ async def handle_file(message: Message) -> None:
             file_type=file_type,
             original_filename=filename,
             mime_type=mime_type,
+            file_unique_id=file_unique_id,
         ),
     )
 
@@ -40,26 +40,30 @@ def _type_from_extension(filename: str) -> Optional[str]:
     return None
 
 
-def detect(message: Message) -> Optional[tuple[str, str, str, Optional[str]]]:
+def detect(message: Message) -> Optional[tuple[str, str, str, Optional[str], Optional[str]]]:
     """
-    Returns (file_type, file_id, original_filename, mime_type) or None if unsupported.
+    Returns (file_type, file_id, original_filename, mime_type, file_unique_id) or None if unsupported.
+
+    file_unique_id is stable across forwards and bots, so it is used as the
+    result cache key; file_id is what the Bot API needs to download the file.
     """
     if message.photo:
         photo = message.photo[-1]  # largest size
-        return "image", photo.file_id, "photo.jpg", "image/jpeg"
+        return "image", photo.file_id, "photo.jpg", "image/jpeg", photo.file_unique_id
 
     if message.video:
         v = message.video
         filename = v.file_name or "video.mp4"
-        return "video", v.file_id, filename, v.mime_type
+        return "video", v.file_id, filename, v.mime_type, v.file_unique_id
 
     if message.audio:
         a = message.audio
         filename = a.file_name or "audio.mp3"
-        return "audio", a.file_id, filename, a.mime_type
+        return "audio", a.file_id, filename, a.mime_type, a.file_unique_id
 
     if message.voice:
-        return "audio", message.voice.file_id, "voice.ogg", "audio/ogg"
+        voice = message.voice
+        return "audio", voice.file_id, "voice.ogg", "audio/ogg", voice.file_unique_id
 
     if message.document:
         doc = message.document
@@ -68,6 +72,6 @@ def detect(message: Message) -> Optional[tuple[str, str, str, Optional[str]]]:
 
         # Try MIME first, then extension
         file_type = _type_from_mime(mime) or _type_from_extension(filename) or "document"
-        return file_type, doc.file_id, filename, mime
+        return file_type, doc.file_id, filename, mime, doc.file_unique_id
 
     return None
@@ -0,0 +1,74 @@
+"""
+In-memory cache of already-delivered conversion results.
+
+Keyed by (file_unique_id, target_format) → Telegram file_id of the result
+document the bot sent earlier. Telegram's file_unique_id is stable across
+forwards and users, so a repeated conversion can be answered by re-sending
+the cached file_id without downloading, uploading or converting anything.
+
+Entries expire after RESULT_CACHE_TTL_SECONDS and the oldest entries are
+evicted once RESULT_CACHE_MAX_ENTRIES is reached.
+
+Future: replace with Redis for multi-instance deployments.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+DEFAULT_RESULT_CACHE_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_RESULT_CACHE_MAX_ENTRIES = 5000
+
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", DEFAULT_RESULT_CACHE_TTL_SECONDS))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", DEFAULT_RESULT_CACHE_MAX_ENTRIES))
+
+
+@dataclass
+class CachedResult:
+    file_id: str
+    filename: Optional[str]
+    stored_at: float
+
+
+_results: "OrderedDict[tuple[str, str], CachedResult]" = OrderedDict()
+
+
+def _key(file_unique_id: str, target_format: str) -> tuple[str, str]:
+    return file_unique_id, target_format.upper()
+
+
+def get_result(file_unique_id: Optional[str], target_format: str) -> Optional[CachedResult]:
+    if not file_unique_id:
+        return None
+    key = _key(file_unique_id, target_format)
+    entry = _results.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry.stored_at > RESULT_CACHE_TTL_SECONDS:
+        _results.pop(key, None)
+        return None
+    _results.move_to_end(key)
+    return entry
+
+
+def set_result(
+    file_unique_id: Optional[str],
+    target_format: str,
+    file_id: str,
+    filename: Optional[str] = None,
+) -> None:
+    if not file_unique_id or not file_id or RESULT_CACHE_MAX_ENTRIES <= 0:
+        return
+    key = _key(file_unique_id, target_format)
+    _results[key] = CachedResult(file_id=file_id, filename=filename, stored_at=time.monotonic())
+    _results.move_to_end(key)
+    while len(_results) > RESULT_CACHE_MAX_ENTRIES:
+        _results.popitem(last=False)
+
+
+def invalidate(file_unique_id: Optional[str], target_format: str) -> None:
+    if not file_unique_id:
+        return
+    _results.pop(_key(file_unique_id, target_format), None)
@@ -18,6 +18,7 @@ class Session:
     file_type: str          # "image" | "audio" | "video" | "document"
     original_filename: str
     mime_type: Optional[str] = None
+    file_unique_id: Optional[str] = None   # stable Telegram id, used for result caching
     job_id: Optional[str] = None
     selected_action: Optional[str] = None
 
@@ -81,6 +81,7 @@ export function AudioConverter() {
 
   // Trim / waveform state
   const [trimEnabled, setTrimEnabled] = useState(false);
+  const [normalizeEnabled, setNormalizeEnabled] = useState(false);
   const [trimStart, setTrimStart] = useState(0);
   const [trimEnd, setTrimEnd] = useState(0);
   const [audioDuration, setAudioDuration] = useState(0);
@@ -400,6 +401,9 @@ export function AudioConverter() {
 
     try {
       const query = new URLSearchParams({ target_format: targetFormat, bitrate });
+      if (normalizeEnabled) {
+        query.set("normalize", "true");
+      }
 
       if (!isBatch && trimEnabled && audioDuration > 0) {
         query.set("trim_enabled", "true");
@@ -469,8 +473,8 @@ export function AudioConverter() {
               </label>
             </div>
 
-            {selectedFiles.length === 1 && (
-              <div className="feature-toggles-row">
+            <div className="feature-toggles-row">
+              {selectedFiles.length === 1 && (
                 <button
                   type="button"
                   className={`feature-toggle-btn${trimEnabled ? " active" : ""}`}
@@ -479,8 +483,16 @@ export function AudioConverter() {
                   <span className="feature-toggle-dot" />
                   Trim
                 </button>
-              </div>
-            )}
+              )}
+              <button
+                type="button"
+                className={`feature-toggle-btn${normalizeEnabled ? " active" : ""}`}
+                onClick={() => setNormalizeEnabled((v) => !v)}
+              >
+                <span className="feature-toggle-dot" />
+                Normalize loudness
+              </button>
+            </div>
 
             {selectedFiles.length === 1 && trimEnabled && !waveformReady && (
               <p className="waveform-decoding">Decoding waveform…</p>
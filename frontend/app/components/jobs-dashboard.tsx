@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 
 
 import { authFetch } from "../lib/auth-fetch";
@@ -19,11 +19,16 @@ type JobItem = {
   updated_at: string;
 };
 
+// GET /jobs returns one page and an X-Next-Cursor header while older jobs remain.
+const JOBS_PAGE_SIZE = 100;
 
 export function JobsDashboard() {
   const { user } = useAuth();
   const [jobs, setJobs] = useState<JobItem[]>([]);
   const [cleanupMessage, setCleanupMessage] = useState<string | null>(null);
+  const [hasMoreJobs, setHasMoreJobs] = useState(false);
+  // Read by the polling interval, so it lives in a ref rather than state.
+  const visibleCount = useRef(JOBS_PAGE_SIZE);
 
   const apiBaseUrl = useMemo(
     () => process.env.NEXT_PUBLIC_API_BASE_URL ?? "http://localhost:8000",
@@ -31,12 +36,27 @@ export function JobsDashboard() {
   );
 
   const loadJobs = async () => {
-    const response = await authFetch(`${apiBaseUrl}/jobs`, { cache: "no-store" });
-    if (!response.ok) {
-      return;
-    }
-    const payload = (await response.json()) as JobItem[];
-    setJobs(payload);
+    const collected: JobItem[] = [];
+    let cursor: string | null = null;
+    do {
+      const params = new URLSearchParams({ limit: String(JOBS_PAGE_SIZE) });
+      if (cursor) {
+        params.set("cursor", cursor);
+      }
+      const response: Response = await authFetch(`${apiBaseUrl}/jobs?${params}`, { cache: "no-store" });
+      if (!response.ok) {
+        return;
+      }
+      collected.push(...((await response.json()) as JobItem[]));
+      cursor = response.headers.get("X-Next-Cursor");
+    } while (cursor && collected.length < visibleCount.current);
+    setJobs(collected);
+    setHasMoreJobs(cursor !== null);
+  };
+
+  const loadMoreJobs = async () => {
+    visibleCount.current += JOBS_PAGE_SIZE;
+    await loadJobs();
   };
 
   const getDownloadUrl = (job: JobItem) => {
@@ -48,7 +68,7 @@ export function JobsDashboard() {
       return `${apiBaseUrl}/batch/jobs/${job.id}/download`;
     }
 
-    if (job.job_type === "image") {
+    if (job.job_type === "image" || job.job_type === "image_set") {
       return `${apiBaseUrl}/image/jobs/${job.id}/download`;
     }
     if (job.job_type === "audio") {
@@ -196,6 +216,12 @@ export function JobsDashboard() {
           </tbody>
         </table>
       </div>
+
+      {hasMoreJobs ? (
+        <button className="primary-button jobs-action-button" type="button" onClick={() => void loadMoreJobs()}>
+          Load older jobs
+        </button>
+      ) : null}
     </section>
   );
 }
@@ -488,8 +488,18 @@ function UserStorageView({ apiBaseUrl, isOpen }: { apiBaseUrl: string; isOpen: b
     const fetch_ = async () => {
       setIsLoading(true);
       try {
-        const res = await authFetch(`${apiBaseUrl}/jobs`, { cache: "no-store" });
-        if (res.ok) setJobs(await res.json());
+        // Follow X-Next-Cursor so users with many jobs still see every completed one.
+        const collected: UserJob[] = [];
+        let cursor: string | null = null;
+        do {
+          const params = new URLSearchParams({ status: "completed", limit: "500" });
+          if (cursor) params.set("cursor", cursor);
+          const res: Response = await authFetch(`${apiBaseUrl}/jobs?${params}`, { cache: "no-store" });
+          if (!res.ok) return;
+          collected.push(...((await res.json()) as UserJob[]));
+          cursor = res.headers.get("X-Next-Cursor");
+        } while (cursor);
+        setJobs(collected);
       } catch {} finally {
         setIsLoading(false);
       }
@@ -21,10 +21,37 @@ type AnalysisItem = {
     error_message?: string | null;
 };
 
-type AnalyzeResponse = {
+type AnalyzeJobCreateResponse = {
+    job_id: string;
+    status: string;
+    item_count: number;
+};
+
+type AnalyzeJobResponse = {
+    job_id: string;
+    status: string;
+    progress: number;
+    progress_detail?: string | null;
+    error_message?: string | null;
     items: AnalysisItem[];
 };
 
+type PlaylistEntry = {
+    index: number;
+    url: string;
+    title?: string | null;
+    duration_seconds?: number | null;
+    thumbnail_url?: string | null;
+};
+
+type PlaylistPage = {
+    url: string;
+    title?: string | null;
+    total_count?: number | null;
+    entries: PlaylistEntry[];
+    next_start?: number | null;
+};
+
 type JobResponse = {
     job_id: string;
     status: string;
@@ -71,6 +98,10 @@ export function YouTubeDownloader() {
     const [errorMessage, setErrorMessage] = useState<string | null>(null);
     const [isDownloadingResult, setIsDownloadingResult] = useState(false);
     const [downloadTriggerUrl, setDownloadTriggerUrl] = useState<string | null>(null);
+    const [playlistUrl, setPlaylistUrl] = useState("");
+    const [playlist, setPlaylist] = useState<PlaylistPage | null>(null);
+    const [selectedEntries, setSelectedEntries] = useState<Set<string>>(new Set());
+    const [isLoadingPlaylist, setIsLoadingPlaylist] = useState(false);
 
     const { setAction } = useAction();
 
@@ -115,16 +146,16 @@ export function YouTubeDownloader() {
         setJobProgressDetail(null);
 
         try {
-            const response = await authFetch(buildApiUrl("/youtube/analyze"), {
+            const response = await authFetch(buildApiUrl("/youtube/analyze/jobs"), {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({ urls: parsedUrls, download_mode: downloadMode }),
             });
-            const payload = (await response.json()) as AnalyzeResponse | { detail?: string };
+            const payload = (await response.json()) as AnalyzeJobCreateResponse | { detail?: string };
             if (!response.ok) {
                 throw new Error("detail" in payload ? payload.detail ?? "Analyze failed." : "Analyze failed.");
             }
-            setAnalysisItems((payload as AnalyzeResponse).items);
+            await pollAnalysis((payload as AnalyzeJobCreateResponse).job_id);
         } catch (error) {
             setErrorMessage(error instanceof Error ? error.message : "Analyze failed.");
         } finally {
@@ -132,6 +163,75 @@ export function YouTubeDownloader() {
         }
     };
 
+    const pollAnalysis = async (jobId: string) => {
+        for (let attempt = 0; attempt < 600; attempt += 1) {
+            await new Promise((resolve) => window.setTimeout(resolve, POLL_INTERVAL_MS));
+
+            const response = await authFetch(buildApiUrl(`/youtube/analyze/jobs/${jobId}`), { cache: "no-store" });
+            const payload = (await response.json()) as AnalyzeJobResponse | { detail?: string };
+            if (!response.ok) {
+                throw new Error("detail" in payload ? payload.detail ?? "Analyze failed." : "Analyze failed.");
+            }
+
+            // Each link shows up as soon as it is analyzed; the rest stay "pending".
+            const analysis = payload as AnalyzeJobResponse;
+            setAnalysisItems(analysis.items);
+            if (isCompletedStatus(analysis.status)) {
+                return;
+            }
+            if (isFailedStatus(analysis.status)) {
+                throw new Error(analysis.error_message ?? "Analyze failed.");
+            }
+        }
+
+        throw new Error("Analysis is taking longer than expected.");
+    };
+
+    // Playlists are listed page by page from flat extraction; only the picked entries get analyzed.
+    const loadPlaylistPage = async (start: number) => {
+        setIsLoadingPlaylist(true);
+        setErrorMessage(null);
+        try {
+            const response = await authFetch(buildApiUrl("/youtube/playlist"), {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ url: playlistUrl.trim(), start }),
+            });
+            const payload = (await response.json()) as PlaylistPage | { detail?: string };
+            if (!response.ok) {
+                throw new Error("detail" in payload ? payload.detail ?? "Could not load playlist." : "Could not load playlist.");
+            }
+            const page = payload as PlaylistPage;
+            setPlaylist((previous) => start > 1 && previous ? { ...page, entries: [...previous.entries, ...page.entries] } : page);
+            if (start === 1) {
+                setSelectedEntries(new Set());
+            }
+        } catch (error) {
+            setErrorMessage(error instanceof Error ? error.message : "Could not load playlist.");
+        } finally {
+            setIsLoadingPlaylist(false);
+        }
+    };
+
+    const toggleEntry = (url: string) => {
+        setSelectedEntries((previous) => {
+            const next = new Set(previous);
+            if (next.has(url)) {
+                next.delete(url);
+            } else {
+                next.add(url);
+            }
+            return next;
+        });
+    };
+
+    const addSelectedEntries = () => {
+        const existing = new Set(parsedUrls);
+        const additions = Array.from(selectedEntries).filter((url) => !existing.has(url));
+        setUrlInput([...parsedUrls, ...additions].join("\n"));
+        setSelectedEntries(new Set());
+    };
+
     const pollJobStatus = async (jobId: string) => {
         for (let attempt = 0; attempt < 600; attempt += 1) {
             await new Promise((resolve) => window.setTimeout(resolve, POLL_INTERVAL_MS));
@@ -231,6 +331,45 @@ export function YouTubeDownloader() {
                     />
                 </label>
 
+                <div className="field-group">
+                    <span>Playlist or channel</span>
+                    <div className="youtube-toolbar-row">
+                        <input
+                            type="url"
+                            value={playlistUrl}
+                            onChange={(event) => setPlaylistUrl(event.target.value)}
+                            placeholder="https://www.youtube.com/playlist?list=..."
+                        />
+                        <button className="primary-button" type="button" onClick={() => loadPlaylistPage(1)} disabled={isLoadingPlaylist || !playlistUrl.trim()}>
+                            {isLoadingPlaylist ? "Loading..." : "Browse"}
+                        </button>
+                    </div>
+                </div>
+
+                {playlist ? (
+                    <div className="youtube-analysis-list">
+                        <p className="selection-hint">
+                            {playlist.title ?? "Playlist"} · {playlist.entries.length}{playlist.total_count ? ` of ${playlist.total_count}` : ""} videos
+                        </p>
+                        {playlist.entries.map((entry) => (
+                            <label key={`${entry.url}-${entry.index}`} className="youtube-analysis-url">
+                                <input type="checkbox" checked={selectedEntries.has(entry.url)} onChange={() => toggleEntry(entry.url)} />
+                                {" "}{entry.index}. {entry.title ?? entry.url} · {formatDuration(entry.duration_seconds)}
+                            </label>
+                        ))}
+                        <div className="youtube-toolbar-row">
+                            {playlist.next_start ? (
+                                <button className="primary-button" type="button" onClick={() => loadPlaylistPage(playlist.next_start ?? 1)} disabled={isLoadingPlaylist}>
+                                    Load more
+                                </button>
+                            ) : null}
+                            <button className="primary-button" type="button" onClick={addSelectedEntries} disabled={selectedEntries.size === 0}>
+                                Add {selectedEntries.size} selected
+                            </button>
+                        </div>
+                    </div>
+                ) : null}
+
                 <div className="feature-toggles-row">
                     {YOUTUBE_DOWNLOAD_MODES.map((mode) => (
                         <button
@@ -279,10 +418,10 @@ export function YouTubeDownloader() {
                 {analysisItems.length > 0 && (
                     <div className="youtube-analysis-list">
                         {analysisItems.map((item, index) => (
-                            <article key={`${item.url}-${index}`} className={`youtube-analysis-card${item.status !== "ready" ? " youtube-analysis-card--failed" : ""}`}>
+                            <article key={`${item.url}-${index}`} className={`youtube-analysis-card${item.status === "failed" ? " youtube-analysis-card--failed" : ""}`}>
                                 <div className="youtube-analysis-card-header">
                                     <div>
-                                        <h3>{item.title ?? "Unavailable title"}</h3>
+                                        <h3>{item.title ?? (item.status === "pending" ? "Analyzing..." : "Unavailable title")}</h3>
                                         <p>{item.platform ?? "Unknown source"} · {formatDuration(item.duration_seconds)}</p>
                                     </div>
                                     <span className="badge">{item.status}</span>
@@ -306,6 +445,8 @@ export function YouTubeDownloader() {
                                             </div>
                                         ) : null}
                                     </div>
+                                ) : item.status === "pending" ? (
+                                    <p className="selection-hint">Analyzing...</p>
                                 ) : (
                                     <p className="error-text">{item.error_message ?? "This link could not be analyzed."}</p>
                                 )}
@@ -13,7 +13,7 @@ export const JOB_STATUS = {
 export const POLL_INTERVAL_MS = 1000;
 export const USER_ACTIVITY_PING_INTERVAL_MS = 10000;
 
-export const IMAGE_FORMATS = ["PNG", "JPG", "JPEG", "WEBP", "TIFF", "BMP", "GIF", "ICO"] as const;
+export const IMAGE_FORMATS = ["PNG", "JPG", "JPEG", "WEBP", "TIFF", "BMP", "GIF", "ICO", "PDF"] as const;
 export const IMAGE_QUALITY_FORMATS = ["JPG", "JPEG", "WEBP"] as const;
 export const IMAGE_ACCEPT_ATTR = ".png,.jpg,.jpeg,.webp,.tiff,.bmp,.gif,.ico";
 
@@ -0,0 +1,267 @@
+# image_batch.py
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PIL import Image, ImageSequence
+
+import image_encoders
+
+# Parallel Pillow conversions for the desktop image tab.
+# Every image is converted in a worker process; new images are only started while the
+# estimated decoded size (width x height x bands) of everything in flight fits the
+# memory budget, so a folder of huge scans cannot exhaust RAM.
+
+MEMORY_BUDGET_BYTES = 1024 * 1024 * 1024
+
+# Pixel budget, checked from the header before anything is decoded. Bigger images are only
+# accepted when they are being downscaled and their layout (BMP, PPM, uncompressed TIFF) can be
+# decoded a band of rows at a time; PNG and compressed TIFF always decode the whole frame.
+MAX_PIXELS = 100_000_000
+TILED_MAX_PIXELS = 1_000_000_000
+STRIP_PIXELS = 16_000_000
+
+Image.MAX_IMAGE_PIXELS = TILED_MAX_PIXELS
+
+
+def default_workers():
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except (AttributeError, OSError):
+        return max(1, os.cpu_count() or 1)
+
+
+def estimate_decoded_bytes(path):
+    """Only reads the header; a file Pillow refuses is charged the full per-image cap, never 0."""
+    try:
+        with Image.open(path) as img:
+            return min(img.width * img.height, MAX_PIXELS) * len(img.getbands())
+    except Exception:
+        return MAX_PIXELS * 4
+
+
+def draft_for_resize(img, box):
+    # JPEG: let libjpeg decode at 1/2, 1/4 or 1/8 scale when the resize box allows it.
+    # Requesting the box itself keeps the decoded size >= box, so results are unchanged.
+    if box and img.format == "JPEG":
+        img.draft(img.mode, box)
+
+
+def _resize_plan(size, box, mode):
+    """(canvas size, resized size) for box; never upscales."""
+    w, h = size
+    tw = min(box[0], w)
+    th = min(box[1], h)
+    if mode == "stretch":
+        return (tw, th), (tw, th)
+    scale = min(tw / w, th / h, 1.0)
+    return (tw, th), (max(1, int(w * scale)), max(1, int(h * scale)))
+
+
+def resize_for_box(img, box, mode, source_size=None):
+    """source_size is the real image size when img was already scaled (draft or strips)."""
+    if not box or box[0] <= 0 or box[1] <= 0:
+        return img
+    canvas_size, new_size = _resize_plan(source_size or img.size, box, mode)
+    if mode == "stretch" or canvas_size == new_size:
+        if new_size == img.size:
+            return img
+        return img.resize(new_size, Image.LANCZOS, reducing_gap=2.0)
+    if img.mode != "RGB":
+        work = img.convert("RGB")
+    else:
+        work = img
+    resized = work if work.size == new_size else work.resize(new_size, Image.LANCZOS, reducing_gap=2.0)
+    bg = Image.new("RGB", canvas_size, (255, 255, 255))
+    x = (canvas_size[0] - new_size[0]) // 2
+    y = (canvas_size[1] - new_size[1]) // 2
+    bg.paste(resized, (x, y))
+    return bg
+
+
+def _can_decode_in_strips(img):
+    return bool(img.tile) and all(
+        t[0] == "raw" and t[1][0] == 0 and t[1][2] == img.width for t in img.tile
+    )
+
+
+def _decode_rows(path, top, bottom):
+    # Rewrite the raw tile descriptors so Pillow only reads rows [top, bottom).
+    with Image.open(path) as strip:
+        width = strip.width
+        tiles = []
+        for codec, (_, t_top, _, t_bottom), offset, args in (t[:4] for t in strip.tile):
+            start, end = max(t_top, top), min(t_bottom, bottom)
+            if start >= end:
+                continue
+            args = (args,) if isinstance(args, str) else tuple(args)
+            rawmode, stride, orientation = (args + (0, 1)[len(args) - 1:])[:3]
+            stride = stride or len(Image.new(strip.mode, (width, 1)).tobytes("raw", rawmode))
+            if orientation < 0:
+                offset += (t_bottom - end) * stride
+            else:
+                offset += (start - t_top) * stride
+            tiles.append((codec, (0, start - top, width, end - top), offset, (rawmode, stride, orientation)))
+        strip.tile = tiles
+        strip._size = (width, bottom - top)
+        strip.load()
+        if strip.mode == "P":
+            return strip.convert("RGBA" if "transparency" in strip.info else "RGB")
+        return strip.copy()
+
+
+def resize_in_strips(path, size, max_pixels=STRIP_PIXELS):
+    """Downscale path to size, decoding only a band of rows at a time (see the backend's image_tiles)."""
+    with Image.open(path) as header:
+        width, height = header.size
+    scale = height / size[1]
+    margin = math.ceil(3 * scale) + 1
+    band_rows = max(1, int((max_pixels // max(width, 1) - 2 * margin) / scale))
+    canvas = None
+    for dest_top in range(0, size[1], band_rows):
+        dest_bottom = min(dest_top + band_rows, size[1])
+        src_top, src_bottom = dest_top * scale, dest_bottom * scale
+        top = max(0, math.floor(src_top) - margin)
+        bottom = min(height, math.ceil(src_bottom) + margin)
+        band = _decode_rows(path, top, bottom).resize(
+            (size[0], dest_bottom - dest_top), Image.LANCZOS, box=(0, src_top - top, width, src_bottom - top)
+        )
+        if canvas is None:
+            canvas = Image.new(band.mode, size)
+        canvas.paste(band, (0, dest_top))
+    return canvas
+
+
+def _check_pixel_budget(img, box):
+    """True when img has to be decoded in strips; raises for anything over the budget we cannot handle."""
+    pixels = img.width * img.height
+    if pixels <= MAX_PIXELS:
+        return False
+    limit = f"{img.width}x{img.height} exceeds the {MAX_PIXELS / 1_000_000:g} megapixel limit"
+    if pixels > TILED_MAX_PIXELS:
+        raise ValueError(f"Image is too large: {limit}")
+    if not box or box[0] * box[1] > MAX_PIXELS:
+        raise ValueError(f"Image is too large to convert without resizing: {limit}")
+    if not _can_decode_in_strips(img):
+        raise ValueError(f"Image is too large for a full decode and {img.format} cannot be read in strips: {limit}")
+    return True
+
+
+# Formats that keep every frame (animation) or page with save_all.
+MULTI_FRAME_FORMATS = {"GIF", "WEBP", "TIFF"}
+
+
+def _save_frames(img, out_path, pil_format, save_kwargs, box, resize_mode):
+    """Animated GIF/WEBP keep per-frame durations and loop; multi-page TIFF keeps its pages."""
+    w, h = _resize_plan(img.size, box, resize_mode)[0] if box else img.size
+    if img.n_frames * w * h > MAX_PIXELS:
+        raise ValueError(
+            f"Image has too many frames: {img.n_frames} x {w}x{h} exceeds the {MAX_PIXELS / 1_000_000:g} megapixel limit"
+        )
+    durations = []
+    for frame in ImageSequence.Iterator(img):
+        if img.format == "WEBP":
+            frame.load()  # WEBP fills in the duration only after decoding
+        durations.append(int(frame.info.get("duration") or 0))
+    img.seek(0)
+
+    kwargs = dict(save_kwargs or {}, save_all=True)
+    if pil_format in ("GIF", "WEBP"):
+        kwargs["duration"] = durations
+        loop = img.info.get("loop")
+        if loop is not None:
+            kwargs["loop"] = loop
+        elif pil_format == "WEBP":
+            kwargs["loop"] = 1  # GIF without a loop block plays once; WEBP 0 = forever
+    if pil_format == "GIF":
+        kwargs["optimize"] = True
+
+    if not box:
+        img.save(out_path, pil_format, **kwargs)
+        return
+
+    def resized(frame):
+        if frame.mode in ("P", "PA", "LA"):
+            frame = frame.convert("RGBA" if frame.has_transparency_data else "RGB")
+        else:
+            frame = frame.copy()
+        return resize_for_box(frame, box, resize_mode)
+
+    def rest():
+        for i in range(1, img.n_frames):
+            img.seek(i)
+            yield resized(img)
+
+    resized(img).save(out_path, pil_format, append_images=rest(), **kwargs)
+
+
+def convert_one(src_path, out_path, pil_format=None, save_kwargs=None, box=None, resize_mode="fit_pad",
+                delete_original=False, profile=image_encoders.DEFAULT_ENCODER_PROFILE, quality=90, target_kb=0):
+    """Worker-process entry point. pil_format None keeps the source format (the "Original" option).
+
+    target_kb > 0 (JPEG/WEBP only) replaces save_kwargs' quality with the highest one that fits.
+    """
+    with Image.open(src_path) as img:
+        frame_format = pil_format or img.format
+        if getattr(img, "n_frames", 1) > 1 and frame_format in MULTI_FRAME_FORMATS:
+            _check_pixel_budget(img, box)
+            _save_frames(img, out_path, frame_format, save_kwargs, box, resize_mode)
+        else:
+            source_size = img.size
+            draft_for_resize(img, box)
+            if _check_pixel_budget(img, box):
+                img = resize_in_strips(src_path, _resize_plan(source_size, box, resize_mode)[1])
+            if pil_format == "JPEG" and img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGB")
+
+            img = resize_for_box(img, box, resize_mode, source_size)
+
+            if pil_format is None:
+                img.save(out_path)
+            elif target_kb and pil_format in image_encoders.QUALITY_FORMATS:
+                data, _ = image_encoders.encode_to_target(img, pil_format, target_kb * 1024, profile, quality)
+                with open(out_path, "wb") as f:
+                    f.write(data)
+            else:
+                img.save(out_path, pil_format, **(save_kwargs or {}))
+
+    if delete_original and pil_format is not None:
+        try:
+            os.remove(src_path)
+        except Exception:
+            # silinemezse görmezden gel, hata listesine ekleme
+            pass
+    return out_path
+
+
+def run_bounded(func, jobs, max_workers=None, memory_budget=MEMORY_BUDGET_BYTES):
+    """Yield (index, result, error) for each job dict as it finishes; func is called as func(**job).
+
+    One job always runs even when it alone exceeds the budget. Errors are reported per job,
+    the rest of the batch keeps going.
+    """
+    max_workers = max(1, max_workers or default_workers())
+    pending = [(i, job, estimate_decoded_bytes(job["src_path"])) for i, job in enumerate(jobs)]
+    pending.reverse()
+    running = {}
+    in_flight = 0
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                i, job, size = pending[-1]
+                if running and in_flight + size > memory_budget:
+                    break
+                pending.pop()
+                running[pool.submit(func, **job)] = (i, size)
+                in_flight += size
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, size = running.pop(future)
+                in_flight -= size
+                try:
+                    result, error = future.result(), None
+                except Exception as e:
+                    result, error = None, e
+                yield i, result, error
@@ -3,8 +3,9 @@ import json
 import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image
 
+import image_batch
+import image_encoders
 import localization as i18n
 
 try:
@@ -38,6 +39,9 @@ class ImageTab:
         self.output_dir = ""
         self.target_format = tk.StringVar(value="PNG")
         self.quality_var = tk.IntVar(value=90)
+        # "small" = the optimize/progressive JPEG and method=6 WEBP this tab always used
+        self.encoder_profile = tk.StringVar(value="small")
+        self.target_kb = tk.StringVar(value="")
 
         self.resize_enabled = tk.BooleanVar(value=False)
         self.resize_width = tk.StringVar(value="")
@@ -181,6 +185,20 @@ class ImageTab:
         )
         self.quality_scale.pack(side="right")
 
+        self.lbl_profile = ttk.Label(fmt, text=i18n.t("image.profile.label"))
+        self.lbl_profile.pack(side="left", padx=(10, 5), pady=5)
+        self.profile_menu = tk.OptionMenu(fmt, self.encoder_profile, *image_encoders.ENCODER_PROFILES.keys())
+        self.profile_menu.pack(side="left", padx=5, pady=5)
+        self._style_optionmenu(self.profile_menu)
+
+        self.lbl_target_kb = ttk.Label(fmt, text=i18n.t("image.target_kb.label"))
+        self.lbl_target_kb.pack(side="left", padx=(10, 5), pady=5)
+        self.entry_target_kb = tk.Entry(
+            fmt, textvariable=self.target_kb, width=7,
+            bg=self.app.entry_bg, fg=self.app.fg, insertbackground=self.app.fg, relief="flat"
+        )
+        self.entry_target_kb.pack(side="left", padx=(0, 5), pady=5)
+
         # 4) Resize (optional)
         self.lf_resize = ttk.LabelFrame(main, text=i18n.t("image.section.resize"))
         resize = self.lf_resize
@@ -587,6 +605,8 @@ class ImageTab:
             else (i18n.t("image.output.label.using_source") if self.mirror_to_source.get() else self.lbl_output_dir.cget("text"))
         )
         self.lbl_quality.config(text=i18n.t("image.quality.label"))
+        self.lbl_profile.config(text=i18n.t("image.profile.label"))
+        self.lbl_target_kb.config(text=i18n.t("image.target_kb.label"))
         self.lbl_resize_w.config(text=i18n.t("image.resize.width"))
         self.lbl_resize_h.config(text=i18n.t("image.resize.height"))
         self.chk_resize_enable.config(text=i18n.t("image.resize.enable"))
@@ -641,10 +661,9 @@ class ImageTab:
                 pass  # noop (stil karmaşık; bırakılan state yeterli)
         # checkbuttonu özel aramadan bırakıyoruz; kullanıcı yine aktif görebilir ama set False kalıyor
 
-    def _maybe_resize_image(self, img):
+    def _resize_box(self):
         if not self.resize_enabled.get():
-            return img
-        w, h = img.size
+            return None
         try:
             tw = int(self.resize_width.get() or "0")
         except Exception:
@@ -654,31 +673,8 @@ class ImageTab:
         except Exception:
             th = 0
         if tw <= 0 or th <= 0:
-            return img
-        tw = min(tw, w)
-        th = min(th, h)
-        if tw <= 0 or th <= 0:
-            return img
-        mode = self.resize_mode.get()
-        if mode == "stretch":
-            if (tw, th) == (w, h):
-                return img
-            return img.resize((tw, th), Image.LANCZOS)
-        scale = min(tw / w, th / h, 1.0)
-        if scale >= 1.0:
-            return img
-        new_w = max(1, int(w * scale))
-        new_h = max(1, int(h * scale))
-        if img.mode != "RGB":
-            work = img.convert("RGB")
-        else:
-            work = img
-        resized = work.resize((new_w, new_h), Image.LANCZOS)
-        bg = Image.new("RGB", (tw, th), (255, 255, 255))
-        x = (tw - new_w) // 2
-        y = (th - new_h) // 2
-        bg.paste(resized, (x, y))
-        return bg
+            return None
+        return (tw, th)
 
     def on_rename_toggle(self):
         if self.rename_enabled.get():
@@ -740,62 +736,64 @@ class ImageTab:
         fmt_key = self.target_format.get().upper()
         pil_format, ext = IMAGE_FORMAT_MAP.get(fmt_key, ("PNG", "png"))
 
-        idx = 0
-        last_output_dir = None
+        q = int(self.quality_var.get())
+        profile = self.encoder_profile.get()
+        save_kwargs = image_encoders.encoder_options(pil_format, profile, q) if pil_format else {}
+        try:
+            target_kb = int(self.target_kb.get() or "0")
+        except Exception:
+            target_kb = 0
+        if pil_format not in image_encoders.QUALITY_FORMATS:
+            target_kb = 0  # sadece JPG/WEBP kaliteyle küçültülebilir
+
+        box = self._resize_box()
+        resize_mode = self.resize_mode.get()
+        # Original modda silme güvenlik için devre dışı (guard üstte)
+        delete_original = self.delete_originals.get() and pil_format is not None
+
+        # Çıkış yolları burada (sırayla) belirlenir; paralel işler aynı ismi almasın
+        tasks = []
+        reserved = set()
         for i, src_path in enumerate(jobs, start=1):
-            # Update file progress
-            filename = os.path.basename(src_path)
-            self.root.after(0, lambda f=filename: self.lbl_file_prog.config(text=f"Processing: {f}"))
-            self.root.after(0, lambda: self.file_progress.config(value=0))
-            
-            try:
-                src_dir = os.path.dirname(src_path)
-                # çıkış klasörü
-                out_dir = src_dir if self.mirror_to_source.get() else self.output_dir
-
-                with Image.open(src_path) as img:
-                    if pil_format == "JPEG" and img.mode in ("RGBA", "LA", "P"):
-                        img = img.convert("RGB")
-
-                    img = self._maybe_resize_image(img)
-
-                    if pil_format is None:
-                        # Original: sadece kopyala (Pillow üzerinden yeniden kaydet)
-                        orig_ext = os.path.splitext(src_path)[1].lstrip(".")
-                        base_name = self._build_base_name(src_path, i)
-                        out_path = self._avoid_overwrite(os.path.join(out_dir, f"{base_name}.{orig_ext}"))
-                        img.save(out_path)
-                        # original delete — Original modda güvenlik için devre dışı (guard üstte)
-                    else:
-                        base_name = self._build_base_name(src_path, i)
-                        out_path = self._avoid_overwrite(os.path.join(out_dir, f"{base_name}.{ext}"))
-
-                        kwargs = {}
-                        if pil_format == "JPEG":
-                            q = int(self.quality_var.get())
-                            kwargs = dict(quality=q, optimize=True, progressive=True)
-                        elif pil_format == "WEBP":
-                            q = int(self.quality_var.get())
-                            kwargs = dict(quality=q, method=6)
-
-                        img.save(out_path, pil_format, **kwargs)
-                        last_output_dir = os.path.dirname(out_path)
-
-                        # başarılıysa, istenirse orijinali sil
-                        if self.delete_originals.get():
-                            try:
-                                os.remove(src_path)
-                            except Exception:
-                                # silinemezse görmezden gel, hata listesine ekleme
-                                pass
-
-            except Exception as e:
-                errors.append((src_path, str(e)))
-
-            idx = i
-            # Set file progress to 100% when done
-            self.root.after(0, lambda: self.file_progress.config(value=100))
-            self.root.after(0, self._tick_progress, idx, total)
+            # çıkış klasörü
+            out_dir = os.path.dirname(src_path) if self.mirror_to_source.get() else self.output_dir
+            out_ext = os.path.splitext(src_path)[1].lstrip(".") if pil_format is None else ext
+            base_name = self._build_base_name(src_path, i)
+            out_path = self._avoid_overwrite(os.path.join(out_dir, f"{base_name}.{out_ext}"), reserved)
+            reserved.add(out_path)
+            tasks.append(dict(
+                src_path=src_path,
+                out_path=out_path,
+                pil_format=pil_format,
+                save_kwargs=save_kwargs,
+                box=box,
+                resize_mode=resize_mode,
+                delete_original=delete_original,
+                profile=profile,
+                quality=q,
+                target_kb=target_kb,
+            ))
+
+        done = 0
+        finished = set()
+        last_output_dir = None
+        try:
+            for index, out_path, error in image_batch.run_bounded(image_batch.convert_one, tasks):
+                src_path = tasks[index]["src_path"]
+                if error is not None:
+                    errors.append((src_path, str(error)))
+                elif pil_format is not None:
+                    last_output_dir = os.path.dirname(out_path)
+
+                done += 1
+                finished.add(index)
+                filename = os.path.basename(src_path)
+                self.root.after(0, lambda f=filename: self.lbl_file_prog.config(text=f"Processing: {f}"))
+                self.root.after(0, lambda: self.file_progress.config(value=100))
+                self.root.after(0, self._tick_progress, done, total)
+        except Exception as e:
+            # havuz başlatılamadı / çöktü: kalan dosyaları hata olarak raporla
+            errors.extend((t["src_path"], str(e)) for i, t in enumerate(tasks) if i not in finished)
 
         self.root.after(0, self._finish_progress, total, errors, last_output_dir)
 
@@ -810,14 +808,14 @@ class ImageTab:
             base = orig_name
         return base.replace(os.sep, "_")
 
-    def _avoid_overwrite(self, out_path: str) -> str:
-        if not os.path.exists(out_path):
+    def _avoid_overwrite(self, out_path: str, reserved=()) -> str:
+        if not os.path.exists(out_path) and out_path not in reserved:
             return out_path
         base, ext = os.path.splitext(out_path)
         counter = 1
         while True:
             candidate = f"{base}_{counter}{ext}"
-            if not os.path.exists(candidate):
+            if not os.path.exists(candidate) and candidate not in reserved:
                 return candidate
             counter += 1
 
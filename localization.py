@@ -52,6 +52,8 @@ STRINGS: Dict[str, Dict[str, str]] = {
         "image.section.format": "3) Target Format",
         "image.format.label": "Format:",
         "image.quality.label": "JPEG Quality:",
+        "image.profile.label": "Encoder:",
+        "image.target_kb.label": "Target size (KB):",
 
         "image.section.resize": "4) Resize (optional)",
         "image.resize.enable": "Enable resize",
@@ -332,6 +334,8 @@ STRINGS: Dict[str, Dict[str, str]] = {
         "image.section.format": "3) Hedef Format",
         "image.format.label": "Format:",
         "image.quality.label": "JPEG Kalitesi:",
+        "image.profile.label": "Kodlayıcı:",
+        "image.target_kb.label": "Hedef boyut (KB):",
 
         "image.section.resize": "4) Yeniden Boyutlandır (opsiyonel)",
         "image.resize.enable": "Yeniden boyutlandırmayı etkinleştir",
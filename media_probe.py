@@ -0,0 +1,116 @@
+# media_probe.py
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Cached ffprobe results for the desktop tabs.
+# Key: (absolute path, size, mtime_ns) -> full ffprobe JSON (format + streams).
+# Kept in memory and mirrored to the temp dir so reopening the app is free too.
+
+PROBE_CACHE_MAX_ENTRIES = 256
+PROBE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "bambam_probe_cache")
+
+_NO_WINDOW_KW = (
+    {"creationflags": subprocess.CREATE_NO_WINDOW}
+    if os.name == "nt" and hasattr(subprocess, "CREATE_NO_WINDOW")
+    else {}
+)
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_ffprobe_cmd():
+    exe = "ffprobe.exe" if os.name == "nt" else "ffprobe"
+    here = os.path.dirname(os.path.abspath(__file__))
+    local = os.path.join(here, exe)
+    if os.path.exists(local):
+        return [local]
+    return ["ffprobe"]
+
+
+def _cache_key(path):
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def _cache_file(key):
+    digest = hashlib.sha1("|".join(str(part) for part in key).encode("utf-8")).hexdigest()
+    return os.path.join(PROBE_CACHE_DIR, f"{digest}.json")
+
+
+def _remember(key, info):
+    with _lock:
+        _cache[key] = info
+        _cache.move_to_end(key)
+        while len(_cache) > PROBE_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def probe(path, timeout=30):
+    """Return ffprobe JSON for path, or {} if the file cannot be probed."""
+    try:
+        key = _cache_key(path)
+    except OSError:
+        return {}
+
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    cache_file = _cache_file(key)
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if isinstance(info, dict):
+            _remember(key, info)
+            return info
+    except (OSError, ValueError):
+        pass
+
+    cmd = get_ffprobe_cmd() + [
+        "-v", "error",
+        "-print_format", "json",
+        "-show_streams",
+        "-show_format",
+        path,
+    ]
+    try:
+        res = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=timeout,
+            **_NO_WINDOW_KW,
+        )
+    except Exception:
+        return {}
+    if res.returncode != 0:
+        return {}
+    try:
+        info = json.loads(res.stdout or "{}")
+    except ValueError:
+        return {}
+
+    _remember(key, info)
+    try:
+        os.makedirs(PROBE_CACHE_DIR, exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(info, f)
+    except OSError:
+        pass
+    return info
+
+
+def get_duration(path):
+    """Duration in seconds, 0.0 when unknown."""
+    try:
+        return float(probe(path).get("format", {}).get("duration") or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
@@ -3,6 +3,7 @@ from tkinter import ttk, filedialog, messagebox
 import concurrent.futures, multiprocessing
 
 import localization as i18n
+import media_probe
 
 try:
     from tkinterdnd2 import DND_FILES
@@ -20,6 +21,14 @@ def get_ffmpeg_cmd():
         return [local]
     return ["ffmpeg"]
 
+def default_workers():
+    """One ffmpeg per core, minus one so the UI stays responsive; audio encoders are single-threaded."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    return max(1, cpus - 1)
+
 def have_ffmpeg():
     try:
         cmd = get_ffmpeg_cmd() + ["-version"]
@@ -279,38 +288,58 @@ class SoundTab:
         total=len(self.audio_files); done=0; errors=[]
         target=self.target_format.get().upper(); fmt=target.lower(); bitrate=self.bitrate.get()
         delete_orig = self.delete_originals.get()
-        
+
+        # Pick every output name up front so parallel conversions never collide.
+        jobs=[]; reserved=set()
         for path in self.audio_files:
+            out_dir = os.path.dirname(path) if self.mirror_to_source.get() else self.output_dir
+            base=os.path.splitext(os.path.basename(path))[0].replace(os.sep,"_")
+            out=self._avoid_overwrite(os.path.join(out_dir, f"{base}.{fmt}"), reserved)
+            reserved.add(out)
+            jobs.append((path, out))
+        # Longest first, so one long track does not end up running alone at the end.
+        jobs.sort(key=lambda job: media_probe.get_duration(job[0]), reverse=True)
+
+        running=[]; lock=threading.Lock()
+
+        def show_running():
+            with lock:
+                names=list(running)
+            text = f"Processing: {', '.join(names[:3])}" + (f" (+{len(names)-3})" if len(names) > 3 else "") if names else ""
+            self.root.after(0, lambda: self.lbl_file_prog.config(text=text))
+
+        def convert_one(path, out):
             filename = os.path.basename(path)
-            self.root.after(0, lambda f=filename: self.lbl_file_prog.config(text=f"Processing: {f}"))
-            self.root.after(0, lambda: self.file_progress.config(value=0))
-            
+            with lock:
+                running.append(filename)
+            show_running()
             try:
-                # Determine output directory
-                if self.mirror_to_source.get():
-                    out_dir = os.path.dirname(path)
-                else:
-                    out_dir = self.output_dir
-                
-                base=os.path.splitext(os.path.basename(path))[0].replace(os.sep,"_")
-                out=self._avoid_overwrite(os.path.join(out_dir, f"{base}.{fmt}"))
-                cmd = get_ffmpeg_cmd() + ["-y","-i",path]
+                cmd = get_ffmpeg_cmd() + ["-y","-threads","1","-i",path]
                 if fmt in ["mp3","ogg","m4a","aac"]: cmd+=["-b:a", bitrate]
                 cmd+=[out]
                 res=subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
                 if res.returncode!=0: raise RuntimeError(res.stderr.strip() or "ffmpeg error")
-                
+
                 # Delete original if requested and conversion was successful
                 if delete_orig and os.path.exists(out):
                     try:
                         os.remove(path)
                     except Exception:
                         pass
-            except Exception as e:
-                errors.append((path,str(e)))
             finally:
+                with lock:
+                    running.remove(filename)
+                show_running()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(default_workers(), len(jobs))) as pool:
+            futures = {pool.submit(convert_one, path, out): path for path, out in jobs}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append((futures[future],str(e)))
                 done+=1
-                self.root.after(0, lambda: self.file_progress.config(value=100))
+                self.root.after(0, lambda d=done: self.file_progress.config(value=(d/total)*100))
                 self.root.after(0, self._tick_progress, done, total)
         self.root.after(0, self._finish, total, errors)
 
@@ -337,12 +366,12 @@ class SoundTab:
             messagebox.showinfo(i18n.t("sound.result.done_title"), i18n.t("sound.result.done_message"))
             self.app.open_folder_if_enabled(self.output_dir)
 
-    def _avoid_overwrite(self, out_path:str)->str:
-        if not os.path.exists(out_path): return out_path
+    def _avoid_overwrite(self, out_path:str, reserved=())->str:
+        if not os.path.exists(out_path) and out_path not in reserved: return out_path
         b,e=os.path.splitext(out_path); i=1
         while True:
             p=f"{b}_{i}{e}"
-            if not os.path.exists(p): return p
+            if not os.path.exists(p) and p not in reserved: return p
             i+=1
 
     # clears
@@ -5,6 +5,7 @@ import concurrent.futures, multiprocessing
 from PIL import Image, ImageTk, ImageDraw
 
 import localization as i18n
+import media_probe
 
 try:
     from tkinterdnd2 import DND_FILES
@@ -29,14 +30,6 @@ def get_ffmpeg_cmd():
         return [local]
     return ["ffmpeg"]
 
-def get_ffprobe_cmd():
-    exe = "ffprobe.exe" if os.name == "nt" else "ffprobe"
-    here = os.path.dirname(os.path.abspath(__file__))
-    local = os.path.join(here, exe)
-    if os.path.exists(local):
-        return [local]
-    return ["ffprobe"]
-
 def have_ffmpeg():
     try:
         cmd = get_ffmpeg_cmd() + ["-version"]
@@ -579,20 +572,8 @@ class VideoTab:
         self.root.after(0, self._finish, self.cancel_requested)
 
     def _get_video_duration(self, video_path: str) -> float:
-        """Get video duration in seconds using ffprobe"""
-        try:
-            cmd = get_ffprobe_cmd() + [
-                "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                video_path
-            ]
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **_NO_WINDOW_KW)
-            if result.returncode == 0:
-                return float(result.stdout.strip())
-        except Exception:
-            pass
-        return 0.0
+        """Get video duration in seconds (cached ffprobe)"""
+        return media_probe.get_duration(video_path)
     
     def _monitor_ffmpeg_progress(self, process, total_duration: float):
         """Monitor ffmpeg stderr output and update file progress bar"""
@@ -1184,23 +1165,9 @@ class VideoTab:
     def _fetch_trim_duration(self, video, skip_widget_update=False):
         self.trim_video = video
         self.trim_duration = 0.0
-        try:
-            cmd = get_ffprobe_cmd() + [
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                video,
-            ]
-            res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **_NO_WINDOW_KW)
-            if res.returncode == 0:
-                dur = float(res.stdout.strip())
-                if dur > 0:
-                    self.trim_duration = dur
-        except Exception:
-            self.trim_duration = 0.0
+        dur = media_probe.get_duration(video)
+        if dur > 0:
+            self.trim_duration = dur
 
         if self.trim_duration > 0:
             self._is_updating_trim = True